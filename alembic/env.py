@@ -9,8 +9,9 @@ from dotenv import load_dotenv
 
 from app.db.database import Base
 from app.core.config import Settings
-from app.features.users.models import User, UserProblem, Onboarding
-from app.features.exercises.models import Exercise
+from app.features.users.models import User, UserProblem, Onboarding, RefreshToken
+from app.features.exercises.models import Exercise, ExerciseCatalogVersion
+from app.features.progress.models import DailyProgress
 from app.features.sessions.models import (
     Session,
     SessionRequirement,
@@ -18,16 +19,20 @@ from app.features.sessions.models import (
     Repetition,
 )
 from app.features.exercises.crud import seed_exercises
+from app.db.partitions import is_partition_name
 
 _ = [
     User,
     UserProblem,
     Onboarding,
+    RefreshToken,
     Exercise,
+    ExerciseCatalogVersion,
     Session,
     SessionRequirement,
     ExerciseSet,
     Repetition,
+    DailyProgress,
 ]
 
 # this is the Alembic Config object, which provides
@@ -37,8 +42,9 @@ load_dotenv()
 config = context.config
 
 # Interpret the config file for Python logging.
-# This line sets up loggers basically.
-if config.config_file_name is not None:
+# This line sets up loggers basically. Not when the app runs the migrations
+# at startup (app/db/migrations.py), which has its own logging.
+if config.config_file_name is not None and "connection" not in config.attributes:
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
@@ -56,6 +62,20 @@ settings = Settings()
 config.set_main_option("sqlalchemy.url", settings.database_url)
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Leaves the monthly partitions out of autogenerate. app.db.partitions
+    creates them at runtime and they have no models, so autogenerate would
+    otherwise drop them, their indexes, and the copies Postgres makes of the
+    foreign keys that point at a partitioned table (one per partition).
+    """
+    if type_ == "foreign_key_constraint":
+        return not is_partition_name(object.referred_table.name)
+    if type_ in ("table", "index", "unique_constraint"):
+        return not is_partition_name(name)
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -74,19 +94,43 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
         context.run_migrations()
 
 
+def do_run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+        # In the same transaction, so a database is never left migrated but
+        # without the default exercises.
+        seed_exercises(connection)
+
+
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode.
 
     In this scenario we need to create an Engine
     and associate a connection with the context.
 
+    The app's startup passes its own connection in
+    ``config.attributes["connection"]`` so the migrations run inside the
+    transaction that holds its advisory lock.
+
     """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -94,14 +138,7 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
-
-        with context.begin_transaction():
-            context.run_migrations()
-
-        connection.commit()
-
-        seed_exercises(connection)
+        do_run_migrations(connection)
 
 
 if context.is_offline_mode():
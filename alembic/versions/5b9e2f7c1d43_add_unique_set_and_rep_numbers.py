@@ -0,0 +1,68 @@
+"""Add unique set and rep numbers
+
+Revision ID: 5b9e2f7c1d43
+Revises: a0876b3fdb48
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b9e2f7c1d43"
+down_revision: Union[str, Sequence[str], None] = "a0876b3fdb48"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fold duplicate sets into the newest set with the same number, moving
+    # their repetitions across before the duplicates are removed.
+    op.execute("""
+        WITH ranked AS (
+            SELECT id,
+                   max(id) OVER (PARTITION BY session_id, set_number) AS keep_id
+            FROM exercise_sets
+        )
+        UPDATE repetitions r
+        SET set_id = ranked.keep_id
+        FROM ranked
+        WHERE r.set_id = ranked.id AND ranked.id <> ranked.keep_id
+        """)
+    op.execute("""
+        DELETE FROM exercise_sets s
+        USING exercise_sets newer
+        WHERE s.session_id = newer.session_id
+          AND s.set_number = newer.set_number
+          AND s.id < newer.id
+        """)
+    # Keep the most recently logged repetition for each rep number.
+    op.execute("""
+        DELETE FROM repetitions r
+        USING repetitions newer
+        WHERE r.set_id = newer.set_id
+          AND r.rep_number = newer.rep_number
+          AND r.id < newer.id
+        """)
+
+    op.create_unique_constraint(
+        "uq_exercise_sets_session_id_set_number",
+        "exercise_sets",
+        ["session_id", "set_number"],
+    )
+    op.create_unique_constraint(
+        "uq_repetitions_set_id_rep_number", "repetitions", ["set_id", "rep_number"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        "uq_repetitions_set_id_rep_number", "repetitions", type_="unique"
+    )
+    op.drop_constraint(
+        "uq_exercise_sets_session_id_set_number", "exercise_sets", type_="unique"
+    )
@@ -0,0 +1,50 @@
+"""Cascade deletes on foreign keys
+
+Revision ID: b9d4f2a7c815
+Revises: a8c3e6f1d924
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b9d4f2a7c815"
+down_revision: Union[str, Sequence[str], None] = "a8c3e6f1d924"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, referenced table); the constraints carry Postgres' default
+# <table>_<column>_fkey names.
+FOREIGN_KEYS = [
+    ("onboarding", "user_id", "users"),
+    ("user_problems", "user_id", "users"),
+    ("user_problems", "exercise_id", "exercises"),
+    ("sessions", "user_id", "users"),
+    ("sessions", "exercise_id", "exercises"),
+    ("session_requirements", "user_id", "users"),
+    ("session_requirements", "exercise_id", "exercises"),
+    ("exercise_sets", "session_id", "sessions"),
+    ("repetitions", "set_id", "exercise_sets"),
+]
+
+
+def _recreate_foreign_keys(ondelete: Union[str, None]) -> None:
+    for table, column, referent in FOREIGN_KEYS:
+        name = f"{table}_{column}_fkey"
+        op.drop_constraint(name, table, type_="foreignkey")
+        op.create_foreign_key(
+            name, table, referent, [column], ["id"], ondelete=ondelete
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _recreate_foreign_keys(ondelete="CASCADE")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _recreate_foreign_keys(ondelete=None)
@@ -0,0 +1,32 @@
+"""Add session history index
+
+Revision ID: c4d8e1a2f6b7
+Revises: 5b9e2f7c1d43
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d8e1a2f6b7"
+down_revision: Union[str, Sequence[str], None] = "5b9e2f7c1d43"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_sessions_user_id_datetime_start_id",
+        "sessions",
+        ["user_id", "datetime_start", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_sessions_user_id_datetime_start_id", table_name="sessions")
@@ -0,0 +1,301 @@
+"""Partition sessions, sets and repetitions by month
+
+Revision ID: c7e5a1d9f3b2
+Revises: b9d4f2a7c815
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from datetime import date, datetime
+from typing import Sequence, Union
+from zoneinfo import ZoneInfo
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c7e5a1d9f3b2"
+down_revision: Union[str, Sequence[str], None] = "b9d4f2a7c815"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Parents before children; each is partitioned on the session's start time.
+PARTITIONED_TABLES = [
+    ("sessions", "datetime_start"),
+    ("exercise_sets", "session_start"),
+    ("repetitions", "session_start"),
+]
+# Partitions are created up to this many months past the current one; the
+# app keeps the same margin from then on (app.db.partitions).
+MONTHS_AHEAD = 3
+
+SESSION_COLUMNS = (
+    "id, datetime_start, datetime_end, is_completed, session_quality_score, "
+    "error_flag, user_id, exercise_id"
+)
+SET_COLUMNS = "id, set_number, set_quality_score, is_completed, error_flag, session_id"
+REPETITION_COLUMNS = (
+    "id, rep_number, rep_quality_score, is_completed, error_flag, set_id"
+)
+
+
+# A frozen copy of app.db.partitions.add_months: a migration must keep doing
+# what it did when it was written, whatever later happens to the app code.
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _set_aside(table: str) -> None:
+    """
+    Renames a table and its indexes (constraint-backed ones rename their
+    constraint too) to *_old, so the replacement can use the same names.
+    """
+    op.rename_table(table, f"{table}_old")
+    op.execute(f"""
+        DO $$
+        DECLARE index_name text;
+        BEGIN
+            FOR index_name IN
+                SELECT indexrelid::regclass::text FROM pg_index
+                WHERE indrelid = '{table}_old'::regclass
+            LOOP
+                EXECUTE format(
+                    'ALTER INDEX %I RENAME TO %I', index_name, index_name || '_old'
+                );
+            END LOOP;
+        END $$
+        """)
+
+
+def _create_tables(partitioned: bool) -> None:
+    """The three tables without keys or indexes, which are added after the copy."""
+    partition_by = {}
+    if partitioned:
+        partition_by = {"postgresql_partition_by": "RANGE (datetime_start)"}
+
+    def session_start():
+        if partitioned:
+            return [sa.Column("session_start", sa.DateTime(), nullable=False)]
+        return []
+
+    op.create_table(
+        "sessions",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('sessions_id_seq'::regclass)"),
+            nullable=False,
+        ),
+        sa.Column("datetime_start", sa.DateTime(), nullable=False),
+        sa.Column(
+            "session_date",
+            sa.Date(),
+            sa.Computed("CAST(datetime_start AS DATE)", persisted=True),
+            nullable=True,
+        ),
+        sa.Column("datetime_end", sa.DateTime(), nullable=True),
+        sa.Column("is_completed", sa.Boolean(), nullable=True),
+        sa.Column("session_quality_score", sa.Float(), nullable=True),
+        sa.Column("error_flag", sa.String(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("exercise_id", sa.Integer(), nullable=False),
+        **partition_by,
+    )
+    if partitioned:
+        partition_by = {"postgresql_partition_by": "RANGE (session_start)"}
+    op.create_table(
+        "exercise_sets",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('exercise_sets_id_seq'::regclass)"),
+            nullable=False,
+        ),
+        sa.Column("set_number", sa.Integer(), nullable=False),
+        sa.Column("set_quality_score", sa.Float(), nullable=True),
+        sa.Column("is_completed", sa.Boolean(), nullable=True),
+        sa.Column("error_flag", sa.String(), nullable=True),
+        sa.Column("session_id", sa.Integer(), nullable=False),
+        *session_start(),
+        **partition_by,
+    )
+    op.create_table(
+        "repetitions",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('repetitions_id_seq'::regclass)"),
+            nullable=False,
+        ),
+        sa.Column("rep_number", sa.Integer(), nullable=False),
+        sa.Column("rep_quality_score", sa.Float(), nullable=True),
+        sa.Column("is_completed", sa.Boolean(), nullable=True),
+        sa.Column("error_flag", sa.String(), nullable=True),
+        sa.Column("set_id", sa.Integer(), nullable=False),
+        *session_start(),
+        **partition_by,
+    )
+
+
+def _create_partitions() -> None:
+    """Monthly partitions from the oldest session to MONTHS_AHEAD past today."""
+    oldest, newest = (
+        op.get_bind()
+        .execute(
+            sa.text("SELECT min(datetime_start), max(datetime_start) FROM sessions_old")
+        )
+        .one()
+    )
+    this_month = datetime.now(ZoneInfo("Asia/Manila")).date().replace(day=1)
+    month = oldest.date().replace(day=1) if oldest else this_month
+    last = _add_months(this_month, MONTHS_AHEAD)
+    if newest is not None:
+        last = max(last, newest.date().replace(day=1))
+
+    while month <= last:
+        following = _add_months(month, 1)
+        for table, _ in PARTITIONED_TABLES:
+            op.execute(
+                f"CREATE TABLE {table}_{month:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month}') TO ('{following}')"
+            )
+        month = following
+
+
+def _finish(partitioned: bool) -> None:
+    """Keys, foreign keys and indexes, the sequences, then the old tables go."""
+    # Primary and unique keys of a partitioned table must contain its
+    # partition key, and so must the foreign keys that reference it.
+    start = ["session_start"] if partitioned else []
+    op.create_primary_key(
+        "sessions_pkey", "sessions", ["id", "datetime_start"] if partitioned else ["id"]
+    )
+    op.create_primary_key("exercise_sets_pkey", "exercise_sets", ["id", *start])
+    op.create_primary_key("repetitions_pkey", "repetitions", ["id", *start])
+    op.create_unique_constraint(
+        "uq_exercise_sets_session_id_set_number",
+        "exercise_sets",
+        ["session_id", "set_number", *start],
+    )
+    op.create_unique_constraint(
+        "uq_repetitions_set_id_rep_number",
+        "repetitions",
+        ["set_id", "rep_number", *start],
+    )
+
+    op.create_foreign_key(
+        "sessions_user_id_fkey",
+        "sessions",
+        "users",
+        ["user_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_foreign_key(
+        "sessions_exercise_id_fkey",
+        "sessions",
+        "exercises",
+        ["exercise_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_foreign_key(
+        "exercise_sets_session_id_fkey",
+        "exercise_sets",
+        "sessions",
+        ["session_id", *start],
+        ["id", "datetime_start"] if partitioned else ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_foreign_key(
+        "repetitions_set_id_fkey",
+        "repetitions",
+        "exercise_sets",
+        ["set_id", *start],
+        ["id", *start],
+        ondelete="CASCADE",
+    )
+
+    # The primary keys now start with id, so the separate id indexes are only
+    # kept on the unpartitioned tables, where they were before.
+    if not partitioned:
+        for table in ("sessions", "exercise_sets", "repetitions"):
+            op.create_index(f"ix_{table}_id", table, ["id"], unique=False)
+    op.create_index("ix_sessions_user_id", "sessions", ["user_id"], unique=False)
+    op.create_index(
+        "ix_sessions_exercise_id", "sessions", ["exercise_id"], unique=False
+    )
+    op.create_index(
+        "ix_sessions_user_id_datetime_start_id",
+        "sessions",
+        ["user_id", "datetime_start", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_sessions_completed_user_id_session_date",
+        "sessions",
+        ["user_id", "session_date", "id"],
+        unique=False,
+        postgresql_where=sa.text("is_completed IS TRUE"),
+    )
+    op.create_index(
+        "ix_exercise_sets_session_id", "exercise_sets", ["session_id"], unique=False
+    )
+    op.create_index("ix_repetitions_set_id", "repetitions", ["set_id"], unique=False)
+
+    for table in ("sessions", "exercise_sets", "repetitions"):
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    for table in ("repetitions", "exercise_sets", "sessions"):
+        op.drop_table(f"{table}_old")
+        op.execute(f"ANALYZE {table}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rewrites the three tables, holding exclusive locks on them until the
+    # migration commits: run it in a maintenance window on large databases.
+    for table, _ in PARTITIONED_TABLES:
+        _set_aside(table)
+    _create_tables(partitioned=True)
+    _create_partitions()
+
+    op.execute(
+        f"INSERT INTO sessions ({SESSION_COLUMNS}) "
+        f"SELECT {SESSION_COLUMNS} FROM sessions_old"
+    )
+    op.execute(
+        f"INSERT INTO exercise_sets ({SET_COLUMNS}, session_start) "
+        f"SELECT {', '.join('es.' + c for c in SET_COLUMNS.split(', '))}, "
+        "s.datetime_start FROM exercise_sets_old es "
+        "JOIN sessions_old s ON s.id = es.session_id"
+    )
+    op.execute(
+        f"INSERT INTO repetitions ({REPETITION_COLUMNS}, session_start) "
+        f"SELECT {', '.join('r.' + c for c in REPETITION_COLUMNS.split(', '))}, "
+        "es.session_start FROM repetitions_old r "
+        "JOIN exercise_sets es ON es.id = r.set_id"
+    )
+    _finish(partitioned=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, _ in PARTITIONED_TABLES:
+        _set_aside(table)
+    _create_tables(partitioned=False)
+
+    op.execute(
+        f"INSERT INTO sessions ({SESSION_COLUMNS}) "
+        f"SELECT {SESSION_COLUMNS} FROM sessions_old"
+    )
+    op.execute(
+        f"INSERT INTO exercise_sets ({SET_COLUMNS}) "
+        f"SELECT {SET_COLUMNS} FROM exercise_sets_old"
+    )
+    op.execute(
+        f"INSERT INTO repetitions ({REPETITION_COLUMNS}) "
+        f"SELECT {REPETITION_COLUMNS} FROM repetitions_old"
+    )
+    # Dropping the old parents drops their monthly partitions with them.
+    _finish(partitioned=False)
@@ -0,0 +1,45 @@
+"""Add session date and filter index
+
+Revision ID: d7a3b9c5e210
+Revises: c4d8e1a2f6b7
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d7a3b9c5e210"
+down_revision: Union[str, Sequence[str], None] = "c4d8e1a2f6b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Stored generated column, so Postgres fills it for existing rows too.
+    op.add_column(
+        "sessions",
+        sa.Column(
+            "session_date",
+            sa.Date(),
+            sa.Computed("CAST(datetime_start AS DATE)", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_sessions_completed_user_id_session_date",
+        "sessions",
+        ["user_id", "session_date", "id"],
+        unique=False,
+        postgresql_where=sa.text("is_completed IS TRUE"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_sessions_completed_user_id_session_date", table_name="sessions")
+    op.drop_column("sessions", "session_date")
@@ -0,0 +1,70 @@
+"""Add daily progress table
+
+Revision ID: e1f4c7a9b302
+Revises: d7a3b9c5e210
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e1f4c7a9b302"
+down_revision: Union[str, Sequence[str], None] = "d7a3b9c5e210"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "daily_progress",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("exercise_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("session_count", sa.Integer(), nullable=False),
+        sa.Column("completed_set_count", sa.Integer(), nullable=False),
+        sa.Column("rep_count", sa.Integer(), nullable=False),
+        sa.Column("quality_score_sum", sa.Float(), nullable=False),
+        sa.Column("quality_score_count", sa.Integer(), nullable=False),
+        sa.Column("session_error_count", sa.Integer(), nullable=False),
+        sa.Column("rep_error_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["exercise_id"], ["exercises.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "exercise_id", "day"),
+    )
+    # Backfill from the sessions that are already completed. Each session is
+    # reduced on its own first so a session's sets are not multiplied by its
+    # repetitions, then the sessions are summed per day.
+    op.execute("""
+        INSERT INTO daily_progress (
+            user_id, exercise_id, day, session_count, completed_set_count,
+            rep_count, quality_score_sum, quality_score_count,
+            session_error_count, rep_error_count
+        )
+        SELECT user_id, exercise_id, session_date, count(*),
+               sum(completed_sets), sum(reps),
+               coalesce(sum(session_quality_score), 0),
+               count(session_quality_score), count(error_flag), sum(rep_errors)
+        FROM (
+            SELECT s.id, s.user_id, s.exercise_id, s.session_date,
+                   s.session_quality_score, s.error_flag,
+                   count(DISTINCT es.id) FILTER (WHERE es.is_completed) AS completed_sets,
+                   count(r.id) AS reps,
+                   count(r.error_flag) AS rep_errors
+            FROM sessions s
+            LEFT JOIN exercise_sets es ON es.session_id = s.id
+            LEFT JOIN repetitions r ON r.set_id = es.id
+            WHERE s.is_completed IS TRUE
+            GROUP BY s.id
+        ) per_session
+        GROUP BY user_id, exercise_id, session_date
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("daily_progress")
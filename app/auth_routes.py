@@ -1,28 +1,39 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_async_db
+from app.features.users import crud as users_crud
+from app.features.users.schemas import RefreshTokenRequest, TokenResponse
 
-from app.db.database import get_db
 # Import the functions we just created in security.py
-from app.security import authenticate_user, create_access_token
+from app.security import (
+    authenticate_user,
+    create_access_token,
+    hash_refresh_token,
+    new_refresh_token,
+)
 
 # Create a new router for authentication endpoints
 router = APIRouter(tags=["Authentication"])
 
-@router.post("/token")
-def login_for_access_token(
+
+@router.post("/token", response_model=TokenResponse)
+async def login_for_access_token(
     # This special dependency automatically gets the 'username' and 'password'
     # from the incoming form data. Your frontend correctly sends 'username'.
-    form_data: OAuth2PasswordRequestForm = Depends(), 
-    db: Session = Depends(get_db)
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     This is the main login endpoint. It receives credentials, authenticates the user,
     and returns a JWT access token.
     """
     # Call our authentication helper function. form_data.username contains the email.
-    user = authenticate_user(db, email=form_data.username, password=form_data.password)
-    
+    user = await authenticate_user(
+        db, email=form_data.username, password=form_data.password
+    )
+
     # If authenticate_user returns False, the login details were incorrect.
     if not user:
         raise HTTPException(
@@ -30,10 +41,51 @@ def login_for_access_token(
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
     # If authentication is successful, create a new access token.
     # The "sub" (subject) of the token is typically the user's unique identifier (email).
     access_token = create_access_token(data={"sub": user.email})
-    
+    refresh_token, refresh_token_hash = new_refresh_token()
+    await users_crud.create_refresh_token(
+        db, user_id=user.id, token_hash=refresh_token_hash
+    )
+
     # Return the token and the user object, as your frontend expects.
-    return {"access_token": access_token, "token_type": "bearer", "user": user}
\ No newline at end of file
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "user": user,
+    }
+
+
+@router.post("/token/refresh", response_model=TokenResponse)
+async def refresh_access_token(
+    payload: RefreshTokenRequest,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Exchanges a refresh token for a new access token without a password check.
+    The refresh token is single-use: the response carries its replacement, and
+    sending a used token again revokes every token from that login.
+    """
+    refresh_token, refresh_token_hash = new_refresh_token()
+    user = await users_crud.rotate_refresh_token(
+        db,
+        token_hash=hash_refresh_token(payload.refresh_token),
+        new_token_hash=refresh_token_hash,
+    )
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    access_token = create_access_token(data={"sub": user.email})
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "user": user,
+    }
@@ -1,12 +1,56 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
 
 class Settings(BaseSettings):
     database_url: str = Field(..., alias="DATABASE_URL")
+    # Replica for GET requests (see app.db.database.get_async_db); without it
+    # every query goes to DATABASE_URL.
+    read_database_url: Optional[str] = Field(None, alias="READ_DATABASE_URL")
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    # Which routes this process serves (see app.main.create_app): "api" never
+    # imports TensorFlow, "inference" only serves predictions.
+    APP_PROFILE: Literal["full", "api", "inference"] = "full"
+    # Lifetime of each refresh token; every refresh issues a new one.
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Log every SQL statement (very noisy; for local debugging only).
+    SQL_ECHO: bool = False
+    # Add X-DB-Query-Count / X-DB-Time-Ms / X-DB-Slowest-Ms to every response.
+    SQL_DEBUG_HEADERS: bool = False
+    # Serve /metrics/sql, each route's statement stats with its slowest SQL.
+    # It has no auth, so leave it off outside local debugging.
+    SQL_STATS_ENDPOINT: bool = False
+    # Statements at least this slow are logged, for this fraction of them.
+    SLOW_QUERY_THRESHOLD_MS: float = 100.0
+    SLOW_QUERY_LOG_SAMPLE_RATE: float = 0.1
+    # How often each worker checks whether its cached exercise catalog is stale.
+    EXERCISE_CATALOG_TTL_SECONDS: float = 5.0
+    # Authenticated-user cache, per worker. A change to a user (including
+    # deleting it) reaches the other workers only when their entry expires,
+    # so for up to USER_CACHE_TTL_SECONDS they may serve the old user; see
+    # app.features.users.cache. Set the size to 0 to disable it.
+    USER_CACHE_MAX_SIZE: int = 1024
+    USER_CACHE_TTL_SECONDS: float = 30.0
+    # Accounts with more sessions than this are deleted by a background job,
+    # this many sessions per transaction.
+    USER_DELETE_BATCH_SIZE: int = 500
+    # bcrypt worker processes per app process, how many calls may queue for
+    # them, and how long a call may take (queueing included) before a 503.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = 10.0
+    # Monthly partitions of sessions/sets/repetitions are kept this many
+    # months ahead of the current one (see app.db.partitions).
+    PARTITION_MONTHS_AHEAD: int = 3
+    # Directory the worker processes share their metrics through, so /metrics
+    # on any of them covers all of them (see app.core.metrics), and how often
+    # each worker rewrites its snapshot there. Unset: per-worker metrics.
+    METRICS_DIR: Optional[str] = None
+    METRICS_SNAPSHOT_SECONDS: float = 5.0
 
     class Config:
         env_file = ".env"
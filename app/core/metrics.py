@@ -0,0 +1,356 @@
+"""
+In-process metrics in the Prometheus text format, served by ``GET /metrics``.
+
+Recording is meant to stay on in production, so it takes no locks:
+
+- Histograms keep one shard per thread. A thread only ever writes its own
+  shard (the event loop thread, or a threadpool thread running a sync
+  route), and ``/metrics`` adds the shards up when it renders.
+- Gauges are only changed on the event loop thread.
+- Values that already live elsewhere (cache sizes, per-route SQL totals) are
+  read when ``/metrics`` is rendered, through callbacks.
+
+Every worker process records its own metrics. With ``METRICS_DIR`` set
+(gunicorn.conf.py sets it), each worker also writes a snapshot of them to
+``<METRICS_DIR>/<pid>.json`` every ``METRICS_SNAPSHOT_SECONDS``, and
+``/metrics`` adds the other workers' latest snapshots to its own live values,
+so whichever worker is scraped reports the whole server. Counters and
+histograms of workers that have exited are kept, so totals never go
+backwards when gunicorn replaces a worker; their gauges are dropped.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+FFMPEG_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+Labels = Tuple[str, ...]
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def values(self) -> Dict[Labels, object]:
+        """This worker's current values, by label values (a new dict)."""
+        raise NotImplementedError
+
+    def merge(self, total, value):
+        """Combines two workers' values for the same labels."""
+        return total + value
+
+    def samples(self, values: Dict[Labels, object]) -> Iterable[str]:
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_label_text(self.labelnames, labels)} {_number(value)}"
+
+    def render(self, values: Dict[Labels, object]) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self.samples(values)
+
+
+class _HistogramShard:
+    __slots__ = ("buckets", "sum", "count")
+
+    def __init__(self, size: int):
+        self.buckets = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._local = threading.local()
+        # One {labels: shard} dict per thread that has observed a value.
+        self._shards: List[Dict[Labels, _HistogramShard]] = []
+
+    def observe(self, value: float, *labels: str):
+        shards = getattr(self._local, "shards", None)
+        if shards is None:
+            shards = self._local.shards = {}
+            self._shards.append(shards)
+        shard = shards.get(labels)
+        if shard is None:
+            shard = shards[labels] = _HistogramShard(len(self.buckets) + 1)
+        # Index len(buckets) is the +Inf bucket.
+        shard.buckets[bisect_left(self.buckets, value)] += 1
+        shard.sum += value
+        shard.count += 1
+
+    def values(self) -> Dict[Labels, object]:
+        """[bucket counts, sum, count] by labels, over every thread's shard."""
+        merged: Dict[Labels, list] = {}
+        for shards in list(self._shards):
+            for labels, shard in list(shards.items()):
+                value = [shard.buckets[:], shard.sum, shard.count]
+                total = merged.get(labels)
+                merged[labels] = value if total is None else self.merge(total, value)
+        return merged
+
+    def merge(self, total, value):
+        return [
+            [a + b for a, b in zip(total[0], value[0])],
+            total[1] + value[1],
+            total[2] + value[2],
+        ]
+
+    def samples(self, values: Dict[Labels, object]) -> Iterable[str]:
+        bounds = self.buckets + (float("inf"),)
+        for labels, (buckets, total_sum, total_count) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, buckets):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield (
+                    f"{self.name}_bucket"
+                    f"{_label_text(self.labelnames, labels, le)} {cumulative}"
+                )
+            label_text = _label_text(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_number(total_sum)}"
+            yield f"{self.name}_count{label_text} {total_count}"
+
+
+class Gauge(_Metric):
+    """A value changed on the event loop thread only."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+    def dec(self, amount: int = 1):
+        self.value -= amount
+
+    def values(self) -> Dict[Labels, object]:
+        return {(): self.value}
+
+
+class CallbackMetric(_Metric):
+    """
+    A gauge or counter whose values are read when /metrics is rendered.
+    ``callback`` returns a number, or a {label values: number} dict.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable,
+        labelnames: Sequence[str] = (),
+        kind: str = "gauge",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def values(self) -> Dict[Labels, object]:
+        values = self.callback()
+        if not isinstance(values, dict):
+            return {(): values}
+        return dict(values)
+
+
+def _snapshot_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"{pid}.json")
+
+
+def write_snapshot(directory: str):
+    """Writes this worker's values where the other workers' renders read them."""
+    snapshot = {
+        metric.name: [
+            [list(labels), value] for labels, value in metric.values().items()
+        ]
+        for metric in _registry
+    }
+    path = _snapshot_path(directory, os.getpid())
+    # Written aside and renamed, so a reader never sees half a file.
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(snapshot, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _other_snapshots(directory: str) -> Iterator[Tuple[bool, Dict[str, list]]]:
+    """(is the worker still running, its snapshot) for every other worker."""
+    for entry in os.scandir(directory):
+        pid, extension = os.path.splitext(entry.name)
+        if extension != ".json" or not pid.isdigit() or int(pid) == os.getpid():
+            continue
+        try:
+            with open(entry.path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            logger.warning("Skipping unreadable metrics snapshot %s", entry.path)
+            continue
+        yield _is_running(int(pid)), snapshot
+
+
+async def write_snapshots_periodically(directory: str):
+    """Keeps this worker's snapshot fresh; the caller writes a last one on exit."""
+    while True:
+        await asyncio.sleep(settings.METRICS_SNAPSHOT_SECONDS)
+        try:
+            write_snapshot(directory)
+        except OSError:
+            logger.exception("Could not write the metrics snapshot")
+
+
+def render() -> str:
+    """
+    Every registered metric in the Prometheus text exposition format: this
+    worker's values plus, with METRICS_DIR set, every other worker's.
+    """
+    totals = {metric.name: metric.values() for metric in _registry}
+    if settings.METRICS_DIR:
+        for running, snapshot in _other_snapshots(settings.METRICS_DIR):
+            for metric in _registry:
+                if not running and metric.kind == "gauge":
+                    continue
+                values = totals[metric.name]
+                for labels, value in snapshot.get(metric.name, ()):
+                    labels = tuple(labels)
+                    total = values.get(labels)
+                    values[labels] = (
+                        value if total is None else metric.merge(total, value)
+                    )
+
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render(totals[metric.name]))
+    return "\n".join(lines) + "\n"
+
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve an HTTP request, by route template.",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."
+)
+MODEL_INFERENCE_DURATION = Histogram(
+    "model_inference_duration_seconds", "Time spent in model.predict."
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    "websocket_connections", "Open dataset recording WebSocket connections."
+)
+DB_POOL_CHECKOUT_DURATION = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "Time to get a connection from the async pool, including opening one.",
+    buckets=POOL_WAIT_BUCKETS,
+)
+FFMPEG_JOB_DURATION = Histogram(
+    "ffmpeg_job_duration_seconds",
+    "Duration of the ffmpeg conversions of recorded videos.",
+    ("outcome",),
+    buckets=FFMPEG_BUCKETS,
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware that times every HTTP request by route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # Unmatched paths share one label so they cannot blow up the
+            # number of series.
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status),
+            )
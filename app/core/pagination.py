@@ -0,0 +1,133 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is the sort key of the last row on a page, serialised as JSON and
+base64-encoded so clients treat it as an opaque token. The next page is read
+with a ``WHERE (sort key) < / > (cursor)`` condition instead of OFFSET, so the
+cost of a page does not depend on how deep the client has paged.
+"""
+
+import base64
+import binascii
+import datetime
+import json
+from typing import (
+    Any,
+    Callable,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Integer sort keys are integer (int4) columns; anything outside this range
+# would fail as a query parameter instead of matching no rows.
+_MIN_INT = -(2**31)
+_MAX_INT = 2**31 - 1
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    # None when this is the last page.
+    next_cursor: Optional[str] = None
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor was not produced by ``encode_cursor``."""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    """Encodes a row's sort key as an opaque cursor."""
+    raw = json.dumps([_encode_value(v) for v in key], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _is_a(value: Any, expected: Type) -> bool:
+    if expected is int:
+        # bool is an int subclass, and JSON true/false are not IDs.
+        return (
+            isinstance(value, int)
+            and not isinstance(value, bool)
+            and _MIN_INT <= value <= _MAX_INT
+        )
+    if expected is datetime.datetime:
+        # The sort keys are naive (Asia/Manila wall-clock) DateTime columns.
+        return isinstance(value, datetime.datetime) and value.tzinfo is None
+    return isinstance(value, expected)
+
+
+def decode_cursor(cursor: str, types: Sequence[Type]) -> List[Any]:
+    """
+    Decodes a cursor back into a sort key whose values have the given
+    ``types``, e.g. ``(datetime.datetime, int)``. A cursor of another shape
+    raises InvalidCursorError rather than reaching the query.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(key, list) or len(key) != len(types):
+            raise InvalidCursorError("Malformed cursor")
+        values = [_decode_value(v) for v in key]
+    except InvalidCursorError:
+        raise
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as exc:
+        raise InvalidCursorError("Malformed cursor") from exc
+    if not all(_is_a(value, expected) for value, expected in zip(values, types)):
+        raise InvalidCursorError("Malformed cursor")
+    return values
+
+
+def split_page(
+    rows: Sequence[T], limit: int, key: Callable[[T], Sequence[Any]]
+) -> Tuple[List[T], Optional[str]]:
+    """
+    Splits ``limit + 1`` fetched rows into the page and the cursor for the next
+    one. Fetching one extra row tells us whether there is a next page without a
+    COUNT query.
+    """
+    items = list(rows[:limit])
+    if len(rows) <= limit:
+        return items, None
+    return items, encode_cursor(key(items[-1]))
+
+
+def decode_cursor_or_400(
+    cursor: Optional[str], types: Sequence[Type]
+) -> Optional[List[Any]]:
+    """Route helper: decodes an optional cursor, answering 400 if it is invalid."""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor, types)
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def page_size(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)) -> int:
+    """Dependency for the page size query parameter."""
+    return limit
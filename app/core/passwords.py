@@ -0,0 +1,129 @@
+"""
+Password hashing on a dedicated, bounded process pool.
+
+bcrypt is deliberately CPU-heavy. Running it in the request thread pool let a
+burst of logins starve every other request of threads and CPU, so it runs in
+a small pool of worker processes instead:
+
+- ``PASSWORD_HASH_WORKERS`` processes do the hashing.
+- At most ``PASSWORD_HASH_QUEUE_SIZE`` further calls wait for a worker.
+- A call that cannot finish within ``PASSWORD_HASH_TIMEOUT_SECONDS``
+  (waiting included) is answered with 503 and ``Retry-After``.
+
+This module is imported by the worker processes, so it only depends on
+passlib and the settings.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+_pool: Optional[ProcessPoolExecutor] = None
+# Created on first use so it binds to the running event loop.
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verifies a plain-text password against a hashed one."""
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def hash_password(password: str) -> str:
+    """Hashes a plain-text password."""
+    return pwd_context.hash(password)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn, not fork: the parent has an event loop and DB pools that must
+        # not be duplicated into the workers.
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(
+            settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE
+        )
+    return _slots
+
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Password service is busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def _run(fn, *args):
+    global _pool
+    deadline = time.monotonic() + settings.PASSWORD_HASH_TIMEOUT_SECONDS
+    slots = _get_slots()
+    try:
+        await asyncio.wait_for(
+            slots.acquire(), timeout=settings.PASSWORD_HASH_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        raise _busy()
+
+    try:
+        future = asyncio.get_running_loop().run_in_executor(_get_pool(), fn, *args)
+    except BrokenProcessPool:
+        slots.release()
+        _pool = None
+        raise _busy()
+    # The slot is held until the worker is really done, even if this request
+    # gives up first, so timed-out calls cannot pile up behind the pool.
+    future.add_done_callback(lambda _: slots.release())
+
+    try:
+        return await asyncio.wait_for(
+            asyncio.shield(future), timeout=max(0.0, deadline - time.monotonic())
+        )
+    except asyncio.TimeoutError:
+        raise _busy()
+    except BrokenProcessPool:
+        # A worker died; start a fresh pool for the next call.
+        _pool = None
+        raise _busy()
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the password pool."""
+    return await _run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the password pool."""
+    return await _run(verify_password, plain_password, hashed_password)
+
+
+def start_password_pool():
+    """Starts the worker processes up front so the first login does not wait."""
+    pool = _get_pool()
+    for _ in range(settings.PASSWORD_HASH_WORKERS):
+        pool.submit(int)
+
+
+def shutdown_password_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
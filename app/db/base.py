@@ -1,22 +1,26 @@
 from app.db.database import Base
 
-from app.features.users.models import User, Onboarding, UserProblem
+from app.features.users.models import User, Onboarding, UserProblem, RefreshToken
 from app.features.sessions.models import (
     Session,
     SessionRequirement,
     ExerciseSet,
     Repetition,
 )
-from app.features.exercises.models import Exercise
+from app.features.exercises.models import Exercise, ExerciseCatalogVersion
+from app.features.progress.models import DailyProgress
 
 _ = [
     User,
     Onboarding,
     UserProblem,
+    RefreshToken,
     Session,
     SessionRequirement,
     ExerciseSet,
     Repetition,
     Exercise,
+    ExerciseCatalogVersion,
+    DailyProgress,
     Base,
 ]
@@ -1,12 +1,64 @@
+import time
+
+from fastapi import Depends, Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT_DURATION
+from app.db.query_stats import instrument_engine
 
-engine = create_engine(url=settings.database_url, echo=True)
+# Statements are timed per request and slow ones are logged (sampled) by
+# app.db.query_stats; SQL_ECHO brings back the full statement log.
+engine = create_engine(url=settings.database_url, echo=settings.SQL_ECHO)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The async engine talks to the same database through asyncpg, so DB-bound
+# routes await the round trip instead of holding a worker thread for it.
+async_database_url = make_url(settings.database_url).set(
+    drivername="postgresql+asyncpg"
+)
+
+
+class TimedAsyncPool(AsyncAdaptedQueuePool):
+    """The default async pool, recording how long each checkout takes."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_POOL_CHECKOUT_DURATION.observe(time.perf_counter() - start)
+
+
+async_engine = create_async_engine(
+    async_database_url, echo=settings.SQL_ECHO, poolclass=TimedAsyncPool
+)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+# Reads that can tolerate replication lag go to READ_DATABASE_URL when it is
+# set; otherwise ReadSessionLocal shares the primary's engine and pool.
+if settings.read_database_url:
+    read_async_engine = create_async_engine(
+        make_url(settings.read_database_url).set(drivername="postgresql+asyncpg"),
+        echo=settings.SQL_ECHO,
+        poolclass=TimedAsyncPool,
+    )
+    instrument_engine(read_async_engine.sync_engine)
+else:
+    read_async_engine = async_engine
+ReadSessionLocal = async_sessionmaker(
+    bind=read_async_engine, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
@@ -16,3 +68,33 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Requests with these methods only read, so they can use the replica.
+READ_ONLY_METHODS = {"GET", "HEAD"}
+
+
+async def get_primary_db():
+    """Session on the primary, whatever the request method."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_db(
+    request: Request, primary_db: AsyncSession = Depends(get_primary_db)
+):
+    """
+    Session routed by the request method: GET and HEAD read from the replica,
+    everything else uses the primary. A GET that must see writes made just
+    before it (by itself or by the client's previous request) depends on
+    get_primary_db instead.
+
+    The primary session is the request's shared get_primary_db one (sessions
+    only connect when first used), so a route and its auth dependency still
+    share a connection.
+    """
+    if request.method in READ_ONLY_METHODS and read_async_engine is not async_engine:
+        async with ReadSessionLocal() as db:
+            yield db
+    else:
+        yield primary_db
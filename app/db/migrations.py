@@ -0,0 +1,95 @@
+"""
+Brings the database schema up to date when the app starts.
+
+Every worker checks the Alembic revision once at startup; when the database
+is already at head, that check is all it does. Otherwise the workers take
+turns under a Postgres advisory lock, and the ones that get it after the work
+is done find the database current and stop:
+
+- an empty database gets its tables from the models and is stamped at head
+  (the oldest migrations expect tables the models created, so they cannot
+  build a database from nothing);
+- a database behind head is upgraded.
+
+Both run in the lock's transaction, together with the default exercise seed
+(see ``alembic/env.py``). A database whose tables were created before it was
+managed by Alembic only gets missing tables and the seed, plus a warning; a
+revision this code does not know (a newer deploy migrated it) is left alone.
+"""
+
+import logging
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from alembic.util import CommandError
+from sqlalchemy import func, inspect, select
+
+from app.db.base import Base
+from app.db.database import engine
+from app.features.exercises.crud import seed_exercises
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+# Key of the transaction-level advisory lock the workers take turns on.
+MIGRATION_LOCK_ID = 4_715_021_963
+
+
+def _current_revision(connection):
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def prepare_database() -> str:
+    """
+    Checks the schema and migrates or creates it if needed. Returns what was
+    done: "current", "created", "upgraded", "unmanaged" or "unknown".
+    """
+    config = Config(str(ALEMBIC_INI))
+    script = ScriptDirectory.from_config(config)
+    head = script.get_current_head()
+
+    with engine.connect() as connection:
+        if _current_revision(connection) == head:
+            return "current"
+
+        connection.execute(select(func.pg_advisory_xact_lock(MIGRATION_LOCK_ID)))
+        current = _current_revision(connection)
+        # env.py runs the migrations on this connection, inside the lock.
+        config.attributes["connection"] = connection
+
+        if current == head:
+            outcome = "current"
+        elif current is None and not inspect(connection).get_table_names():
+            Base.metadata.create_all(connection)
+            command.stamp(config, "head")
+            outcome = "created"
+        elif current is None:
+            Base.metadata.create_all(connection)
+            seed_exercises(connection)
+            logger.warning(
+                "The database has no Alembic revision; if its schema matches "
+                "the models, run `alembic stamp head`"
+            )
+            outcome = "unmanaged"
+        else:
+            try:
+                script.get_revision(current)
+            except CommandError:
+                logger.warning(
+                    "Database revision %s is not in this version's migrations; "
+                    "leaving the schema alone",
+                    current,
+                )
+                outcome = "unknown"
+            else:
+                command.upgrade(config, "head")
+                outcome = "upgraded"
+
+        connection.commit()
+
+    if outcome != "current":
+        logger.warning("Database schema %s (head %s)", outcome, head)
+    return outcome
@@ -0,0 +1,134 @@
+"""
+Monthly partitions of sessions, exercise_sets and repetitions.
+
+The three tables are range-partitioned on the session's start time:
+sessions on datetime_start, exercise_sets and repetitions on session_start,
+a copy of it. A session and everything recorded in it therefore live in the
+same month's partitions, and a query bounded on the start time only reads
+the months it covers.
+
+Postgres has no default partition here, so a row for a month without a
+partition is rejected. Each app process creates the partitions for the
+current month and the next PARTITION_MONTHS_AHEAD months at startup and
+then once a day; a check that finds them all present is a single catalog
+query. Loading older data (a restore, benchmarks.synthetic_data) calls
+ensure_partitions for its range first.
+"""
+
+import asyncio
+import logging
+import re
+from datetime import date, datetime
+from typing import List
+
+from sqlalchemy import func, select, text
+from zoneinfo import ZoneInfo
+
+from app.core.config import settings
+from app.db.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> partition key column.
+PARTITIONED_TABLES = {
+    "sessions": "datetime_start",
+    "exercise_sets": "session_start",
+    "repetitions": "session_start",
+}
+# Key of the transaction-level advisory lock held while partitions are created.
+PARTITION_LOCK_ID = 4_715_021_964
+CHECK_INTERVAL_SECONDS = 24 * 60 * 60
+# The names partition_name() gives, and the ones Postgres derives from them
+# for the partitions' indexes and constraints.
+_PARTITION_NAME = re.compile(
+    r"^(?:%s)_\d{4}_\d{2}(?:_|$)" % "|".join(PARTITIONED_TABLES)
+)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def is_partition_name(name: str) -> bool:
+    """Whether ``name`` is a monthly partition or one of its indexes."""
+    return _PARTITION_NAME.match(name) is not None
+
+
+def _existing_partitions(connection) -> set:
+    rows = connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = ANY(:tables)"
+        ),
+        {"tables": list(PARTITIONED_TABLES)},
+    )
+    return set(rows.scalars())
+
+
+def ensure_partitions(connection, first: date, last: date) -> List[str]:
+    """
+    Creates every missing monthly partition from the month of ``first`` to the
+    month of ``last`` (inclusive) and returns their names. Runs in the
+    caller's transaction; concurrent callers take turns on an advisory lock.
+    """
+    months = []
+    month = month_start(first)
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    wanted = [(table, month) for month in months for table in PARTITIONED_TABLES]
+
+    existing = _existing_partitions(connection)
+    if all(partition_name(*item) in existing for item in wanted):
+        return []
+
+    connection.execute(select(func.pg_advisory_xact_lock(PARTITION_LOCK_ID)))
+    existing = _existing_partitions(connection)
+    created = []
+    for table, month in wanted:
+        name = partition_name(table, month)
+        if name in existing:
+            continue
+        connection.execute(
+            text(
+                f"CREATE TABLE {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+            )
+        )
+        created.append(name)
+    return created
+
+
+def ensure_upcoming_partitions() -> List[str]:
+    """Partitions for this month and the next PARTITION_MONTHS_AHEAD months."""
+    this_month = month_start(datetime.now(ZoneInfo("Asia/Manila")).date())
+    with engine.begin() as connection:
+        created = ensure_partitions(
+            connection,
+            this_month,
+            add_months(this_month, settings.PARTITION_MONTHS_AHEAD),
+        )
+    if created:
+        logger.info("Created partitions %s", ", ".join(created))
+    return created
+
+
+async def keep_partitions_ahead():
+    """Re-runs ensure_upcoming_partitions once a day, for long-lived workers."""
+    while True:
+        await asyncio.sleep(CHECK_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(ensure_upcoming_partitions)
+        except Exception:
+            logger.exception("Could not create upcoming partitions")
@@ -0,0 +1,180 @@
+"""
+Per-request SQL statistics and sampled slow-query logging.
+
+Engine events time every statement. While a request is in flight,
+QueryStatsMiddleware keeps a QueryStats for it in a context variable, so
+statements run anywhere on its behalf (the request's session, extra sessions
+opened for asyncio.gather, threadpool work) are counted against it. When the
+request finishes, its numbers are added to the totals for its route.
+
+With ``SQL_DEBUG_HEADERS`` on, responses carry the request's numbers as
+``X-DB-Query-Count``, ``X-DB-Time-Ms`` and ``X-DB-Slowest-Ms``. Statements at
+or over ``SLOW_QUERY_THRESHOLD_MS`` are logged for a
+``SLOW_QUERY_LOG_SAMPLE_RATE`` fraction of occurrences.
+"""
+
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+from app.core.metrics import CallbackMetric
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Statements run for one request."""
+
+    __slots__ = ("count", "seconds", "slowest_seconds", "slowest_statement")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+
+class RouteQueryStats:
+    """Totals over every request a route has served in this worker."""
+
+    __slots__ = (
+        "requests",
+        "statements",
+        "seconds",
+        "max_statements",
+        "slowest_seconds",
+        "slowest_statement",
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.statements = 0
+        self.seconds = 0.0
+        self.max_statements = 0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def add(self, stats: QueryStats):
+        self.requests += 1
+        self.statements += stats.count
+        self.seconds += stats.seconds
+        self.max_statements = max(self.max_statements, stats.count)
+        if stats.slowest_seconds > self.slowest_seconds:
+            self.slowest_seconds = stats.slowest_seconds
+            self.slowest_statement = stats.slowest_statement
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_routes: Dict[str, RouteQueryStats] = {}
+
+
+def route_query_stats() -> Dict[str, Dict]:
+    """Per-route totals, keyed on "METHOD /path/{template}"."""
+    return {
+        route: {
+            "requests": stats.requests,
+            "statements": stats.statements,
+            "statements_per_request": round(stats.statements / stats.requests, 2),
+            "max_statements": stats.max_statements,
+            "db_time_ms": round(stats.seconds * 1000, 2),
+            "db_time_ms_per_request": round(stats.seconds * 1000 / stats.requests, 2),
+            "slowest_ms": round(stats.slowest_seconds * 1000, 2),
+            "slowest_statement": stats.slowest_statement,
+        }
+        for route, stats in sorted(_routes.items())
+    }
+
+
+def _route_totals(attribute: str) -> Dict[tuple, float]:
+    return {
+        tuple(route.split(" ", 1)): getattr(stats, attribute)
+        for route, stats in list(_routes.items())
+    }
+
+
+CallbackMetric(
+    "db_statements_total",
+    "SQL statements run while serving each route.",
+    lambda: _route_totals("statements"),
+    labelnames=("method", "route"),
+    kind="counter",
+)
+CallbackMetric(
+    "db_statement_duration_seconds_total",
+    "Time spent in SQL statements while serving each route.",
+    lambda: _route_totals("seconds"),
+    labelnames=("method", "route"),
+    kind="counter",
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - context._query_started_at
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, seconds)
+    if (
+        seconds * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS
+        and random.random() < settings.SLOW_QUERY_LOG_SAMPLE_RATE
+    ):
+        logger.warning("Slow query (%.1f ms): %s", seconds * 1000, statement)
+
+
+def instrument_engine(engine):
+    """Times the statements of a (sync) engine; pass ``.sync_engine`` for async."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware that collects a QueryStats per HTTP request."""
+
+    def __init__(self, app, debug_headers: bool = False):
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(stats.count)
+                headers["X-DB-Time-Ms"] = f"{stats.seconds * 1000:.2f}"
+                headers["X-DB-Slowest-Ms"] = f"{stats.slowest_seconds * 1000:.2f}"
+            await send(message)
+
+        try:
+            await self.app(
+                scope, receive, send_with_headers if self.debug_headers else send
+            )
+        finally:
+            _current.reset(token)
+            # The router stores the matched route in the scope; requests that
+            # matched nothing (404s, static files) are not tracked.
+            route = scope.get("route")
+            if route is not None:
+                key = f"{scope['method']} {route.path}"
+                _routes.setdefault(key, RouteQueryStats()).add(stats)
@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import ReadSessionLocal, get_async_db
+from app.security import get_current_active_user
+from app.features.sessions import crud as sessions_crud
+from app.features.sessions import schemas as sessions_schemas
+from app.features.sessions.routes import session_shape
+from app.features.users import crud as users_crud
+from app.features.users import schemas as users_schemas
+
+router = APIRouter(prefix="/users", tags=["Dashboard"])
+
+_user_json = TypeAdapter(users_schemas.UserOut)
+_onboarding_json = TypeAdapter(Optional[users_schemas.OnboardingOut])
+_requirements_json = TypeAdapter(List[sessions_schemas.SessionRequirementOut])
+_problems_json = TypeAdapter(List[users_schemas.UserProblemOut])
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+
+
+def _parse_if_none_match(header: Optional[str]) -> set:
+    if not header:
+        return set()
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+async def _read_on_own_session(read, **kwargs):
+    """Runs one read on its own replica session, and so its own connection."""
+    async with ReadSessionLocal() as db:
+        return await read(db, **kwargs)
+
+
+@router.get("/me/dashboard")
+async def get_dashboard(
+    sessions: sessions_schemas.SessionTimeFilter = sessions_schemas.SessionTimeFilter.today,
+    shape: sessions_crud.SessionShape = Depends(session_shape),
+    if_none_match: Optional[str] = Header(None),
+    current_user: users_schemas.UserOut = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Everything the app needs on launch in one call: the user (with onboarding),
+    session requirements, problems and the sessions for the `sessions` time
+    filter (which also takes the `fields`/`include` parameters).
+
+    The user is authenticated once, and the remaining sections are queried
+    concurrently: one on the request's session, the others on their own
+    sessions, so no section waits for another.
+
+    Each section carries its own ETag and the document has a combined one.
+    Send the ETags you hold in `If-None-Match`: sections that still match come
+    back as `{"etag": ..., "not_modified": true}` without data, and if the
+    combined ETag matches the response is 304.
+    """
+    user_id = current_user.id
+    requirements, problems, session_items = await asyncio.gather(
+        sessions_crud.get_user_session_requirements(db, user_id=user_id),
+        _read_on_own_session(users_crud.get_user_problems, user_id=user_id),
+        _read_on_own_session(
+            sessions_crud.get_completed_sessions_json,
+            user_id=user_id,
+            date_range=sessions_crud.time_filter_range(sessions.value),
+            shape=shape,
+        ),
+    )
+
+    # The user and onboarding come from the authentication lookup itself.
+    sections: Dict[str, bytes] = {
+        "user": _user_json.dump_json(current_user),
+        "onboarding": _onboarding_json.dump_json(current_user.onboarding_data),
+        "requirements": _requirements_json.dump_json(requirements),
+        "problems": _problems_json.dump_json(problems),
+        "sessions": f"[{','.join(session_items)}]".encode(),
+    }
+    etags = {name: _etag(body) for name, body in sections.items()}
+    document_etag = _etag("".join(etags.values()).encode())
+
+    known = _parse_if_none_match(if_none_match)
+    if document_etag in known:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": document_etag},
+        )
+
+    parts = []
+    for name, body in sections.items():
+        etag = json.dumps(etags[name])
+        if etags[name] in known:
+            parts.append(f'"{name}":{{"etag":{etag},"not_modified":true}}'.encode())
+        else:
+            parts.append(f'"{name}":{{"etag":{etag},"data":'.encode() + body + b"}")
+    body = (
+        b'{"etag":'
+        + json.dumps(document_etag).encode()
+        + b',"sections":{'
+        + b",".join(parts)
+        + b"}}"
+    )
+    return Response(
+        content=body, media_type="application/json", headers={"ETag": document_etag}
+    )
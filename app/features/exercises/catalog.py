@@ -0,0 +1,115 @@
+"""
+In-process cache of the exercises table.
+
+The table holds a handful of seeded rows and almost never changes, so each
+worker keeps it in memory, indexed by id and by name. Every exercise write
+bumps ``exercise_catalog_version`` in the same transaction; a worker checks
+that counter at most once per ``EXERCISE_CATALOG_TTL_SECONDS`` and reloads
+when it moved, so writes made through another worker show up within the TTL.
+The worker that made the write invalidates its own copy immediately.
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from . import models, schemas
+
+_exercise_list = TypeAdapter(List[schemas.ExerciseOut])
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+class ExerciseCatalog:
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._exercises: List[schemas.ExerciseOut] = []
+        self._by_id: Dict[int, schemas.ExerciseOut] = {}
+        self._by_name: Dict[str, schemas.ExerciseOut] = {}
+        self._all_json = b"[]"
+        self._all_etag = _etag(self._all_json)
+        self._version: Optional[int] = None
+        self._checked_at = float("-inf")
+        # Created on first use so it binds to the running event loop.
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def _current_version(self, db: AsyncSession) -> int:
+        return await db.scalar(
+            select(func.coalesce(func.max(models.ExerciseCatalogVersion.version), 0))
+        )
+
+    async def load(self, db: AsyncSession):
+        """(Re)loads every exercise. Called at startup and when stale."""
+        # Read the version first: the rows read after it are at least that new.
+        version = await self._current_version(db)
+        result = await db.scalars(select(models.Exercise).order_by(models.Exercise.id))
+        exercises = [schemas.ExerciseOut.model_validate(row) for row in result.all()]
+
+        self._exercises = exercises
+        self._by_id = {exercise.id: exercise for exercise in exercises}
+        self._by_name = {exercise.name: exercise for exercise in exercises}
+        self._all_json = _exercise_list.dump_json(exercises)
+        self._all_etag = _etag(self._all_json)
+        self._version = version
+        self._checked_at = time.monotonic()
+
+    async def refresh(self, db: AsyncSession):
+        """Reloads if the TTL elapsed and the version moved (or never loaded)."""
+        if (
+            self._version is not None
+            and time.monotonic() - self._checked_at < self.ttl_seconds
+        ):
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Another request may have refreshed while we waited.
+            if (
+                self._version is not None
+                and time.monotonic() - self._checked_at < self.ttl_seconds
+            ):
+                return
+            if (
+                self._version is None
+                or await self._current_version(db) != self._version
+            ):
+                await self.load(db)
+            else:
+                self._checked_at = time.monotonic()
+
+    def invalidate(self):
+        """Forces a reload on next use. Call after a committed exercise write."""
+        self._version = None
+
+    async def get(
+        self, db: AsyncSession, exercise_id: int
+    ) -> Optional[schemas.ExerciseOut]:
+        await self.refresh(db)
+        return self._by_id.get(exercise_id)
+
+    async def get_by_name(
+        self, db: AsyncSession, name: str
+    ) -> Optional[schemas.ExerciseOut]:
+        await self.refresh(db)
+        return self._by_name.get(name)
+
+    async def all_json(
+        self, db: AsyncSession, skip: int = 0, limit: int = 100
+    ) -> Tuple[bytes, str]:
+        """Serialised ``List[ExerciseOut]`` for a slice, with its strong ETag."""
+        await self.refresh(db)
+        if skip == 0 and limit >= len(self._exercises):
+            return self._all_json, self._all_etag
+        body = _exercise_list.dump_json(self._exercises[skip : skip + limit])
+        return body, _etag(body)
+
+
+exercise_catalog = ExerciseCatalog(ttl_seconds=settings.EXERCISE_CATALOG_TTL_SECONDS)
@@ -1,5 +1,11 @@
+from typing import Union
+
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import delete, exists, insert, literal, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from . import models, schemas
 
 DEFAULT_EXERCISES = [
@@ -9,67 +15,101 @@ DEFAULT_EXERCISES = [
 ]
 
 
-def seed_exercises(db: Session):
+def seed_exercises(db: Union[Session, Connection]):
     """
-    Ensures the default exercises exist with the expected IDs.
-    If an exercise with a given ID already exists, it is left untouched.
+    Ensures the default exercises exist with the expected IDs, in one
+    multi-row upsert; exercises that already exist are left untouched.
     The caller manages the transaction (commit/rollback).
     """
-    for exercise in DEFAULT_EXERCISES:
-        existing = (
-            db.query(models.Exercise)
-            .filter(models.Exercise.id == exercise["id"])
-            .first()
+    db.execute(
+        pg_insert(models.Exercise)
+        .values(DEFAULT_EXERCISES)
+        .on_conflict_do_nothing(index_elements=["id"])
+    )
+    # The rows above use explicit IDs, so move the id sequence past them or the
+    # next POST /exercises/ collides with a seeded row.
+    db.execute(
+        text(
+            "SELECT setval(pg_get_serial_sequence('exercises', 'id'), "
+            "(SELECT max(id) FROM exercises))"
         )
-        if existing:
-            continue
-        db.execute(
-            text(
-                "INSERT INTO exercises (id, name) VALUES (:id, :name) "
-                "ON CONFLICT (id) DO NOTHING"
-            ),
-            exercise,
+    )
+
+
+async def _write_exercise(db: AsyncSession, stmt):
+    """
+    Runs an INSERT/UPDATE/DELETE ... RETURNING on exercises together with the
+    catalog version bump that marks every worker's cached catalog as stale.
+    Both are one statement, and the version only moves when a row was written.
+    """
+    written = stmt.returning(*models.Exercise.__table__.c).cte("written_exercise")
+    version = models.ExerciseCatalogVersion.__table__.c.version
+    bump = (
+        pg_insert(models.ExerciseCatalogVersion)
+        .from_select(
+            ["id", "version"],
+            select(literal(1), literal(1)).where(exists(select(written.c.id))),
         )
+        .on_conflict_do_update(index_elements=["id"], set_={"version": version + 1})
+        .cte("catalog_version")
+    )
+    return await db.scalar(
+        select(aliased(models.Exercise, written)).add_cte(bump),
+        execution_options={"populate_existing": True},
+    )
 
 
 # --- READ ---
 
 
-def get_exercise(db: Session, exercise_id: int):
+async def get_exercise(db: AsyncSession, exercise_id: int):
     """
     Fetches a single exercise by its primary key ID.
     Returns the SQLAlchemy model instance or None if not found.
     """
-    return db.query(models.Exercise).filter(models.Exercise.id == exercise_id).first()
+    return await db.scalar(
+        select(models.Exercise).filter(models.Exercise.id == exercise_id)
+    )
 
 
-def get_exercise_by_name(db: Session, name: str):
+async def get_exercise_by_name(db: AsyncSession, name: str):
     """
     Fetches a single exercise by its unique name.
     Returns the SQLAlchemy model instance or None if not found.
     """
-    return db.query(models.Exercise).filter(models.Exercise.name == name).first()
+    return await db.scalar(select(models.Exercise).filter(models.Exercise.name == name))
 
 
-def get_all_exercises(db: Session, skip: int = 0, limit: int = 100):
+async def get_all_exercises(db: AsyncSession, skip: int = 0, limit: int = 100):
     """
     Fetches a list of all exercises with pagination.
     """
-    return db.query(models.Exercise).offset(skip).limit(limit).all()
+    result = await db.scalars(select(models.Exercise).offset(skip).limit(limit))
+    return result.all()
 
 
 # --- CREATE ---
 
 
-def create_exercise(db: Session, exercise: schemas.ExerciseCreate):
+async def create_exercise(db: AsyncSession, exercise: schemas.ExerciseCreate):
     """
-    Creates a new exercise record in the database.
+    Creates a new exercise record in the database. Returns None, without
+    writing anything, when an exercise with the name already exists.
     """
-    db_exercise = models.Exercise(name=exercise.name)
-
-    db.add(db_exercise)
-    db.commit()
-    db.refresh(db_exercise)
+    # INSERT ... SELECT ... WHERE NOT EXISTS keeps the name check, the insert
+    # and the catalog version bump in one statement.
+    db_exercise = await _write_exercise(
+        db,
+        insert(models.Exercise).from_select(
+            ["name"],
+            select(literal(exercise.name)).where(
+                ~exists().where(models.Exercise.name == exercise.name)
+            ),
+        ),
+    )
+    if db_exercise is None:
+        return None
+    await db.commit()
 
     return db_exercise
 
@@ -77,24 +117,23 @@ def create_exercise(db: Session, exercise: schemas.ExerciseCreate):
 # --- UPDATE ---
 
 
-def update_exercise(
-    db: Session, exercise_id: int, exercise_update: schemas.ExerciseUpdate
+async def update_exercise(
+    db: AsyncSession, exercise_id: int, exercise_update: schemas.ExerciseUpdate
 ):
     """
     Updates an existing exercise in the database.
     """
-    db_exercise = get_exercise(db, exercise_id=exercise_id)
-
-    if not db_exercise:
-        return None
-
     update_data = exercise_update.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_exercise(db, exercise_id=exercise_id)
 
-    for key, value in update_data.items():
-        setattr(db_exercise, key, value)
-
-    db.commit()
-    db.refresh(db_exercise)
+    db_exercise = await _write_exercise(
+        db,
+        update(models.Exercise)
+        .where(models.Exercise.id == exercise_id)
+        .values(**update_data),
+    )
+    await db.commit()
 
     return db_exercise
 
@@ -102,16 +141,13 @@ def update_exercise(
 # --- DELETE ---
 
 
-def delete_exercise(db: Session, exercise_id: int):
+async def delete_exercise(db: AsyncSession, exercise_id: int):
     """
     Deletes an exercise from the database.
     """
-    db_exercise = get_exercise(db, exercise_id=exercise_id)
-
-    if not db_exercise:
-        return None
-
-    db.delete(db_exercise)
-    db.commit()
+    db_exercise = await _write_exercise(
+        db, delete(models.Exercise).where(models.Exercise.id == exercise_id)
+    )
+    await db.commit()
 
     return db_exercise
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import BigInteger, Column, Integer, String
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 
@@ -10,11 +10,32 @@ class Exercise(Base):
     name = Column(String, nullable=False)
 
     user_problem = relationship(
-        "UserProblem", back_populates="exercise", cascade="all, delete-orphan"
+        "UserProblem",
+        back_populates="exercise",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     session_requirement = relationship(
-        "SessionRequirement", back_populates="exercise", cascade="all, delete-orphan"
+        "SessionRequirement",
+        back_populates="exercise",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     session = relationship(
-        "Session", back_populates="exercise", cascade="all, delete-orphan"
+        "Session",
+        back_populates="exercise",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
+
+
+class ExerciseCatalogVersion(Base):
+    """
+    Single-row counter bumped by every exercise write. Workers compare it with
+    the version of their in-process catalog to know when to reload.
+    """
+
+    __tablename__ = "exercise_catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
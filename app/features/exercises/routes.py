@@ -1,66 +1,95 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from app.db.database import get_db
+from app.db.database import get_async_db
 from . import crud, schemas
+from .catalog import exercise_catalog
 
 router = APIRouter(prefix="/exercises", tags=["Exercises"])
 
 
+def _none_match(if_none_match: str, etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches the ETag, per RFC 9110: "*"
+    matches any representation, and the list of entity tags is compared
+    weakly, so a W/ prefix on either side is ignored.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == opaque:
+            return True
+    return False
+
+
 @router.post(
     "/", response_model=schemas.ExerciseOut, status_code=status.HTTP_201_CREATED
 )
-def create_new_exercise(
-    exercise: schemas.ExerciseCreate, db: Session = Depends(get_db)
+async def create_new_exercise(
+    exercise: schemas.ExerciseCreate, db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new exercise.
     """
-    db_exercise = crud.get_exercise_by_name(db, name=exercise.name)
-    if db_exercise:
+    created_exercise = await crud.create_exercise(db=db, exercise=exercise)
+    if created_exercise is None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="An exercise with this name already exists.",
         )
-    return crud.create_exercise(db=db, exercise=exercise)
+    exercise_catalog.invalidate()
+    return created_exercise
 
 
 @router.get("/all", response_model=List[schemas.ExerciseOut])
-def get_all_exercises_route(
-    skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
+async def get_all_exercises_route(
+    skip: int = 0,
+    limit: int = 100,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Retrieve a list of all exercises.
+
+    Served from the in-process catalog with a strong ETag; a matching
+    If-None-Match gets a 304.
     """
-    exercises = crud.get_all_exercises(db=db, skip=skip, limit=limit)
-    return exercises
+    body, etag = await exercise_catalog.all_json(db, skip=skip, limit=limit)
+    headers = {"ETag": etag}
+    if if_none_match and _none_match(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/{exercise_id}", response_model=schemas.ExerciseOut)
-def get_exercise_by_id_route(exercise_id: int, db: Session = Depends(get_db)):
+async def get_exercise_by_id_route(
+    exercise_id: int, db: AsyncSession = Depends(get_async_db)
+):
     """
     Retrieve a single exercise by its ID.
     """
-    db_exercise = crud.get_exercise(db, exercise_id=exercise_id)
-    if db_exercise is None:
+    exercise = await exercise_catalog.get(db, exercise_id=exercise_id)
+    if exercise is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Exercise with ID {exercise_id} not found.",
         )
-    return db_exercise
+    return exercise
 
 
 @router.put("/{exercise_id}", response_model=schemas.ExerciseOut)
-def update_exercise_route(
+async def update_exercise_route(
     exercise_id: int,
     exercise_update: schemas.ExerciseUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Update an existing exercise's details.
     """
-    updated_exercise = crud.update_exercise(
+    updated_exercise = await crud.update_exercise(
         db, exercise_id=exercise_id, exercise_update=exercise_update
     )
     if updated_exercise is None:
@@ -68,20 +97,24 @@ def update_exercise_route(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Exercise with ID {exercise_id} not found.",
         )
+    exercise_catalog.invalidate()
 
     return updated_exercise
 
 
 @router.delete("/{exercise_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_exercise_route(exercise_id: int, db: Session = Depends(get_db)):
+async def delete_exercise_route(
+    exercise_id: int, db: AsyncSession = Depends(get_async_db)
+):
     """
     Delete an exercise.
     """
-    deleted_exercise = crud.delete_exercise(db, exercise_id=exercise_id)
+    deleted_exercise = await crud.delete_exercise(db, exercise_id=exercise_id)
     if deleted_exercise is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Exercise with ID {exercise_id} not found.",
         )
+    exercise_catalog.invalidate()
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,224 @@
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import Float, and_, case, cast, distinct, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from zoneinfo import ZoneInfo
+
+from app.features.sessions.models import ExerciseSet, Repetition, Session
+from . import models
+
+_COUNTERS = (
+    "session_count",
+    "completed_set_count",
+    "rep_count",
+    "quality_score_sum",
+    "quality_score_count",
+    "session_error_count",
+    "rep_error_count",
+)
+
+
+def manila_today() -> date:
+    """Current Asia/Manila calendar day, the unit the aggregates are kept in."""
+    return datetime.now(ZoneInfo("Asia/Manila")).date()
+
+
+# ==================================
+#        AGGREGATE MAINTENANCE
+# ==================================
+
+
+def _is_set(column, counts):
+    """1 when the session counts and column is not NULL, else 0."""
+    return counts * case((column.is_not(None), 1), else_=0)
+
+
+def upsert_session_change(previous, written):
+    """
+    INSERT ... SELECT ... ON CONFLICT DO UPDATE that moves one session's
+    contribution to its day's row from what it was to what it is: previous and
+    written are the session row before and after an update (CTEs of the same
+    statement). A session counts only while it is completed, so the change
+    adds it, removes it, or adjusts its scores.
+
+    The caller runs it as part of the session update, so the aggregate changes
+    commit or roll back together with the session update that triggered them.
+    """
+    was = case((previous.c.is_completed.is_(True), 1), else_=0)
+    now = case((written.c.is_completed.is_(True), 1), else_=0)
+    change = now - was
+
+    contribution = (
+        select(
+            written.c.user_id,
+            written.c.exercise_id,
+            written.c.session_date,
+            change,
+            change
+            * func.count(
+                distinct(case((ExerciseSet.is_completed.is_(True), ExerciseSet.id)))
+            ),
+            change * func.count(Repetition.id),
+            now * func.coalesce(written.c.session_quality_score, 0.0)
+            - was * func.coalesce(previous.c.session_quality_score, 0.0),
+            _is_set(written.c.session_quality_score, now)
+            - _is_set(previous.c.session_quality_score, was),
+            _is_set(written.c.error_flag, now) - _is_set(previous.c.error_flag, was),
+            change * func.count(Repetition.error_flag),
+        )
+        .select_from(written.join(previous, previous.c.id == written.c.id))
+        .outerjoin(
+            ExerciseSet,
+            and_(
+                ExerciseSet.session_id == written.c.id,
+                ExerciseSet.session_start == written.c.datetime_start,
+            ),
+        )
+        .outerjoin(
+            Repetition,
+            and_(
+                Repetition.set_id == ExerciseSet.id,
+                Repetition.session_start == written.c.datetime_start,
+            ),
+        )
+        .where(or_(previous.c.is_completed.is_(True), written.c.is_completed.is_(True)))
+        .group_by(
+            *(
+                row.c[name]
+                for row in (written, previous)
+                for name in (
+                    "id",
+                    "user_id",
+                    "exercise_id",
+                    "session_date",
+                    "is_completed",
+                    "session_quality_score",
+                    "error_flag",
+                )
+            )
+        )
+    )
+    return _add_to_days(contribution)
+
+
+def upsert_content_change(session_id: int, changes):
+    """
+    INSERT ... SELECT ... ON CONFLICT DO UPDATE that adds a change to one
+    session's sets or repetitions to its day's row, if the session is already
+    completed; until then, completing it counts them. changes has a row per
+    written set or repetition: its session_start and how much it changed some
+    of completed_set_count, rep_count and rep_error_count.
+
+    Like upsert_session_change, the caller runs it as part of the write.
+    """
+    totals = {
+        name: func.sum(changes.c[name]) for name in _COUNTERS if name in changes.c
+    }
+    contribution = (
+        select(
+            Session.user_id,
+            Session.exercise_id,
+            Session.session_date,
+            *(totals.get(name, literal(0)) for name in _COUNTERS),
+        )
+        .select_from(changes)
+        .join(
+            Session,
+            and_(
+                Session.id == session_id,
+                Session.datetime_start == changes.c.session_start,
+            ),
+        )
+        .where(Session.is_completed.is_(True))
+        .group_by(Session.user_id, Session.exercise_id, Session.session_date)
+        .having(or_(*(total != 0 for total in totals.values())))
+    )
+    return _add_to_days(contribution)
+
+
+def _add_to_days(contribution):
+    """Adds (user_id, exercise_id, day, *_COUNTERS) rows to the daily rows."""
+    stmt = pg_insert(models.DailyProgress).from_select(
+        ["user_id", "exercise_id", "day", *_COUNTERS], contribution
+    )
+    table = models.DailyProgress.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.exercise_id, table.c.day],
+        set_={name: table.c[name] + stmt.excluded[name] for name in _COUNTERS},
+    )
+
+
+# ==================================
+#            SUMMARY READS
+# ==================================
+
+
+def _mean_quality(sum_column, count_column):
+    return (cast(sum_column, Float) / func.nullif(count_column, 0)).label(
+        "mean_quality_score"
+    )
+
+
+async def get_daily_progress(
+    db: AsyncSession,
+    user_id: int,
+    start: date,
+    end: date,
+    exercise_id: Optional[int] = None,
+):
+    """One row per exercise and active day in [start, end]."""
+    progress = models.DailyProgress
+    stmt = (
+        select(
+            progress.exercise_id,
+            progress.day,
+            progress.session_count,
+            progress.completed_set_count,
+            progress.rep_count,
+            _mean_quality(progress.quality_score_sum, progress.quality_score_count),
+            progress.session_error_count,
+            progress.rep_error_count,
+        )
+        .filter(
+            progress.user_id == user_id,
+            progress.day >= start,
+            progress.day <= end,
+            progress.session_count > 0,
+        )
+        .order_by(progress.day, progress.exercise_id)
+    )
+    if exercise_id is not None:
+        stmt = stmt.filter(progress.exercise_id == exercise_id)
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def get_progress_summary(db: AsyncSession, user_id: int, start: date, end: date):
+    """Totals per exercise over [start, end], summed from the daily rows."""
+    progress = models.DailyProgress
+    result = await db.execute(
+        select(
+            progress.exercise_id,
+            func.count().label("active_days"),
+            func.sum(progress.session_count).label("session_count"),
+            func.sum(progress.completed_set_count).label("completed_set_count"),
+            func.sum(progress.rep_count).label("rep_count"),
+            _mean_quality(
+                func.sum(progress.quality_score_sum),
+                func.sum(progress.quality_score_count),
+            ),
+            func.sum(progress.session_error_count).label("session_error_count"),
+            func.sum(progress.rep_error_count).label("rep_error_count"),
+        )
+        .filter(
+            progress.user_id == user_id,
+            progress.day >= start,
+            progress.day <= end,
+            progress.session_count > 0,
+        )
+        .group_by(progress.exercise_id)
+        .order_by(progress.exercise_id)
+    )
+    return result.all()
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Date, Float, ForeignKey, Integer
+
+from app.db.database import Base
+
+
+class DailyProgress(Base):
+    """
+    Per-user, per-exercise, per-day totals of completed sessions. Maintained
+    incrementally by the sessions CRUD when a session is completed (and when
+    sets or repetitions of a completed one are written), so progress views
+    read one row per day instead of every set and repetition.
+    """
+
+    __tablename__ = "daily_progress"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    exercise_id = Column(
+        Integer, ForeignKey("exercises.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Asia/Manila calendar day, same as sessions.session_date.
+    day = Column(Date, primary_key=True)
+
+    session_count = Column(Integer, nullable=False, default=0)
+    completed_set_count = Column(Integer, nullable=False, default=0)
+    rep_count = Column(Integer, nullable=False, default=0)
+    # Mean quality is quality_score_sum / quality_score_count, kept as two
+    # columns so it can be updated without re-reading the sessions.
+    quality_score_sum = Column(Float, nullable=False, default=0)
+    quality_score_count = Column(Integer, nullable=False, default=0)
+    session_error_count = Column(Integer, nullable=False, default=0)
+    rep_error_count = Column(Integer, nullable=False, default=0)
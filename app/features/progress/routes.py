@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_async_db
+from . import crud, schemas
+from app.features.users import crud as users_crud
+
+router = APIRouter(prefix="/users", tags=["Progress"])
+
+# Default window when the client does not pass one.
+DEFAULT_RANGE_DAYS = 30
+# Longest window a single request may cover.
+MAX_RANGE_DAYS = 366
+
+
+def _resolve_range(start: Optional[date], end: Optional[date]) -> Tuple[date, date]:
+    end = end or crud.manila_today()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must not be after end",
+        )
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {MAX_RANGE_DAYS} days",
+        )
+    return start, end
+
+
+@router.get("/{user_id}/progress/daily", response_model=List[schemas.DailyProgressOut])
+async def get_daily_progress(
+    user_id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    exercise_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Per-day totals of completed sessions for a user, read from the daily
+    aggregates. Dates are Asia/Manila calendar days and both ends are
+    inclusive; the default is the last 30 days.
+    """
+    start, end = _resolve_range(start, end)
+    if not await users_crud.user_exists(db, user_id=user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    return await crud.get_daily_progress(
+        db, user_id=user_id, start=start, end=end, exercise_id=exercise_id
+    )
+
+
+@router.get(
+    "/{user_id}/progress/summary",
+    response_model=List[schemas.ExerciseProgressSummary],
+)
+async def get_progress_summary(
+    user_id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Per-exercise totals over a date range, read from the daily aggregates.
+    """
+    start, end = _resolve_range(start, end)
+    if not await users_crud.user_exists(db, user_id=user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    return await crud.get_progress_summary(db, user_id=user_id, start=start, end=end)
@@ -0,0 +1,26 @@
+import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ProgressTotals(BaseModel):
+    session_count: int
+    completed_set_count: int
+    rep_count: int
+    mean_quality_score: Optional[float] = None
+    session_error_count: int
+    rep_error_count: int
+
+    class Config:
+        from_attributes = True
+
+
+class DailyProgressOut(ProgressTotals):
+    exercise_id: int
+    day: datetime.date
+
+
+class ExerciseProgressSummary(ProgressTotals):
+    exercise_id: int
+    active_days: int
@@ -1,82 +1,267 @@
-from datetime import datetime, timezone, timedelta
-from sqlalchemy.orm import Session, selectinload
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import (
+    Boolean,
+    Float,
+    Integer,
+    String,
+    Text,
+    and_,
+    case,
+    cast,
+    column,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    true,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from . import models, schemas
+from app.core.pagination import split_page
+from app.features.progress import crud as progress_crud
+from app.features.users.models import User
 from zoneinfo import ZoneInfo
 
+
+# Writes below are single INSERT/UPDATE/DELETE ... RETURNING statements. The
+# returned rows are the committed state, so nothing is re-read after commit.
+_RETURNING = {"populate_existing": True}
+_EMPTY_JSON_ARRAY = literal_column("'[]'::json")
+
+
+def _manila_now() -> datetime:
+    """Current Asia/Manila wall-clock time, naive to match the DateTime columns."""
+    return datetime.now(ZoneInfo("Asia/Manila")).replace(tzinfo=None)
+
+
+# sessions, exercise_sets and repetitions are partitioned by month of the
+# session's start (app.db.partitions). Joins between them also match on it, so
+# Postgres only reads the partitions of the session's month.
+
+
+def _sets_of_session(session):
+    return and_(
+        models.ExerciseSet.session_id == session.id,
+        models.ExerciseSet.session_start == session.datetime_start,
+    )
+
+
+def _repetitions_of_set(exercise_set):
+    return and_(
+        models.Repetition.set_id == exercise_set.id,
+        models.Repetition.session_start == exercise_set.session_start,
+    )
+
+
+def _day_starts(start: date, end: date) -> Tuple[datetime, datetime]:
+    """Start times of the sessions of local days in [start, end), half-open."""
+    return datetime.combine(start, time.min), datetime.combine(end, time.min)
+
+
+def _starts_within(column, starts: Optional[Tuple[datetime, datetime]]):
+    if starts is None:
+        return true()
+    return and_(column >= starts[0], column < starts[1])
+
+
+def _session_day_filter(start: date, end: date):
+    """
+    Sessions whose local day is in [start, end). session_date serves the
+    partial index; the same bound on datetime_start prunes partitions.
+    """
+    return (
+        models.Session.session_date >= start,
+        models.Session.session_date < end,
+        _starts_within(models.Session.datetime_start, _day_starts(start, end)),
+    )
+
+
+# ==================================
+#      NESTED PATH RESOLUTION
+# ==================================
+
+
+SESSION_FIELDS = (
+    "id",
+    "user_id",
+    "exercise_id",
+    "datetime_start",
+    "datetime_end",
+    "is_completed",
+    "session_quality_score",
+    "error_flag",
+)
+
+
+class SessionShape(NamedTuple):
+    """Which parts of SessionOut a read should build."""
+
+    # Session columns, in SessionOut order. Always contains "id".
+    fields: Tuple[str, ...] = SESSION_FIELDS
+    include_sets: bool = True
+    include_repetitions: bool = True
+
+
+FULL_SESSION_SHAPE = SessionShape()
+
+
+class SessionPath(NamedTuple):
+    """IDs found along a /users/{user_id}/sessions/... path; None where missing."""
+
+    user_id: int
+    session_id: Optional[int]
+    set_id: Optional[int]
+    repetition_id: Optional[int]
+
+
+async def resolve_session_path(
+    db: AsyncSession,
+    user_id: int,
+    session_id: int,
+    set_id: Optional[int] = None,
+    repetition_id: Optional[int] = None,
+) -> Optional[SessionPath]:
+    """
+    Checks the user -> session -> set -> repetition chain in a single query.
+
+    Each level is outer-joined on its primary key and its parent's ID, so a
+    session owned by another user (or a set from another session) resolves to
+    None at that level. Returns None when the user itself does not exist.
+    """
+    session_join = and_(
+        models.Session.id == session_id, models.Session.user_id == User.id
+    )
+    set_join = and_(models.ExerciseSet.id == set_id, _sets_of_session(models.Session))
+    repetition_join = and_(
+        models.Repetition.id == repetition_id,
+        _repetitions_of_set(models.ExerciseSet),
+    )
+
+    stmt = (
+        select(
+            User.id,
+            models.Session.id,
+            models.ExerciseSet.id if set_id is not None else literal(None),
+            models.Repetition.id if repetition_id is not None else literal(None),
+        )
+        .select_from(User)
+        .outerjoin(models.Session, session_join)
+    )
+    if set_id is not None:
+        stmt = stmt.outerjoin(models.ExerciseSet, set_join)
+    if repetition_id is not None:
+        stmt = stmt.outerjoin(models.Repetition, repetition_join)
+
+    row = (await db.execute(stmt.filter(User.id == user_id))).first()
+    return SessionPath(*row) if row else None
+
+
 # ==================================
 #    SESSION REQUIREMENT CRUD
 # ==================================
 
 
-def get_session_requirement(db: Session, requirement_id: int):
+async def get_session_requirement(db: AsyncSession, requirement_id: int):
     """Fetches a single session requirement by its ID."""
-    return (
-        db.query(models.SessionRequirement)
-        .filter(models.SessionRequirement.id == requirement_id)
-        .first()
+    return await db.scalar(
+        select(models.SessionRequirement).filter(
+            models.SessionRequirement.id == requirement_id
+        )
     )
 
 
-def get_user_session_requirements(db: Session, user_id: int):
+async def get_user_session_requirements(db: AsyncSession, user_id: int):
     """Fetches all session requirements for a specific user."""
-    return (
-        db.query(models.SessionRequirement)
-        .filter(models.SessionRequirement.user_id == user_id)
-        .all()
+    result = await db.scalars(
+        select(models.SessionRequirement).filter(
+            models.SessionRequirement.user_id == user_id
+        )
     )
+    return result.all()
 
 
-def create_session_requirement(
-    db: Session, requirement: schemas.SessionRequirementCreate, user_id: int
+async def create_session_requirement(
+    db: AsyncSession, requirement: schemas.SessionRequirementCreate, user_id: int
 ):
-    """Creates a new SessionRequirement for a user and exercise."""
-    existing_req = (
-        db.query(models.SessionRequirement)
-        .filter(
-            models.SessionRequirement.user_id == user_id,
-            models.SessionRequirement.exercise_id == requirement.exercise_id,
+    """
+    Creates a new SessionRequirement for a user and exercise. Returns None,
+    without writing anything, when the user does not exist or already has a
+    requirement for the exercise.
+    """
+    # INSERT ... SELECT from the user's row, WHERE NOT EXISTS, keeps the user
+    # check, the duplicate check and the insert in one statement.
+    existing_req = select(models.SessionRequirement.id).filter(
+        models.SessionRequirement.user_id == user_id,
+        models.SessionRequirement.exercise_id == requirement.exercise_id,
+    )
+    db_req = await db.scalar(
+        insert(models.SessionRequirement)
+        .from_select(
+            ["number_of_reps", "number_of_sets", "user_id", "exercise_id"],
+            select(
+                literal(requirement.number_of_reps),
+                literal(requirement.number_of_sets),
+                User.id,
+                literal(requirement.exercise_id),
+            ).where(User.id == user_id, ~exists(existing_req)),
         )
-        .first()
+        .returning(models.SessionRequirement),
+        execution_options=_RETURNING,
     )
-    if existing_req:
+    if db_req is None:
         return None
-
-    db_req = models.SessionRequirement(
-        number_of_reps=requirement.number_of_reps,
-        number_of_sets=requirement.number_of_sets,
-        user_id=user_id,
-        exercise_id=requirement.exercise_id,
-    )
-    db.add(db_req)
-    db.commit()
-    db.refresh(db_req)
+    await db.commit()
     return db_req
 
 
-def update_session_requirement(
-    db: Session,
+async def update_session_requirement(
+    db: AsyncSession,
+    user_id: int,
     requirement_id: int,
     requirement_update: schemas.SessionRequirementUpdate,
 ):
-    """Updates the reps or sets for an existing session requirement."""
-    db_req = get_session_requirement(db, requirement_id=requirement_id)
-    if not db_req:
-        return None
+    """
+    Updates the reps or sets for an existing session requirement of the user.
+    Returns None when the user has no requirement with that ID.
+    """
+    owned = [
+        models.SessionRequirement.id == requirement_id,
+        models.SessionRequirement.user_id == user_id,
+    ]
     update_data = requirement_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_req, key, value)
-    db.commit()
-    db.refresh(db_req)
+    if not update_data:
+        return await db.scalar(select(models.SessionRequirement).where(*owned))
+    db_req = await db.scalar(
+        update(models.SessionRequirement)
+        .where(*owned)
+        .values(**update_data)
+        .returning(models.SessionRequirement),
+        execution_options=_RETURNING,
+    )
+    if db_req is None:
+        return None
+    await db.commit()
     return db_req
 
 
-def delete_session_requirement(db: Session, requirement_id: int):
+async def delete_session_requirement(db: AsyncSession, requirement_id: int):
     """Deletes a session requirement."""
-    db_req = get_session_requirement(db, requirement_id=requirement_id)
-    if not db_req:
-        return None
-    db.delete(db_req)
-    db.commit()
+    db_req = await db.scalar(
+        delete(models.SessionRequirement)
+        .where(models.SessionRequirement.id == requirement_id)
+        .returning(models.SessionRequirement)
+    )
+    await db.commit()
     return db_req
 
 
@@ -85,173 +270,766 @@ def delete_session_requirement(db: Session, requirement_id: int):
 # ==================================
 
 
-def create_session(db: Session, user_id: int, exercise_id: int):
-    """Creates a new Session record, linking a user to an exercise."""
-    db_session = models.Session(user_id=user_id, exercise_id=exercise_id, datetime_start=datetime.now(ZoneInfo("Asia/Manila")))
-    db.add(db_session)
-    db.commit()
-    db.refresh(db_session)
+async def create_session(
+    db: AsyncSession,
+    user_id: int,
+    exercise_id: int,
+    path_user_id: Optional[int] = None,
+):
+    """
+    Creates a new Session record, linking a user to an exercise. Returns None,
+    without writing anything, when the user does not exist, or when
+    path_user_id (the user in the route's path) is given and does not exist.
+    """
+    owner = select(User.id, literal(exercise_id), literal(_manila_now())).where(
+        User.id == user_id
+    )
+    if path_user_id is not None and path_user_id != user_id:
+        path_user = aliased(User)
+        owner = owner.where(exists().where(path_user.id == path_user_id))
+    db_session = await db.scalar(
+        insert(models.Session)
+        .from_select(["user_id", "exercise_id", "datetime_start"], owner)
+        .returning(models.Session),
+        execution_options=_RETURNING,
+    )
+    if db_session is None:
+        return None
+    # A brand new session has no sets yet.
+    set_committed_value(db_session, "exercise_sets", [])
+    await db.commit()
     return db_session
 
 
-def get_session(db: Session, session_id: int):
-    """Fetches a single session by its ID, including its sets and reps."""
-    return (
-        db.query(models.Session)
-        .options(selectinload(models.Session.exercise_sets).selectinload(models.ExerciseSet.repetitions))
+async def get_session(db: AsyncSession, session_id: int, user_id: Optional[int] = None):
+    """
+    Fetches a single session by its ID, including its sets and reps. With
+    user_id, sessions of other users are not found.
+    """
+    stmt = (
+        select(models.Session)
+        .options(
+            selectinload(models.Session.exercise_sets).selectinload(
+                models.ExerciseSet.repetitions
+            )
+        )
         .filter(models.Session.id == session_id)
-        .first()
     )
+    if user_id is not None:
+        stmt = stmt.filter(models.Session.user_id == user_id)
+    return await db.scalar(stmt)
 
 
-def get_user_sessions(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+async def get_user_sessions(
+    db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100
+):
     """Fetches all sessions for a specific user."""
-    return (
-        db.query(models.Session)
-        .options(selectinload(models.Session.exercise_sets))
+    result = await db.scalars(
+        select(models.Session)
+        .options(
+            selectinload(models.Session.exercise_sets).selectinload(
+                models.ExerciseSet.repetitions
+            )
+        )
         .filter(models.Session.user_id == user_id)
         .offset(skip)
         .limit(limit)
-        .all()
     )
+    return result.all()
+
 
-# --- REFACTORED FUNCTION ---
-def update_session(db: Session, session_id: int, session_update: schemas.SessionUpdate):
-    """Updates a session, typically called when a session ends."""
-    
-    # Step 1: Fetch the session directly from the database.
-    db_session = db.query(models.Session).filter(models.Session.id == session_id).first()
+def _written_session(stmt):
+    return stmt.returning(*models.Session.__table__.c).cte("written_session")
 
-    # Step 2: If it's not found, return None immediately. This is the source of the 404.
-    if not db_session:
+
+async def _write_session(db: AsyncSession, written, *ctes):
+    """
+    Runs an UPDATE ... RETURNING on sessions (written, from _written_session)
+    joined to the session's sets and repetitions, so the full SessionOut tree
+    comes back in one statement instead of an update followed by a reload. The
+    joins match the written session's datetime_start, so only its month's
+    partitions are read. Further data-modifying CTEs run in the same statement.
+    """
+    written_session = aliased(models.Session, written)
+    rows = (
+        await db.execute(
+            select(written_session, models.ExerciseSet, models.Repetition)
+            .outerjoin(models.ExerciseSet, _sets_of_session(written_session))
+            .outerjoin(models.Repetition, _repetitions_of_set(models.ExerciseSet))
+            .order_by(models.ExerciseSet.id, models.Repetition.id)
+            .add_cte(*ctes),
+            execution_options=_RETURNING,
+        )
+    ).all()
+    if not rows:
         return None
 
-    # Step 3: Apply the updates from the Pydantic model.
+    db_session = rows[0][0]
+    sets: Dict[int, models.ExerciseSet] = {}
+    reps: Dict[int, list] = {}
+    for _, db_set, db_rep in rows:
+        if db_set is None:
+            continue
+        sets.setdefault(db_set.id, db_set)
+        reps.setdefault(db_set.id, [])
+        if db_rep is not None:
+            reps[db_set.id].append(db_rep)
+    for set_id, db_set in sets.items():
+        set_committed_value(db_set, "repetitions", reps[set_id])
+    set_committed_value(db_session, "exercise_sets", list(sets.values()))
+    return db_session
+
+
+async def update_session(
+    db: AsyncSession,
+    user_id: int,
+    session_id: int,
+    session_update: schemas.SessionUpdate,
+):
+    """
+    Updates a session of the user, typically called when a session ends.
+    Returns None when the user has no session with that ID.
+    """
     update_data = session_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_session, key, value)
 
-    # Step 4: Explicitly set the end time if marking as complete.
+    # Explicitly set the end time if marking as complete.
     if session_update.is_completed:
-        db_session.datetime_end = datetime.now(ZoneInfo("Asia/Manila"))
+        update_data["datetime_end"] = _manila_now()
+
+    if not update_data:
+        return await get_session(db, session_id=session_id, user_id=user_id)
 
-    # Step 5: Commit the changes and refresh the object to get the updated state.
-    db.commit()
-    db.refresh(db_session)
-    
+    # The session as it was, locked: its previous completion state decides how
+    # the daily progress aggregates change, and the lock keeps two concurrent
+    # "end" calls from both counting the session (the second one waits and
+    # then sees the first one's update here).
+    previous = (
+        select(models.Session)
+        .where(models.Session.id == session_id, models.Session.user_id == user_id)
+        .with_for_update()
+        .cte("previous_session")
+    )
+    written = _written_session(
+        update(models.Session)
+        .where(
+            models.Session.id == session_id,
+            models.Session.id == previous.c.id,
+            models.Session.datetime_start == previous.c.datetime_start,
+        )
+        .values(**update_data)
+    )
+    # The update, the session's read back and the change to its day's
+    # progress row are all one statement.
+    db_session = await _write_session(
+        db,
+        written,
+        progress_crud.upsert_session_change(previous, written).cte("progress_change"),
+    )
+    if db_session is None:
+        return None
+    await db.commit()
     return db_session
 
 
-def get_sessions_by_date_range(
-    db: Session, user_id: int, start: datetime, end: datetime
+async def get_sessions_by_date_range(
+    db: AsyncSession, user_id: int, start: date, end: date
 ):
-    return (
-        db.query(models.Session)
+    """
+    Completed sessions whose local (Asia/Manila) day falls in [start, end).
+    Filters on the stored session_date so the partial
+    ix_sessions_completed_user_id_session_date index serves the range.
+    """
+    result = await db.scalars(
+        select(models.Session)
         .options(
-            selectinload(models.Session.exercise_sets)
-            .selectinload(models.ExerciseSet.repetitions)
+            selectinload(models.Session.exercise_sets).selectinload(
+                models.ExerciseSet.repetitions
+            )
         )
         .filter(
             models.Session.user_id == user_id,
-            models.Session.datetime_start >= start,
-            models.Session.datetime_start < end,
-            models.Session.is_completed.is_(True)
+            *_session_day_filter(start, end),
+            models.Session.is_completed.is_(True),
         )
-        .all()
+        .order_by(models.Session.session_date, models.Session.id)
     )
+    return result.all()
 
-def get_session_by_id(db: Session, user_id: int, session_id: int):
-    return (
-        db.query(models.Session)
-        .options(selectinload(models.Session.exercise_sets))
+
+async def get_session_by_id(db: AsyncSession, user_id: int, session_id: int):
+    return await db.scalar(
+        select(models.Session)
+        .options(
+            selectinload(models.Session.exercise_sets).selectinload(
+                models.ExerciseSet.repetitions
+            )
+        )
         .filter(
             models.Session.id == session_id,
             models.Session.user_id == user_id,
         )
-        .first()
     )
 
-def get_sessions_today(db: Session, user_id: int):
-    now = datetime.now(timezone.utc)
-    start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    end = start + timedelta(days=1)
-    return get_sessions_by_date_range(db, user_id, start, end)
+
+def today_range() -> Tuple[date, date]:
+    """[start, end) of the current Asia/Manila day."""
+    start = _manila_now().date()
+    return start, start + timedelta(days=1)
 
 
-def get_sessions_yesterday(db: Session, user_id: int):
-    now = datetime.now(timezone.utc)
-    end = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    start = end - timedelta(days=1)
-    return get_sessions_by_date_range(db, user_id, start, end)
+def yesterday_range() -> Tuple[date, date]:
+    end = _manila_now().date()
+    return end - timedelta(days=1), end
 
 
-def get_sessions_this_week(db: Session, user_id: int):
-    now = datetime.now(timezone.utc)
-    start = now - timedelta(days=now.weekday())
-    start = start.replace(hour=0, minute=0, second=0, microsecond=0)
-    end = start + timedelta(days=7)
-    return get_sessions_by_date_range(db, user_id, start, end)
+def this_week_range() -> Tuple[date, date]:
+    today = _manila_now().date()
+    start = today - timedelta(days=today.weekday())
+    return start, start + timedelta(days=7)
 
 
-def get_sessions_this_month(db: Session, user_id: int):
-    now = datetime.now(timezone.utc)
-    start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    if now.month == 12:
-        end = now.replace(year=now.year + 1, month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+def this_month_range() -> Tuple[date, date]:
+    start = _manila_now().date().replace(day=1)
+    if start.month == 12:
+        end = start.replace(year=start.year + 1, month=1)
     else:
-        end = now.replace(month=now.month + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
-    return get_sessions_by_date_range(db, user_id, start, end)
+        end = start.replace(month=start.month + 1)
+    return start, end
+
+
+_TIME_FILTER_RANGES = {
+    "today": today_range,
+    "yesterday": yesterday_range,
+    "this_week": this_week_range,
+    "this_month": this_month_range,
+}
+
 
-def get_all_sessions(db: Session, user_id: int):
+def time_filter_range(time_filter: str) -> Optional[Tuple[date, date]]:
+    """Local-day range for a SessionTimeFilter value; None means all time."""
+    range_fn = _TIME_FILTER_RANGES.get(time_filter)
+    return range_fn() if range_fn else None
+
+
+async def get_sessions_today(db: AsyncSession, user_id: int):
+    return await get_sessions_by_date_range(db, user_id, *today_range())
+
+
+async def get_sessions_yesterday(db: AsyncSession, user_id: int):
+    return await get_sessions_by_date_range(db, user_id, *yesterday_range())
+
+
+async def get_sessions_this_week(db: AsyncSession, user_id: int):
+    return await get_sessions_by_date_range(db, user_id, *this_week_range())
+
+
+async def get_sessions_this_month(db: AsyncSession, user_id: int):
+    return await get_sessions_by_date_range(db, user_id, *this_month_range())
+
+
+def _history_after(after: list):
+    """
+    Rows after the cursor, newest first. Postgres does not prune partitions on
+    the row comparison, hence the plain bound on datetime_start next to it.
+    """
     return (
-        db.query(models.Session)
+        tuple_(models.Session.datetime_start, models.Session.id) < tuple_(*after),
+        models.Session.datetime_start <= after[0],
+    )
+
+
+async def get_session_history(
+    db: AsyncSession, user_id: int, limit: int, after: Optional[list] = None
+):
+    """
+    Returns one page of a user's completed sessions, newest first, plus the
+    cursor for the next page.
+
+    Pages are keyed on (datetime_start, id), which the
+    ix_sessions_user_id_datetime_start_id index serves directly, so a deep page
+    costs the same as the first one.
+    """
+    stmt = (
+        select(models.Session)
         .options(
-            selectinload(models.Session.exercise_sets)
-            .selectinload(models.ExerciseSet.repetitions)
+            selectinload(models.Session.exercise_sets).selectinload(
+                models.ExerciseSet.repetitions
+            )
         )
         .filter(models.Session.user_id == user_id, models.Session.is_completed == True)
-        .all()
+        .order_by(models.Session.datetime_start.desc(), models.Session.id.desc())
+        .limit(limit + 1)
+    )
+    if after is not None:
+        stmt = stmt.filter(*_history_after(after))
+    result = await db.scalars(stmt)
+    return split_page(
+        result.all(), limit, key=lambda session: (session.datetime_start, session.id)
     )
 
 
+# ==================================
+#      SESSION JSON (fast path)
+# ==================================
+#
+# The read endpoints below return SessionOut-shaped JSON built by Postgres
+# (json_build_object / json_agg), so no ORM objects or Pydantic models are
+# created per row. Keys follow the order of the SessionOut fields.
+
+
+def _json_object(**columns):
+    """json_build_object over keyword pairs, keeping the keyword order."""
+    return func.json_build_object(
+        *(part for key, value in columns.items() for part in (key, value))
+    )
+
+
+def _repetitions_json(starts: Optional[Tuple[datetime, datetime]] = None):
+    rep = models.Repetition
+    return (
+        select(
+            func.coalesce(
+                func.json_agg(
+                    aggregate_order_by(
+                        _json_object(
+                            rep_number=rep.rep_number,
+                            rep_quality_score=rep.rep_quality_score,
+                            error_flag=rep.error_flag,
+                            is_completed=rep.is_completed,
+                            id=rep.id,
+                            set_id=rep.set_id,
+                        ),
+                        rep.id,
+                    )
+                ),
+                _EMPTY_JSON_ARRAY,
+            )
+        )
+        .where(
+            _repetitions_of_set(models.ExerciseSet),
+            _starts_within(rep.session_start, starts),
+        )
+        .scalar_subquery()
+    )
+
+
+def _exercise_sets_json(
+    include_repetitions: bool = True,
+    starts: Optional[Tuple[datetime, datetime]] = None,
+):
+    es = models.ExerciseSet
+    columns = dict(
+        set_number=es.set_number,
+        id=es.id,
+        session_id=es.session_id,
+        set_quality_score=es.set_quality_score,
+        is_completed=es.is_completed,
+        error_flag=es.error_flag,
+    )
+    if include_repetitions:
+        columns["repetitions"] = _repetitions_json(starts)
+    return (
+        select(
+            func.coalesce(
+                func.json_agg(aggregate_order_by(_json_object(**columns), es.id)),
+                _EMPTY_JSON_ARRAY,
+            )
+        )
+        .where(
+            _sets_of_session(models.Session),
+            _starts_within(es.session_start, starts),
+        )
+        .scalar_subquery()
+    )
+
+
+def _session_json(
+    shape: SessionShape = FULL_SESSION_SHAPE,
+    starts: Optional[Tuple[datetime, datetime]] = None,
+):
+    """
+    One session as a JSON text column. Only the levels in ``shape`` are part
+    of the SQL, so skipped sets/repetitions are never read or serialised.
+    ``starts`` bounds the sessions' start times when the caller filters on
+    them, so the set and repetition partitions outside it are pruned when
+    the query is planned rather than for every session.
+    """
+    columns = {name: getattr(models.Session, name) for name in shape.fields}
+    if shape.include_sets:
+        columns["exercise_sets"] = _exercise_sets_json(
+            shape.include_repetitions, starts
+        )
+    return cast(_json_object(**columns), Text).label("body")
+
+
+async def get_session_json(
+    db: AsyncSession,
+    user_id: int,
+    session_id: int,
+    shape: SessionShape = FULL_SESSION_SHAPE,
+) -> Optional[str]:
+    """SessionOut JSON for one of the user's sessions, or None."""
+    return await db.scalar(
+        select(_session_json(shape)).filter(
+            models.Session.id == session_id, models.Session.user_id == user_id
+        )
+    )
+
+
+async def get_session_history_json(
+    db: AsyncSession,
+    user_id: int,
+    limit: int,
+    after: Optional[list] = None,
+    shape: SessionShape = FULL_SESSION_SHAPE,
+):
+    """
+    Same page as get_session_history, with each item already serialised to
+    SessionOut JSON by Postgres.
+    """
+    stmt = (
+        select(models.Session.datetime_start, models.Session.id, _session_json(shape))
+        .filter(models.Session.user_id == user_id, models.Session.is_completed == True)
+        .order_by(models.Session.datetime_start.desc(), models.Session.id.desc())
+        .limit(limit + 1)
+    )
+    if after is not None:
+        stmt = stmt.filter(*_history_after(after))
+    rows = (await db.execute(stmt)).all()
+    page, next_cursor = split_page(
+        rows, limit, key=lambda row: (row.datetime_start, row.id)
+    )
+    return [row.body for row in page], next_cursor
+
+
+def _completed_sessions_query(
+    user_id: int,
+    date_range: Optional[Tuple[date, date]],
+    shape: SessionShape,
+):
+    starts = _day_starts(*date_range) if date_range is not None else None
+    stmt = select(_session_json(shape, starts)).filter(
+        models.Session.user_id == user_id, models.Session.is_completed.is_(True)
+    )
+    if date_range is not None:
+        # Served by ix_sessions_completed_user_id_session_date.
+        return stmt.filter(*_session_day_filter(*date_range)).order_by(
+            models.Session.session_date, models.Session.id
+        )
+    return stmt.order_by(models.Session.id)
+
+
+async def get_completed_sessions_json(
+    db: AsyncSession,
+    user_id: int,
+    date_range: Optional[Tuple[date, date]] = None,
+    shape: SessionShape = FULL_SESSION_SHAPE,
+) -> List[str]:
+    """
+    Completed sessions as SessionOut JSON, optionally limited to local days in
+    [start, end). Backs the time-filter endpoint.
+    """
+    result = await db.scalars(_completed_sessions_query(user_id, date_range, shape))
+    return result.all()
+
+
+async def get_all_sessions(db: AsyncSession, user_id: int):
+    result = await db.scalars(
+        select(models.Session)
+        .options(
+            selectinload(models.Session.exercise_sets).selectinload(
+                models.ExerciseSet.repetitions
+            )
+        )
+        .filter(models.Session.user_id == user_id, models.Session.is_completed == True)
+    )
+    return result.all()
+
+
 # ==================================
 #        EXERCISE SET CRUD
 # ==================================
 
 
-def create_exercise_set(
-    db: Session, set_create: schemas.ExerciseSetCreate, session_id: int
+def _owned_session(user_id: int, session_id: int):
+    """The session's ID and partition key, only if the user owns it."""
+    return (
+        select(models.Session.id, models.Session.datetime_start)
+        .where(models.Session.id == session_id, models.Session.user_id == user_id)
+        .subquery("owned_session")
+    )
+
+
+def _owned_set(user_id: int, session_id: int, set_id: int):
+    """The set's ID and partition key, only if it is on the user's session."""
+    return (
+        select(models.ExerciseSet.id, models.ExerciseSet.session_start)
+        .join(models.Session, _sets_of_session(models.Session))
+        .where(
+            models.ExerciseSet.id == set_id,
+            models.Session.id == session_id,
+            models.Session.user_id == user_id,
+        )
+        .subquery("owned_set")
+    )
+
+
+def _counted(condition):
+    return case((condition, 1), else_=0)
+
+
+def _set_progress_change(session_id: int, written):
+    """
+    The change to a completed session's daily progress from updating one of
+    its sets (written): its completion now against before. The rest of the
+    statement sees exercise_sets as it was before the update, so the set
+    joined here is its previous version.
+    """
+    before = aliased(models.ExerciseSet)
+    changes = (
+        select(
+            written.c.session_start,
+            (
+                _counted(written.c.is_completed.is_(True))
+                - _counted(before.is_completed.is_(True))
+            ).label("completed_set_count"),
+        )
+        .select_from(written)
+        .join(
+            before,
+            and_(
+                before.id == written.c.id,
+                before.session_start == written.c.session_start,
+            ),
+        )
+        .subquery("set_changes")
+    )
+    return progress_crud.upsert_content_change(session_id, changes).cte(
+        "progress_change"
+    )
+
+
+def _repetitions_progress_change(session_id: int, written):
+    """
+    The change to a completed session's daily progress from upserting
+    repetitions (written): a rep that did not exist before adds one, and an
+    error flag set or cleared adds or removes a rep error. As for sets, the
+    repetition joined here is its version from before the upsert.
+    """
+    before = aliased(models.Repetition)
+    changes = (
+        select(
+            written.c.session_start,
+            _counted(before.id.is_(None)).label("rep_count"),
+            (
+                _counted(written.c.error_flag.is_not(None))
+                - _counted(before.error_flag.is_not(None))
+            ).label("rep_error_count"),
+        )
+        .select_from(written)
+        .outerjoin(
+            before,
+            and_(
+                before.id == written.c.id,
+                before.session_start == written.c.session_start,
+            ),
+        )
+        .subquery("repetition_changes")
+    )
+    return progress_crud.upsert_content_change(session_id, changes).cte(
+        "progress_change"
+    )
+
+
+def _upsert_exercise_sets(user_id: int, session_id: int, set_numbers):
+    """
+    INSERT ... SELECT of one set per number, on the user's session only, so a
+    missing or foreign session writes nothing. An existing set with the same
+    number in the session is updated in place (a no-op) so RETURNING still
+    yields it.
+    """
+    owned = _owned_session(user_id, session_id)
+    numbers = values(column("set_number", Integer), name="set_numbers").data(
+        [(set_number,) for set_number in set_numbers]
+    )
+    stmt = pg_insert(models.ExerciseSet).from_select(
+        ["session_id", "session_start", "set_number"],
+        select(owned.c.id, owned.c.datetime_start, numbers.c.set_number).select_from(
+            owned.join(numbers, true())
+        ),
+    )
+    return stmt.on_conflict_do_update(
+        constraint="uq_exercise_sets_session_id_set_number",
+        set_={"set_number": stmt.excluded.set_number},
+    )
+
+
+def _written_set(stmt):
+    return stmt.returning(*models.ExerciseSet.__table__.c).cte("written_set")
+
+
+async def _write_set(db: AsyncSession, written, *ctes):
+    """
+    Runs an INSERT/UPDATE ... RETURNING on exercise_sets (written, from
+    _written_set) joined to the set's repetitions, so the full ExerciseSetOut
+    shape comes back in one statement. Further data-modifying CTEs run in the
+    same statement.
+    """
+    written_set = aliased(models.ExerciseSet, written)
+    rows = (
+        await db.execute(
+            select(written_set, models.Repetition)
+            .outerjoin(models.Repetition, _repetitions_of_set(written_set))
+            .order_by(models.Repetition.id)
+            .add_cte(*ctes),
+            execution_options=_RETURNING,
+        )
+    ).all()
+    if not rows:
+        return None
+
+    db_set = rows[0][0]
+    set_committed_value(
+        db_set, "repetitions", [db_rep for _, db_rep in rows if db_rep is not None]
+    )
+    return db_set
+
+
+async def create_exercise_set(
+    db: AsyncSession,
+    user_id: int,
+    session_id: int,
+    set_create: schemas.ExerciseSetCreate,
 ):
-    """Creates a new Set record within a Session."""
-    db_set = models.ExerciseSet(set_number=set_create.set_number, session_id=session_id)
-    db.add(db_set)
-    db.commit()
-    db.refresh(db_set)
+    """
+    Creates a new Set record within a Session of the user. Returns None when
+    the user has no session with that ID.
+    """
+    # A new set is not completed, so the daily progress does not change.
+    db_set = await _write_set(
+        db,
+        _written_set(
+            _upsert_exercise_sets(user_id, session_id, [set_create.set_number])
+        ),
+    )
+    if db_set is None:
+        return None
+    await db.commit()
     return db_set
 
 
-def get_exercise_set(db: Session, set_id: int):
+async def create_exercise_sets(
+    db: AsyncSession,
+    user_id: int,
+    session_id: int,
+    sets: List[schemas.ExerciseSetBulkItem],
+):
+    """
+    Creates (or reuses) every set in the payload and upserts all of their
+    repetitions. The sets upsert runs as a CTE that the repetitions upsert
+    reads its set IDs from, so everything is one statement. Returns None when
+    the user has no session with that ID.
+    """
+    reps_by_set_number: Dict[int, List[schemas.RepetitionCreate]] = {}
+    for item in sets:
+        reps_by_set_number.setdefault(item.set_number, []).extend(item.repetitions)
+
+    written = (
+        _upsert_exercise_sets(user_id, session_id, reps_by_set_number)
+        .returning(*models.ExerciseSet.__table__.c)
+        .cte("written_sets")
+    )
+    written_set = aliased(models.ExerciseSet, written)
+
+    rep_rows = [
+        (set_number, *row)
+        for set_number, reps in reps_by_set_number.items()
+        for row in _repetition_rows(reps)
+    ]
+    if rep_rows:
+        payload = _repetition_values(rep_rows, with_set_number=True)
+        written_reps = (
+            _upsert_repetitions(
+                select(
+                    written.c.id,
+                    written.c.session_start,
+                    *_repetition_columns(payload),
+                ).select_from(
+                    written.join(payload, payload.c.set_number == written.c.set_number)
+                )
+            )
+            .returning(*models.Repetition.__table__.c)
+            .cte("written_reps")
+        )
+        written_rep = aliased(models.Repetition, written_reps)
+        stmt = (
+            select(written_set, written_rep)
+            .outerjoin(written_rep, written_rep.set_id == written_set.id)
+            .order_by(written_set.set_number, written_rep.rep_number)
+            .add_cte(_repetitions_progress_change(session_id, written_reps))
+        )
+    else:
+        stmt = select(written_set, literal(None)).order_by(written_set.set_number)
+
+    rows = (await db.execute(stmt, execution_options=_RETURNING)).all()
+    if not rows:
+        return None
+    await db.commit()
+
+    # Only the rows written here are attached, so no lazy load is triggered.
+    db_sets: Dict[int, models.ExerciseSet] = {}
+    reps_by_set_id: Dict[int, list] = {}
+    for db_set, db_rep in rows:
+        db_sets.setdefault(db_set.id, db_set)
+        reps_by_set_id.setdefault(db_set.id, [])
+        if db_rep is not None:
+            reps_by_set_id[db_set.id].append(db_rep)
+    for set_id, db_set in db_sets.items():
+        set_committed_value(db_set, "repetitions", reps_by_set_id[set_id])
+    return list(db_sets.values())
+
+
+async def get_exercise_set(db: AsyncSession, set_id: int):
     """Fetches a single set by its ID."""
-    return (
-        db.query(models.ExerciseSet)
+    return await db.scalar(
+        select(models.ExerciseSet)
         .options(selectinload(models.ExerciseSet.repetitions))
         .filter(models.ExerciseSet.id == set_id)
-        .first()
     )
 
 
-def update_exercise_set(
-    db: Session, set_id: int, set_update: schemas.ExerciseSetUpdate
+async def update_exercise_set(
+    db: AsyncSession,
+    user_id: int,
+    session_id: int,
+    set_id: int,
+    set_update: schemas.ExerciseSetUpdate,
 ):
-    """Updates a set's quality score or completion status."""
-    db_set = get_exercise_set(db, set_id=set_id)
-    if not db_set:
-        return None
+    """
+    Updates a set's quality score or completion status. Returns None when the
+    set is not on a session of the user.
+    """
+    owned = [
+        models.ExerciseSet.id == set_id,
+        _sets_of_session(models.Session),
+        models.Session.id == session_id,
+        models.Session.user_id == user_id,
+    ]
     update_data = set_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_set, key, value)
-    db.commit()
-    db.refresh(db_set)
+    if not update_data:
+        return await db.scalar(
+            select(models.ExerciseSet)
+            .options(selectinload(models.ExerciseSet.repetitions))
+            .join(models.Session, and_(*owned[1:]))
+            .where(owned[0])
+        )
+    written = _written_set(
+        update(models.ExerciseSet).where(*owned).values(**update_data)
+    )
+    db_set = await _write_set(db, written, _set_progress_change(session_id, written))
+    if db_set is None:
+        return None
+    await db.commit()
     return db_set
 
 
@@ -260,32 +1038,146 @@ def update_exercise_set(
 # ==================================
 
 
-def create_repetition(db: Session, rep_create: schemas.RepetitionCreate, set_id: int):
-    """Creates a new Repetition record within a Set."""
-    db_rep = models.Repetition(
-        set_id=set_id,
-        rep_number=rep_create.rep_number,
-        rep_quality_score=rep_create.rep_quality_score,
-        error_flag=rep_create.error_flag,
-        is_completed=True,
+def _repetition_rows(reps: List[schemas.RepetitionCreate]):
+    """
+    One (rep_number, rep_quality_score, error_flag) row per rep_number, the
+    last one sent winning. A single upsert cannot touch the same row twice, so
+    duplicates inside a payload are folded here.
+    """
+    rows = {}
+    for rep in reps:
+        rows[rep.rep_number] = (rep.rep_number, rep.rep_quality_score, rep.error_flag)
+    return list(rows.values())
+
+
+def _repetition_values(rows, with_set_number: bool = False):
+    """A VALUES list of repetition rows, optionally keyed by their set_number."""
+    columns = [
+        column("rep_number", Integer),
+        column("rep_quality_score", Float),
+        column("error_flag", String),
+    ]
+    if with_set_number:
+        columns.insert(0, column("set_number", Integer))
+    return values(*columns, name="repetition_rows").data(rows)
+
+
+def _repetition_columns(payload):
+    # A VALUES column that is NULL in every row would otherwise be text.
+    return (
+        payload.c.rep_number,
+        cast(payload.c.rep_quality_score, Float),
+        cast(payload.c.error_flag, String),
+        literal(True, Boolean),
+    )
+
+
+def _upsert_repetitions(rows):
+    """
+    INSERT ... SELECT ... for repetitions from (set_id, session_start,
+    rep_number, rep_quality_score, error_flag, is_completed) rows. Re-sending a
+    rep_number for a set overwrites that repetition, which makes client
+    retries idempotent.
+    """
+    stmt = pg_insert(models.Repetition).from_select(
+        [
+            "set_id",
+            "session_start",
+            "rep_number",
+            "rep_quality_score",
+            "error_flag",
+            "is_completed",
+        ],
+        rows,
+    )
+    return stmt.on_conflict_do_update(
+        constraint="uq_repetitions_set_id_rep_number",
+        set_={
+            "rep_quality_score": stmt.excluded.rep_quality_score,
+            "error_flag": stmt.excluded.error_flag,
+            "is_completed": stmt.excluded.is_completed,
+        },
+    )
+
+
+def _upsert_set_repetitions(
+    user_id: int, session_id: int, set_id: int, reps: List[schemas.RepetitionCreate]
+):
+    """
+    The repetitions upsert for a set, writing nothing unless the user owns it,
+    read back together with its change to the daily progress.
+    """
+    owned = _owned_set(user_id, session_id, set_id)
+    payload = _repetition_values(_repetition_rows(reps))
+    written = (
+        _upsert_repetitions(
+            select(
+                owned.c.id, owned.c.session_start, *_repetition_columns(payload)
+            ).select_from(owned.join(payload, true()))
+        )
+        .returning(*models.Repetition.__table__.c)
+        .cte("written_reps")
+    )
+    return select(aliased(models.Repetition, written)).add_cte(
+        _repetitions_progress_change(session_id, written)
+    )
+
+
+async def create_repetition(
+    db: AsyncSession,
+    user_id: int,
+    session_id: int,
+    set_id: int,
+    rep_create: schemas.RepetitionCreate,
+):
+    """
+    Creates a new Repetition record within a Set. Returns None when the set is
+    not on a session of the user.
+    """
+    db_rep = await db.scalar(
+        _upsert_set_repetitions(user_id, session_id, set_id, [rep_create]),
+        execution_options=_RETURNING,
     )
-    db.add(db_rep)
-    db.commit()
-    db.refresh(db_rep)
+    if db_rep is None:
+        return None
+    await db.commit()
     return db_rep
 
 
-def get_single_repetition(db: Session, set_id: int, repetition_id: int):
+async def create_repetitions(
+    db: AsyncSession,
+    user_id: int,
+    session_id: int,
+    set_id: int,
+    reps: List[schemas.RepetitionCreate],
+):
+    """
+    Creates all repetitions for a set with one multi-row upsert. Returns None
+    when the set is not on a session of the user.
+    """
+    result = await db.scalars(
+        _upsert_set_repetitions(user_id, session_id, set_id, reps),
+        execution_options=_RETURNING,
+    )
+    db_reps = sorted(result.all(), key=lambda rep: rep.rep_number)
+    if not db_reps:
+        return None
+    await db.commit()
+    return db_reps
+
+
+async def get_single_repetition(db: AsyncSession, set_id: int, repetition_id: int):
     """Fetches one repetition for a specific set."""
-    return (
-        db.query(models.Repetition)
-        .filter(
+    return await db.scalar(
+        select(models.Repetition).filter(
             models.Repetition.set_id == set_id, models.Repetition.id == repetition_id
         )
-        .first()
     )
 
 
-def get_set_repetitions(db: Session, set_id: int):
+async def get_set_repetitions(db: AsyncSession, set_id: int):
     """Fetches all repetitions for a specific set."""
-    return db.query(models.Repetition).filter(models.Repetition.set_id == set_id).all()
+    result = await db.scalars(
+        select(models.Repetition).filter(models.Repetition.set_id == set_id)
+    )
+    return result.all()
@@ -1,5 +1,19 @@
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Boolean, Float
+from sqlalchemy import (
+    Column,
+    Computed,
+    Date,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+    Boolean,
+    Float,
+    ForeignKeyConstraint,
+    Index,
+    UniqueConstraint,
+    text,
+)
 
 from datetime import datetime
 from zoneinfo import ZoneInfo
@@ -10,24 +24,60 @@ from app.db.database import Base
 class Session(Base):
     __tablename__ = "sessions"
 
-    id = Column(Integer, primary_key=True, nullable=False, index=True)
+    # Partitioned by month of datetime_start (see app.db.partitions), which is
+    # why it is part of the primary key; ids still come from one sequence.
+    id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
     datetime_start = Column(
-        DateTime, default=datetime.now(ZoneInfo("Asia/Manila")), nullable=False
+        DateTime,
+        primary_key=True,
+        default=datetime.now(ZoneInfo("Asia/Manila")),
+        nullable=False,
+    )
+    # datetime_start holds Asia/Manila wall-clock time, so its date part is the
+    # patient's local calendar day. Stored so the day/week/month filters are
+    # plain range scans on an index.
+    session_date = Column(
+        Date, Computed("CAST(datetime_start AS DATE)", persisted=True)
     )
     datetime_end = Column(DateTime, nullable=True)
     is_completed = Column(Boolean, nullable=True)
     session_quality_score = Column(Float, nullable=True)
     error_flag = Column(String, nullable=True)
 
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     exercise_id = Column(
-        Integer, ForeignKey("exercises.id"), nullable=False, index=True
+        Integer,
+        ForeignKey("exercises.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
 
     user = relationship("User", back_populates="sessions")
     exercise = relationship("Exercise", back_populates="session")
     exercise_sets = relationship(
-        "ExerciseSet", back_populates="session", cascade="all, delete-orphan"
+        "ExerciseSet",
+        back_populates="session",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    __table_args__ = (
+        # Serves the keyset-paginated session history.
+        Index(
+            "ix_sessions_user_id_datetime_start_id", "user_id", "datetime_start", "id"
+        ),
+        # Serves the today/yesterday/week/month filters, which only return
+        # completed sessions.
+        Index(
+            "ix_sessions_completed_user_id_session_date",
+            "user_id",
+            "session_date",
+            "id",
+            postgresql_where=text("is_completed IS TRUE"),
+        ),
+        {"postgresql_partition_by": "RANGE (datetime_start)"},
     )
 
 
@@ -38,9 +88,14 @@ class SessionRequirement(Base):
     number_of_reps = Column(Integer, nullable=False)
     number_of_sets = Column(Integer, nullable=False)
 
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     exercise_id = Column(
-        Integer, ForeignKey("exercises.id"), nullable=False, index=True
+        Integer,
+        ForeignKey("exercises.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
 
     user = relationship("User", back_populates="session_requirement")
@@ -49,30 +104,67 @@ class SessionRequirement(Base):
 
 class ExerciseSet(Base):
     __tablename__ = "exercise_sets"
+    __table_args__ = (
+        UniqueConstraint(
+            "session_id",
+            "set_number",
+            "session_start",
+            name="uq_exercise_sets_session_id_set_number",
+        ),
+        ForeignKeyConstraint(
+            ["session_id", "session_start"],
+            ["sessions.id", "sessions.datetime_start"],
+            name="exercise_sets_session_id_fkey",
+            ondelete="CASCADE",
+        ),
+        {"postgresql_partition_by": "RANGE (session_start)"},
+    )
 
-    id = Column(Integer, primary_key=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
     set_number = Column(Integer, nullable=False)
     set_quality_score = Column(Float, nullable=True)
     is_completed = Column(Boolean, nullable=True)
     error_flag = Column(String, nullable=True)
 
-    session_id = Column(Integer, ForeignKey("sessions.id"), nullable=False, index=True)
+    session_id = Column(Integer, nullable=False, index=True)
+    # The session's datetime_start, the partition key of its sets.
+    session_start = Column(DateTime, primary_key=True, nullable=False)
 
     session = relationship("Session", back_populates="exercise_sets")
     repetitions = relationship(
-        "Repetition", back_populates="exercise_set", cascade="all, delete-orphan"
+        "Repetition",
+        back_populates="exercise_set",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
 
 class Repetition(Base):
     __tablename__ = "repetitions"
+    __table_args__ = (
+        UniqueConstraint(
+            "set_id",
+            "rep_number",
+            "session_start",
+            name="uq_repetitions_set_id_rep_number",
+        ),
+        ForeignKeyConstraint(
+            ["set_id", "session_start"],
+            ["exercise_sets.id", "exercise_sets.session_start"],
+            name="repetitions_set_id_fkey",
+            ondelete="CASCADE",
+        ),
+        {"postgresql_partition_by": "RANGE (session_start)"},
+    )
 
-    id = Column(Integer, primary_key=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
     rep_number = Column(Integer, nullable=False)
     rep_quality_score = Column(Float, nullable=True)
     is_completed = Column(Boolean, nullable=True)
     error_flag = Column(String, nullable=True)
 
-    set_id = Column(Integer, ForeignKey("exercise_sets.id"), nullable=False, index=True)
+    set_id = Column(Integer, nullable=False, index=True)
+    # The session's datetime_start, the partition key of its repetitions.
+    session_start = Column(DateTime, primary_key=True, nullable=False)
 
     exercise_set = relationship("ExerciseSet", back_populates="repetitions")
@@ -1,16 +1,105 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from typing import List
-from enum import Enum
+from datetime import datetime
+from typing import List, Optional
+import json
 
-from app.db.database import get_db
+from app.core.pagination import Page, decode_cursor_or_400, page_size
+from app.db.database import get_async_db, get_primary_db
 from . import crud, schemas
 from app.features.users import crud as users_crud
-from app.features.exercises import crud as exercises_crud
+from app.features.exercises.catalog import exercise_catalog
 
 router = APIRouter(prefix="/users", tags=["Session"])
 
+
+async def resolve_path_or_404(
+    db: AsyncSession,
+    user_id: int,
+    session_id: int,
+    set_id: Optional[int] = None,
+    repetition_id: Optional[int] = None,
+    session_detail: str = "Session not found",
+    set_detail: str = "Set not found",
+) -> crud.SessionPath:
+    """
+    Resolves the nested path in one query and raises a 404 for the first
+    missing (or not owned) level.
+    """
+    path = await crud.resolve_session_path(
+        db,
+        user_id=user_id,
+        session_id=session_id,
+        set_id=set_id,
+        repetition_id=repetition_id,
+    )
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    if path.session_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=session_detail
+        )
+    if set_id is not None and path.set_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=set_detail)
+    if repetition_id is not None and path.repetition_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Repetition not found"
+        )
+    return path
+
+
+def json_response(body: str) -> Response:
+    """
+    Sends JSON that was already serialised (by Postgres) as-is. The route's
+    response_model still documents the shape but is not re-validated.
+    """
+    return Response(content=body, media_type="application/json")
+
+
+def session_shape(
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated session fields to return (id is always "
+        "included), e.g. `fields=datetime_start,session_quality_score`.",
+    ),
+    include: Optional[str] = Query(
+        None,
+        description="Nested levels to embed: `sets`, `repetitions` (implies "
+        "sets). Defaults to both; pass `include=` for none.",
+    ),
+) -> crud.SessionShape:
+    """Parses the sparse field and include parameters of the session reads."""
+    shape = crud.FULL_SESSION_SHAPE
+    if fields is not None:
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested - set(crud.SESSION_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown session fields: {', '.join(sorted(unknown))}",
+            )
+        requested.add("id")
+        shape = shape._replace(
+            fields=tuple(name for name in crud.SESSION_FIELDS if name in requested)
+        )
+    if include is not None:
+        levels = {name.strip() for name in include.split(",") if name.strip()}
+        unknown = levels - {"sets", "repetitions"}
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown include values: {', '.join(sorted(unknown))}",
+            )
+        shape = shape._replace(
+            include_sets=bool(levels),
+            include_repetitions="repetitions" in levels,
+        )
+    return shape
+
+
 # ==================================
 #    SESSION REQUIREMENT Routes
 # ==================================
@@ -21,68 +110,74 @@ router = APIRouter(prefix="/users", tags=["Session"])
     response_model=schemas.SessionRequirementOut,
     status_code=status.HTTP_201_CREATED,
 )
-def create_session_requirement_for_user(
+async def create_session_requirement_for_user(
     user_id: int,
     requirement: schemas.SessionRequirementCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Create a new session requirement (reps/sets) for a specific user and exercise.
     """
-    db_user = users_crud.get_user(db, user_id=user_id)
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-
-    db_exercise = exercises_crud.get_exercise(db, exercise_id=requirement.exercise_id)
+    db_exercise = await exercise_catalog.get(db, exercise_id=requirement.exercise_id)
     if not db_exercise:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Exercise not found"
         )
 
-    return crud.create_session_requirement(
+    db_req = await crud.create_session_requirement(
         db=db, requirement=requirement, user_id=user_id
     )
+    if db_req is None:
+        if not await users_crud.user_exists(db, user_id=user_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A session requirement for this exercise already exists",
+        )
+    return db_req
 
 
 @router.get(
     "/{user_id}/requirements", response_model=List[schemas.SessionRequirementOut]
 )
-def get_all_requirements_for_user(user_id: int, db: Session = Depends(get_db)):
+async def get_all_requirements_for_user(
+    user_id: int, db: AsyncSession = Depends(get_async_db)
+):
     """
     Get all session requirements for a specific user.
     """
-    db_user = users_crud.get_user(db, user_id=user_id)
-    if not db_user:
+    if not await users_crud.user_exists(db, user_id=user_id):
         raise HTTPException(status_code=404, detail="User not found")
 
-    return crud.get_user_session_requirements(db=db, user_id=user_id)
+    return await crud.get_user_session_requirements(db=db, user_id=user_id)
 
 
 @router.put(
     "/{user_id}/requirements/{requirement_id}",
     response_model=schemas.SessionRequirementOut,
 )
-def update_user_session_requirement(
+async def update_user_session_requirement(
     user_id: int,
     requirement_id: int,
     requirement_update: schemas.SessionRequirementUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Update the reps or sets for a specific session requirement.
     """
-    db_user = users_crud.get_user(db=db, user_id=user_id)
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-
-    updated_req = crud.update_session_requirement(
-        db, requirement_id=requirement_id, requirement_update=requirement_update
+    updated_req = await crud.update_session_requirement(
+        db,
+        user_id=user_id,
+        requirement_id=requirement_id,
+        requirement_update=requirement_update,
     )
     if updated_req is None:
+        if not await users_crud.user_exists(db, user_id=user_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Session requirement not found",
@@ -100,140 +195,155 @@ def update_user_session_requirement(
     response_model=schemas.SessionOut,
     status_code=status.HTTP_201_CREATED,
 )
-def start_new_session(
-    session: schemas.SessionCreate, user_id: int, db: Session = Depends(get_db)
+async def start_new_session(
+    session: schemas.SessionCreate,
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Starts a new exercise session for a user. The request body must contain
     the user_id and the exercise_id.
     """
-    db_user = users_crud.get_user(db, user_id=user_id)
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User specified for session not found",
-        )
-
-    db_exercise = exercises_crud.get_exercise(db, exercise_id=session.exercise_id)
+    db_exercise = await exercise_catalog.get(db, exercise_id=session.exercise_id)
     if not db_exercise:
+        # A missing user is reported first, as it always was.
+        if not await users_crud.user_exists(db, user_id=user_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User specified for session not found",
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Exercise specified for session not found",
         )
 
-    return crud.create_session(
-        db=db, user_id=session.user_id, exercise_id=session.exercise_id
+    db_session = await crud.create_session(
+        db=db,
+        user_id=session.user_id,
+        exercise_id=session.exercise_id,
+        path_user_id=user_id,
     )
+    if db_session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User specified for session not found",
+        )
+    return db_session
 
 
 @router.put("/{user_id}/sessions/{session_id}/end", response_model=schemas.SessionOut)
-def end_exercise_session(
+async def end_exercise_session(
     session_id: int,
     user_id: int,
     session_update: schemas.SessionUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Marks a session as complete and updates its final scores.
     The request body can contain the final quality score, error flags, etc.
     """
-    db_user = users_crud.get_user(db=db, user_id=user_id)
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-
-    ended_session = crud.update_session(
-        db, session_id=session_id, session_update=session_update
+    ended_session = await crud.update_session(
+        db, user_id=user_id, session_id=session_id, session_update=session_update
     )
     if not ended_session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
-        )
+        await resolve_path_or_404(db, user_id=user_id, session_id=session_id)
     return ended_session
 
 
-@router.get("/{user_id}/sessions/{session_id}", response_model=schemas.SessionOut)
-def get_session_details(session_id: int, user_id: int, db: Session = Depends(get_db)):
+@router.get(
+    "/{user_id}/sessions/history",
+    response_model=Page[schemas.SessionOut],
+)
+async def get_session_history(
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Depends(page_size),
+    shape: crud.SessionShape = Depends(session_shape),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
-
-    Gets all details for a specific session, including its nested sets and repetitions.
+    Returns a user's completed sessions newest first, one page at a time.
+    Pass the returned `next_cursor` back as `cursor` to read the next page.
     """
-    db_user = users_crud.get_user(db=db, user_id=user_id)
-    if not db_user:
+    after = decode_cursor_or_400(cursor, types=(datetime, int))
+    items, next_cursor = await crud.get_session_history_json(
+        db, user_id=user_id, limit=limit, after=after, shape=shape
+    )
+    # Only an empty page needs to tell "no sessions" apart from "no user".
+    if not items and not await users_crud.user_exists(db, user_id=user_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
+    return json_response(
+        f'{{"items":[{",".join(items)}],"next_cursor":{json.dumps(next_cursor)}}}'
+    )
 
-    db_session = crud.get_session(db, session_id=session_id)
-    if not db_session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
-        )
-    return db_session
 
+@router.get("/{user_id}/sessions/{session_id}", response_model=schemas.SessionOut)
+async def get_session_details(
+    session_id: int,
+    user_id: int,
+    shape: crud.SessionShape = Depends(session_shape),
+    db: AsyncSession = Depends(get_primary_db),
+):
+    """
 
-class SessionTimeFilter(str, Enum):
-    today = "today"
-    yesterday = "yesterday"
-    this_week = "this_week"
-    this_month = "this_month"
-    all_time = "all_time"
+    Gets all details for a specific session, including its nested sets and repetitions.
+    """
+    body = await crud.get_session_json(
+        db, user_id=user_id, session_id=session_id, shape=shape
+    )
+    if body is None:
+        await resolve_path_or_404(db, user_id=user_id, session_id=session_id)
+    return json_response(body)
 
 
 @router.get(
     "/{user_id}/sessions/filter/{time_filter}", response_model=List[schemas.SessionOut]
 )
-def get_user_sessions_by_time_range(
+async def get_user_sessions_by_time_range(
     user_id: int,
-    time_filter: SessionTimeFilter,
-    db: Session = Depends(get_db),
+    time_filter: schemas.SessionTimeFilter,
+    shape: crud.SessionShape = Depends(session_shape),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Returns sessions for a user based on the selected time filter.
+    `all_time` returns every completed session in one response; clients that
+    page through long histories should use `/sessions/history` instead.
     """
-    db_user = users_crud.get_user(db=db, user_id=user_id)
-    if not db_user:
+    if not await users_crud.user_exists(db, user_id=user_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    if time_filter == SessionTimeFilter.today:
-        return crud.get_sessions_today(db, user_id)
-    elif time_filter == SessionTimeFilter.yesterday:
-        return crud.get_sessions_yesterday(db, user_id)
-    elif time_filter == SessionTimeFilter.this_week:
-        return crud.get_sessions_this_week(db, user_id)
-    elif time_filter == SessionTimeFilter.this_month:
-        return crud.get_sessions_this_month(db, user_id)
-    elif time_filter == SessionTimeFilter.all_time:
-        return crud.get_all_sessions(db, user_id)
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Invalid time filter"
-        )
+    date_range = crud.time_filter_range(time_filter.value)
+    items = await crud.get_completed_sessions_json(
+        db, user_id=user_id, date_range=date_range, shape=shape
+    )
+    return json_response(f"[{','.join(items)}]")
 
 
 @router.get(
     "/{user_id}/sessions/{session_id}/detail", response_model=schemas.SessionOut
 )
-def get_session_by_id(user_id: int, session_id: int, db: Session = Depends(get_db)):
-    db_user = users_crud.get_user(db=db, user_id=user_id)
-
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-
-    db_session = crud.get_session_by_id(db=db, user_id=user_id, session_id=session_id)
-
-    if not db_session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Session with id {session_id} does not exist",
+async def get_session_by_id(
+    user_id: int,
+    session_id: int,
+    shape: crud.SessionShape = Depends(session_shape),
+    db: AsyncSession = Depends(get_primary_db),
+):
+    body = await crud.get_session_json(
+        db, user_id=user_id, session_id=session_id, shape=shape
+    )
+    if body is None:
+        await resolve_path_or_404(
+            db,
+            user_id=user_id,
+            session_id=session_id,
+            session_detail=f"Session with id {session_id} does not exist",
         )
-
-    return db_session
+    return json_response(body)
 
 
 # ==================================
@@ -246,83 +356,100 @@ def get_session_by_id(user_id: int, session_id: int, db: Session = Depends(get_d
     response_model=schemas.ExerciseSetOut,
     status_code=status.HTTP_201_CREATED,
 )
-def add_set_to_session(
+async def add_set_to_session(
     session_id: int,
     user_id: int,
     set_data: schemas.ExerciseSetCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Creates a new set record and associates it with a session.
     """
-    db_user = users_crud.get_user(db=db, user_id=user_id)
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+    db_set = await crud.create_exercise_set(
+        db=db, user_id=user_id, session_id=session_id, set_create=set_data
+    )
+    if db_set is None:
+        await resolve_path_or_404(
+            db,
+            user_id=user_id,
+            session_id=session_id,
+            session_detail="Session not found to add set to",
         )
+    return db_set
 
-    db_session = crud.get_session(db=db, session_id=session_id)
-    if not db_session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Session not found to add set to",
-        )
 
-    return crud.create_exercise_set(db=db, set_create=set_data, session_id=session_id)
+@router.post(
+    "/{user_id}/sessions/{session_id}/sets/bulk",
+    response_model=List[schemas.ExerciseSetOut],
+    status_code=status.HTTP_201_CREATED,
+)
+async def add_sets_to_session(
+    session_id: int,
+    user_id: int,
+    payload: schemas.ExerciseSetBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Creates several sets, each with its repetitions, in one transaction.
+    Sets and repetitions that already exist (same set_number / rep_number)
+    are reused and updated, so the request can safely be retried.
+    """
+    db_sets = await crud.create_exercise_sets(
+        db=db, user_id=user_id, session_id=session_id, sets=payload.sets
+    )
+    if db_sets is None:
+        await resolve_path_or_404(
+            db,
+            user_id=user_id,
+            session_id=session_id,
+            session_detail="Session not found to add set to",
+        )
+    return db_sets
 
 
 @router.get(
     "/{user_id}/sessions/{session_id}/sets/{set_id}",
     response_model=schemas.ExerciseSetOut,
 )
-def get_exercise_set(
-    set_id: int, user_id: int, session_id: int, db: Session = Depends(get_db)
+async def get_exercise_set(
+    set_id: int,
+    user_id: int,
+    session_id: int,
+    db: AsyncSession = Depends(get_primary_db),
 ):
     """
     Get exercise set information
     """
+    await resolve_path_or_404(db, user_id=user_id, session_id=session_id, set_id=set_id)
 
-    db_user = users_crud.get_user(db=db, user_id=user_id)
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-
-    db_session = crud.get_session(db=db, session_id=session_id)
-    if not db_session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-
-    return crud.get_exercise_set(db=db, set_id=set_id)
+    return await crud.get_exercise_set(db=db, set_id=set_id)
 
 
 @router.put(
     "/{user_id}/sessions/{session_id}/sets/{set_id}",
     response_model=schemas.ExerciseSetOut,
 )
-def update_exercise_set_details(
+async def update_exercise_set_details(
     set_id: int,
     user_id: int,
+    session_id: int,
     set_update: schemas.ExerciseSetUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Updates the details of a specific set (e.g., quality score) after it's completed.
     """
-    db_user = users_crud.get_user(db=db, user_id=user_id)
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
-        )
-
-    updated_set = crud.update_exercise_set(db, set_id=set_id, set_update=set_update)
+    updated_set = await crud.update_exercise_set(
+        db,
+        user_id=user_id,
+        session_id=session_id,
+        set_id=set_id,
+        set_update=set_update,
+    )
     if updated_set is None:
-        raise HTTPException(status_code=404, detail="Set not found")
+        await resolve_path_or_404(
+            db, user_id=user_id, session_id=session_id, set_id=set_id
+        )
     return updated_set
 
 
@@ -336,99 +463,105 @@ def update_exercise_set_details(
     response_model=schemas.RepetitionOut,
     status_code=status.HTTP_201_CREATED,
 )
-def add_repetition_to_set(
+async def add_repetition_to_set(
     set_id: int,
     session_id: int,
     user_id: int,
     rep_data: schemas.RepetitionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Logs a new repetition within a given set, including its quality score and any error flags.
     """
-    db_user = users_crud.get_user(db=db, user_id=user_id)
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+    db_rep = await crud.create_repetition(
+        db=db,
+        user_id=user_id,
+        session_id=session_id,
+        set_id=set_id,
+        rep_create=rep_data,
+    )
+    if db_rep is None:
+        await resolve_path_or_404(
+            db,
+            user_id=user_id,
+            session_id=session_id,
+            set_id=set_id,
+            set_detail="Set not found to add repetition to",
         )
+    return db_rep
 
-    db_session = crud.get_session(db=db, session_id=session_id)
-    if not db_session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
-        )
 
-    db_set = crud.get_exercise_set(db, set_id=set_id)
-    if not db_set:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Set not found to add repetition to",
+@router.post(
+    "/{user_id}/sessions/{session_id}/sets/{set_id}/repetitions/bulk",
+    response_model=List[schemas.RepetitionOut],
+    status_code=status.HTTP_201_CREATED,
+)
+async def add_repetitions_to_set(
+    set_id: int,
+    session_id: int,
+    user_id: int,
+    payload: schemas.RepetitionBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Logs all repetitions of a set at once. Re-sending a rep_number overwrites
+    that repetition instead of creating a duplicate.
+    """
+    db_reps = await crud.create_repetitions(
+        db=db,
+        user_id=user_id,
+        session_id=session_id,
+        set_id=set_id,
+        reps=payload.repetitions,
+    )
+    if db_reps is None:
+        await resolve_path_or_404(
+            db,
+            user_id=user_id,
+            session_id=session_id,
+            set_id=set_id,
+            set_detail="Set not found to add repetition to",
         )
-
-    return crud.create_repetition(db=db, rep_create=rep_data, set_id=set_id)
+    return db_reps
 
 
 @router.get("/{user_id}/sessions/{session_id}/sets/{set_id}/repetitions/all")
-def get_set_repetitions(
-    user_id: int, session_id: int, set_id: int, db: Session = Depends(get_db)
+async def get_set_repetitions(
+    user_id: int,
+    session_id: int,
+    set_id: int,
+    db: AsyncSession = Depends(get_primary_db),
 ):
     """
     Gets all the repetitions for a given set.
     """
+    await resolve_path_or_404(db, user_id=user_id, session_id=session_id, set_id=set_id)
 
-    db_user = users_crud.get_user(db=db, user_id=user_id)
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-
-    db_session = crud.get_session(db=db, session_id=session_id)
-    if not db_session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
-        )
-
-    db_set = crud.get_exercise_set(db, set_id=set_id)
-    if not db_set:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Set not found to add repetition to",
-        )
-
-    return crud.get_set_repetitions(db=db, set_id=set_id)
+    return await crud.get_set_repetitions(db=db, set_id=set_id)
 
 
 @router.get(
     "/{user_id}/sessions/{session_id}/sets/{set_id}/repetitions/{repetition_id}",
     response_model=schemas.RepetitionOut,
 )
-def get_repetition(
+async def get_repetition(
     user_id: int,
     session_id: int,
     set_id: int,
     repetition_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_primary_db),
 ):
     """
     Gets the repetition for a specific set in a given session.
     """
-    db_user = users_crud.get_user(db=db, user_id=user_id)
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-
-    db_session = crud.get_session(db=db, session_id=session_id)
-    if not db_session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
-        )
-
-    db_set = crud.get_exercise_set(db, set_id=set_id)
-    if not db_set:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Set not found to add repetition to",
-        )
+    await resolve_path_or_404(
+        db,
+        user_id=user_id,
+        session_id=session_id,
+        set_id=set_id,
+        repetition_id=repetition_id,
+    )
 
-    return crud.get_single_repetition(db=db, set_id=set_id, repetition_id=repetition_id)
+    return await crud.get_single_repetition(
+        db=db, set_id=set_id, repetition_id=repetition_id
+    )
@@ -1,6 +1,7 @@
 import datetime
+from enum import Enum
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 # ==================================
 #    SESSION REQUIREMENT Schemas
@@ -60,6 +61,11 @@ class RepetitionOut(RepetitionBase):
         from_attributes = True
 
 
+class RepetitionBulkCreate(BaseModel):
+    # Re-sending a rep_number overwrites that repetition instead of duplicating it.
+    repetitions: List[RepetitionCreate] = Field(..., min_length=1, max_length=500)
+
+
 # ==================================
 #        EXERCISE SET Schemas
 # ==================================
@@ -85,6 +91,14 @@ class ExerciseSetOut(ExerciseSetBase):
         from_attributes = True
 
 
+class ExerciseSetBulkItem(ExerciseSetCreate):
+    repetitions: List[RepetitionCreate] = Field(default=[], max_length=500)
+
+
+class ExerciseSetBulkCreate(BaseModel):
+    sets: List[ExerciseSetBulkItem] = Field(..., min_length=1, max_length=50)
+
+
 class ExerciseSetUpdate(BaseModel):
     set_quality_score: Optional[float]
     is_completed: Optional[bool]
@@ -120,3 +134,11 @@ class SessionOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SessionTimeFilter(str, Enum):
+    today = "today"
+    yesterday = "yesterday"
+    this_week = "this_week"
+    this_month = "this_month"
+    all_time = "all_time"
@@ -0,0 +1,108 @@
+"""
+Per-worker cache of authenticated users, keyed on the token subject (email).
+
+get_current_active_user would otherwise load the user and its onboarding on
+every protected request. Entries are UserOut snapshots, never ORM objects, so
+they are safe to share between concurrent requests.
+
+The CRUD functions that change a user or their onboarding invalidate the
+entry in the worker that made the change only. Every other worker keeps
+serving its cached copy until the entry's TTL (USER_CACHE_TTL_SECONDS) runs
+out, with no check against the database. For up to that long after a
+change, requests landing on another worker can see the old profile or
+onboarding, and a deleted user's still-valid access token keeps
+authenticating there. Lower the TTL, or set USER_CACHE_MAX_SIZE to 0, if
+that window is too wide.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import CallbackMetric
+from . import schemas
+
+
+class UserCache:
+    """Bounded LRU with a per-entry TTL. Not thread-safe; one per event loop."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, schemas.UserOut]]" = OrderedDict()
+        # user id -> email, so writes that only know the id can invalidate.
+        self._emails: Dict[int, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, email: str) -> Optional[schemas.UserOut]:
+        entry = self._entries.get(email)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._drop(email)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(email)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, user: schemas.UserOut):
+        if self.max_size <= 0:
+            return
+        self._drop(user.email)
+        self._entries[user.email] = (time.monotonic() + self.ttl_seconds, user)
+        self._emails[user.id] = user.email
+        while len(self._entries) > self.max_size:
+            oldest, (_, evicted) = self._entries.popitem(last=False)
+            self._forget_email(oldest, evicted.id)
+            self.evictions += 1
+
+    def invalidate_user(self, user_id: int):
+        email = self._emails.get(user_id)
+        if email is not None:
+            self._drop(email)
+
+    def clear(self):
+        self._entries.clear()
+        self._emails.clear()
+
+    def _drop(self, email: str):
+        entry = self._entries.pop(email, None)
+        if entry is not None:
+            self._forget_email(email, entry[1].id)
+
+    def _forget_email(self, email: str, user_id: int):
+        if self._emails.get(user_id) == email:
+            del self._emails[user_id]
+
+
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+
+CallbackMetric(
+    "user_cache_entries",
+    "Users in this worker's cache.",
+    lambda: len(user_cache._entries),
+)
+CallbackMetric(
+    "user_cache_hits_total",
+    "Authenticated-user cache hits.",
+    lambda: user_cache.hits,
+    kind="counter",
+)
+CallbackMetric(
+    "user_cache_misses_total",
+    "Authenticated-user cache misses.",
+    lambda: user_cache.misses,
+    kind="counter",
+)
+CallbackMetric(
+    "user_cache_evictions_total",
+    "Users evicted from the cache to make room.",
+    lambda: user_cache.evictions,
+    kind="counter",
+)
@@ -1,136 +1,305 @@
-from sqlalchemy.orm import Session, selectinload
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import delete, exists, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Optional
+
+from app.core.config import settings
+from app.core.pagination import split_page
+from app.features.sessions import models as sessions_models
 from . import models, schemas
+from .cache import user_cache
+
+# Writes below are single INSERT/UPDATE/DELETE ... RETURNING statements. The
+# returned rows are the committed state, so nothing is re-read after commit.
+_RETURNING = {"populate_existing": True}
 
 # ==================================
 #         USER CRUD Functions
 # ==================================
 
 
-def get_user(db: Session, user_id: int):
+async def get_user(db: AsyncSession, user_id: int):
     """Fetches a single user by their ID, eagerly loading their onboarding data."""
-    return (
-        db.query(models.User)
+    return await db.scalar(
+        select(models.User)
         .options(selectinload(models.User.onboarding_data))
         .filter(models.User.id == user_id)
-        .first()
     )
 
 
-def get_user_by_email(db: Session, email: str):
+async def get_user_by_email(db: AsyncSession, email: str):
     """Fetches a single user by their email, eagerly loading their onboarding data."""
-    return (
-        db.query(models.User)
+    return await db.scalar(
+        select(models.User)
         .options(selectinload(models.User.onboarding_data))
         .filter(models.User.email == email)
-        .first()
     )
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
+async def user_exists(db: AsyncSession, user_id: int) -> bool:
+    """Checks that a user exists without loading the row or its onboarding."""
+    return await db.scalar(select(exists().where(models.User.id == user_id)))
+
+
+async def email_registered(db: AsyncSession, email: str) -> bool:
+    """Checks whether an account uses this email, without loading it."""
+    return await db.scalar(select(exists().where(models.User.email == email)))
+
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100):
     """Fetches a list of users with pagination, eagerly loading their onboarding data."""
-    return (
-        db.query(models.User)
+    result = await db.scalars(
+        select(models.User)
         .options(selectinload(models.User.onboarding_data))
         .offset(skip)
         .limit(limit)
-        .all()
     )
+    return result.all()
 
 
-def create_user(db: Session, user: schemas.UserCreate, hashed_password: str):
-    """Creates a new user with a hashed password."""
-    db_user = models.User(
-        first_name=user.first_name,
-        last_name=user.last_name,
-        email=user.email,
-        hashed_password=hashed_password,
-        age=user.age,
-        address=user.address,
-        sex=user.sex,
-        contact_number=user.contact_number,
+async def get_users_page(db: AsyncSession, limit: int, after: Optional[list] = None):
+    """
+    Returns one page of users ordered by id, plus the cursor for the next page.
+    Keyed on the primary key, so every page is an index range scan.
+    """
+    stmt = (
+        select(models.User)
+        .options(selectinload(models.User.onboarding_data))
+        .order_by(models.User.id)
+        .limit(limit + 1)
     )
+    if after is not None:
+        stmt = stmt.filter(models.User.id > after[0])
+    result = await db.scalars(stmt)
+    return split_page(result.all(), limit, key=lambda user: (user.id,))
+
 
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+async def _write_user(db: AsyncSession, stmt):
+    """
+    Runs an UPDATE or DELETE ... RETURNING on users as a CTE joined to the
+    user's onboarding row, so the full UserOut shape comes back in one
+    statement. The join sees the rows as they were before the write, so a
+    deleted user still comes back with the onboarding its delete cascaded to.
+    """
+    written = stmt.returning(*models.User.__table__.c).cte("written_user")
+    written_user = aliased(models.User, written)
+    row = (
+        await db.execute(
+            select(written_user, models.Onboarding).outerjoin(
+                models.Onboarding, models.Onboarding.user_id == written_user.id
+            ),
+            execution_options=_RETURNING,
+        )
+    ).first()
+    if row is None:
+        return None
+    db_user, onboarding = row
+    set_committed_value(db_user, "onboarding_data", onboarding)
     return db_user
 
 
-def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate):
-    """Updates a user's information."""
-    db_user = get_user(db, user_id=user_id)
-    if not db_user:
+def _user_values(user_id: int, model, **values):
+    """
+    A SELECT of `values` (typed after `model`'s columns) that only yields a row
+    when the user exists. INSERT ... SELECT from it checks the user and writes
+    the row in one statement.
+    """
+    columns = model.__table__.c
+    return select(
+        *(literal(value, columns[name].type) for name, value in values.items()),
+        models.User.id,
+    ).where(models.User.id == user_id)
+
+
+async def create_user(db: AsyncSession, user: schemas.UserCreate, hashed_password: str):
+    """
+    Creates a new user with a hashed password. Returns None, without writing
+    anything, when the email is already registered.
+    """
+    db_user = await db.scalar(
+        pg_insert(models.User)
+        .values(
+            first_name=user.first_name,
+            last_name=user.last_name,
+            email=user.email,
+            hashed_password=hashed_password,
+            age=user.age,
+            address=user.address,
+            sex=user.sex,
+            contact_number=user.contact_number,
+        )
+        .on_conflict_do_nothing(index_elements=[models.User.email])
+        .returning(models.User),
+        execution_options=_RETURNING,
+    )
+    if db_user is None:
         return None
+    # A brand new user has no onboarding yet.
+    set_committed_value(db_user, "onboarding_data", None)
+    await db.commit()
+    return db_user
+
+
+async def update_user(db: AsyncSession, user_id: int, user_update: schemas.UserUpdate):
+    """Updates a user's information."""
     update_data = user_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_user, key, value)
-    db.commit()
-    db.refresh(db_user)
+    if not update_data:
+        return await get_user(db, user_id=user_id)
+    db_user = await _write_user(
+        db,
+        update(models.User).where(models.User.id == user_id).values(**update_data),
+    )
+    await db.commit()
+    user_cache.invalidate_user(user_id)
     return db_user
 
 
-def update_user_profile_picture(db: Session, user_id: int, file_path: str):
+async def update_user_profile_picture(db: AsyncSession, user_id: int, file_path: str):
     """Updates the profile picture URL for a user."""
-    db_user = get_user(db, user_id=user_id)
-    if not db_user:
-        return None
-    db_user.profile_picture_url = file_path
-    db.commit()
-    db.refresh(db_user)
+    db_user = await _write_user(
+        db,
+        update(models.User)
+        .where(models.User.id == user_id)
+        .values(profile_picture_url=file_path),
+    )
+    await db.commit()
+    user_cache.invalidate_user(user_id)
     return db_user
 
 
-def delete_user(db: Session, user_id: int):
-    """Deletes a user by their ID."""
-    db_user = get_user(db, user_id=user_id)
-    if not db_user:
+async def delete_user(
+    db: AsyncSession, user_id: int, max_sessions: Optional[int] = None
+):
+    """
+    Deletes a user by their ID. Everything that belongs to the user goes with
+    it through the ON DELETE CASCADE foreign keys, without loading any of it.
+
+    With max_sessions, users with more sessions than that are left alone and
+    None is returned, as for a missing user; the size check is part of the
+    DELETE, so small accounts go in one statement.
+    """
+    stmt = delete(models.User).where(models.User.id == user_id)
+    if max_sessions is not None:
+        stmt = stmt.where(
+            ~exists(
+                select(sessions_models.Session.id)
+                .where(sessions_models.Session.user_id == user_id)
+                .offset(max_sessions)
+            )
+        )
+    db_user = await _write_user(db, stmt)
+    if db_user is None:
         return None
-    db.delete(db_user)
-    db.commit()
+    await db.commit()
+    user_cache.invalidate_user(user_id)
     return db_user
 
 
+async def count_user_sessions(db: AsyncSession, user_id: int, limit: int) -> int:
+    """Counts a user's sessions, stopping at `limit` so huge accounts stay cheap."""
+    sessions = (
+        select(sessions_models.Session.id)
+        .where(sessions_models.Session.user_id == user_id)
+        .limit(limit)
+        .subquery()
+    )
+    return await db.scalar(select(func.count()).select_from(sessions))
+
+
+async def purge_user(db: AsyncSession, user_id: int, batch_size: int):
+    """
+    Deletes a large account in steps: `batch_size` sessions (with their sets
+    and repetitions) per transaction, then the user. Each step is short, so no
+    single statement holds locks or DB time for long. Meant for a background
+    job with its own session, since it commits as it goes.
+    """
+    # No new logins through refresh tokens while the data is going away.
+    await revoke_user_refresh_tokens(db, user_id=user_id)
+    await db.commit()
+    user_cache.invalidate_user(user_id)
+
+    while True:
+        batch = (
+            select(sessions_models.Session.id)
+            .where(sessions_models.Session.user_id == user_id)
+            .order_by(sessions_models.Session.id)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            delete(sessions_models.Session)
+            .where(sessions_models.Session.id.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        if result.rowcount < batch_size:
+            break
+
+    return await delete_user(db, user_id=user_id)
+
+
 # ==================================
 #       ONBOARDING CRUD Functions
 # ==================================
 
 
-def create_user_onboarding(
-    db: Session, onboarding: schemas.OnboardingCreate, user_id: int
+async def create_user_onboarding(
+    db: AsyncSession, onboarding: schemas.OnboardingCreate, user_id: int
 ):
-    existing_onboarding = (
-        db.query(models.Onboarding).filter(models.Onboarding.user_id == user_id).first()
+    """
+    Returns None, without writing anything, when the user does not exist or
+    already has onboarding data.
+    """
+    # onboarding.user_id is unique, so an existing row turns this into a no-op.
+    values = onboarding.model_dump()
+    db_onboarding = await db.scalar(
+        pg_insert(models.Onboarding)
+        .from_select(
+            [*values, "user_id"], _user_values(user_id, models.Onboarding, **values)
+        )
+        .on_conflict_do_nothing(index_elements=[models.Onboarding.user_id])
+        .returning(models.Onboarding),
+        execution_options=_RETURNING,
     )
-    if existing_onboarding:
+    if db_onboarding is None:
         return None
-    db_onboarding = models.Onboarding(**onboarding.model_dump(), user_id=user_id)
-    db.add(db_onboarding)
-    db.commit()
-    db.refresh(db_onboarding)
+    await db.commit()
+    user_cache.invalidate_user(user_id)
     return db_onboarding
 
 
-def get_user_onbaording(db: Session, user_id: int):
-    return (
-        db.query(models.Onboarding).filter(models.Onboarding.user_id == user_id).first()
+async def get_user_onbaording(db: AsyncSession, user_id: int):
+    return await db.scalar(
+        select(models.Onboarding).filter(models.Onboarding.user_id == user_id)
     )
 
 
-def update_user_onboarding(
-    db: Session, user_id: int, onboarding_update: schemas.OnboardingUpdate
+async def update_user_onboarding(
+    db: AsyncSession, user_id: int, onboarding_update: schemas.OnboardingUpdate
 ):
-    db_user_onboarding = get_user_onbaording(db=db, user_id=user_id)
-    if not db_user_onboarding:
-        return None
     updated_onboarding_data = onboarding_update.model_dump(exclude_unset=True)
-    for key, value in updated_onboarding_data.items():
-        setattr(db_user_onboarding, key, value)
-    db.commit()
-    db.refresh(db_user_onboarding)
+    if not updated_onboarding_data:
+        return await get_user_onbaording(db=db, user_id=user_id)
+    db_user_onboarding = await db.scalar(
+        update(models.Onboarding)
+        .where(models.Onboarding.user_id == user_id)
+        .values(**updated_onboarding_data)
+        .returning(models.Onboarding),
+        execution_options=_RETURNING,
+    )
+    await db.commit()
+    user_cache.invalidate_user(user_id)
     return db_user_onboarding
 
 
-def update_onboarding_custom_days(db: Session, user_id: int, days: list[int]):
+async def update_onboarding_custom_days(
+    db: AsyncSession, user_id: int, days: list[int]
+):
     """Validate and update onboarding.custom_allowed_days for a user.
 
     - Ensures onboarding exists
@@ -138,35 +307,48 @@ def update_onboarding_custom_days(db: Session, user_id: int, days: list[int]):
     - Ensures len(days) matches preferred_schedule
     - Stores sorted values
     """
-    db_user_onboarding = get_user_onbaording(db=db, user_id=user_id)
-    if not db_user_onboarding:
-        return None, "Onboarding not found"
-
     if any((not isinstance(d, int)) or d < 0 or d > 6 for d in days):
         return None, "custom_allowed_days must contain integers in range 0–6"
 
-    if len(days) != db_user_onboarding.preferred_schedule:
-        return None, (
-            f"custom_allowed_days length ({len(days)}) must equal preferred_schedule "
-            f"({db_user_onboarding.preferred_schedule})"
-        )
-
     # Optional: ensure distinct values
     if len(set(days)) != len(days):
         return None, "custom_allowed_days must not contain duplicates"
 
-    db_user_onboarding.custom_allowed_days = sorted(days)
-    db.commit()
-    db.refresh(db_user_onboarding)
-    return db_user_onboarding, None
-
+    # The preferred_schedule check is part of the UPDATE, so the happy path is
+    # a single statement; the row is only read when explaining a failure.
+    db_user_onboarding = await db.scalar(
+        update(models.Onboarding)
+        .where(
+            models.Onboarding.user_id == user_id,
+            models.Onboarding.preferred_schedule == len(days),
+        )
+        .values(custom_allowed_days=sorted(days))
+        .returning(models.Onboarding),
+        execution_options=_RETURNING,
+    )
+    if db_user_onboarding:
+        await db.commit()
+        user_cache.invalidate_user(user_id)
+        return db_user_onboarding, None
 
-def delete_user_onboarding(db: Session, user_id: int):
-    db_user_onboarding = get_user_onbaording(db=db, user_id=user_id)
+    db_user_onboarding = await get_user_onbaording(db=db, user_id=user_id)
     if not db_user_onboarding:
-        return None
-    db.delete(db_user_onboarding)
-    db.commit()
+        return None, "Onboarding not found"
+
+    return None, (
+        f"custom_allowed_days length ({len(days)}) must equal preferred_schedule "
+        f"({db_user_onboarding.preferred_schedule})"
+    )
+
+
+async def delete_user_onboarding(db: AsyncSession, user_id: int):
+    db_user_onboarding = await db.scalar(
+        delete(models.Onboarding)
+        .where(models.Onboarding.user_id == user_id)
+        .returning(models.Onboarding)
+    )
+    await db.commit()
+    user_cache.invalidate_user(user_id)
     return db_user_onboarding
 
 
@@ -176,45 +358,188 @@ def delete_user_onboarding(db: Session, user_id: int):
 
 
 # --- FIX IS HERE ---
-def create_user_problem(
-    db: Session, problem: schemas.UserProblemCreate, user_id: int, exercise_id: int
+async def create_user_problem(
+    db: AsyncSession, problem: schemas.UserProblemCreate, user_id: int, exercise_id: int
 ):
+    """Returns None, without writing anything, when the user does not exist."""
     # Now includes exercise_id
-    db_problem = models.UserProblem(
-        **problem.model_dump(), user_id=user_id, exercise_id=exercise_id
+    values = {**problem.model_dump(), "exercise_id": exercise_id}
+    db_problem = await db.scalar(
+        insert(models.UserProblem)
+        .from_select(
+            [*values, "user_id"], _user_values(user_id, models.UserProblem, **values)
+        )
+        .returning(models.UserProblem),
+        execution_options=_RETURNING,
     )
-    db.add(db_problem)
-    db.commit()
-    db.refresh(db_problem)
+    if db_problem is None:
+        return None
+    await db.commit()
     return db_problem
 
 
-def get_user_problems(db: Session, user_id: int):
-    return (
-        db.query(models.UserProblem).filter(models.UserProblem.user_id == user_id).all()
+async def get_user_problems(db: AsyncSession, user_id: int):
+    result = await db.scalars(
+        select(models.UserProblem).filter(models.UserProblem.user_id == user_id)
     )
+    return result.all()
 
 
-def update_user_problem(
-    db: Session, user_id: int, user_problem_update: schemas.UserProblemUpdate
+async def update_user_problem(
+    db: AsyncSession, user_id: int, user_problem_update: schemas.UserProblemUpdate
 ):
-    db_user_problem = get_user(db=db, user_id=user_id)
-    if not db_user_problem:
-        return None
+    """
+    Updates the user's problem area and returns it, or None when the user has
+    none. A user with several has the first one (lowest id) updated.
+    """
+    problem = models.UserProblem
+    target = problem.id == (
+        select(func.min(problem.id)).where(problem.user_id == user_id).scalar_subquery()
+    )
+
     updated_user_problem = user_problem_update.model_dump(exclude_unset=True)
-    for key, value in updated_user_problem.items():
-        setattr(db_user_problem, key, value)
-    db.commit()
-    db.refresh(db_user_problem)
+    if not updated_user_problem:
+        return await db.scalar(select(problem).where(target))
+    db_user_problem = await db.scalar(
+        update(problem).where(target).values(**updated_user_problem).returning(problem),
+        execution_options=_RETURNING,
+    )
+    if db_user_problem is None:
+        return None
+    await db.commit()
     return db_user_problem
 
 
-def update_user_password(db: Session, user_id: int, new_hashed_password: str):
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not db_user:
+async def get_password_hash(db: AsyncSession, user_id: int) -> Optional[str]:
+    """Reads only the stored password hash, for verifying the current password."""
+    return await db.scalar(
+        select(models.User.hashed_password).where(models.User.id == user_id)
+    )
+
+
+async def update_user_password(
+    db: AsyncSession, user_id: int, new_hashed_password: str
+):
+    # Every device has to log in again with the new password. The revocation
+    # runs as a CTE of the password UPDATE, so both are one statement.
+    db_user = await db.scalar(
+        update(models.User)
+        .where(models.User.id == user_id)
+        .values(hashed_password=new_hashed_password)
+        .returning(models.User)
+        .add_cte(_revoke_user_refresh_tokens(user_id).cte("revoked_tokens")),
+        execution_options=_RETURNING,
+    )
+    if db_user is None:
         return None
-    
-    db_user.hashed_password = new_hashed_password
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    user_cache.invalidate_user(user_id)
     return db_user
+
+
+# ==================================
+#     REFRESH TOKEN CRUD Functions
+# ==================================
+
+
+def _refresh_token_lifetime() -> timedelta:
+    return timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+async def create_refresh_token(db: AsyncSession, user_id: int, token_hash: str):
+    """
+    Stores the hash of a refresh token issued at login, starting a new family.
+    The user's expired tokens are cleared out at the same time.
+    """
+    await db.execute(
+        delete(models.RefreshToken).where(
+            models.RefreshToken.user_id == user_id,
+            models.RefreshToken.expires_at <= func.now(),
+        )
+    )
+    await db.execute(
+        insert(models.RefreshToken).values(
+            user_id=user_id,
+            family_id=uuid.uuid4().hex,
+            token_hash=token_hash,
+            expires_at=func.now() + _refresh_token_lifetime(),
+        )
+    )
+    await db.commit()
+
+
+async def rotate_refresh_token(db: AsyncSession, token_hash: str, new_token_hash: str):
+    """
+    Exchanges a live refresh token for a new one in the same family and
+    returns its user, or None if the token is unknown, expired or revoked.
+
+    Marking the old token used and inserting its successor is one statement,
+    so two requests racing with the same token cannot both succeed. Presenting
+    a token that was already used means it leaked (or the legitimate client
+    was already rotated past it), so the whole family is revoked.
+    """
+    used = (
+        update(models.RefreshToken)
+        .where(
+            models.RefreshToken.token_hash == token_hash,
+            models.RefreshToken.used_at.is_(None),
+            models.RefreshToken.revoked_at.is_(None),
+            models.RefreshToken.expires_at > func.now(),
+        )
+        .values(used_at=func.now())
+        .returning(models.RefreshToken.user_id, models.RefreshToken.family_id)
+        .cte("used_token")
+    )
+    user_id = await db.scalar(
+        insert(models.RefreshToken)
+        .from_select(
+            ["user_id", "family_id", "token_hash", "expires_at"],
+            select(
+                used.c.user_id,
+                used.c.family_id,
+                literal(new_token_hash),
+                func.now() + _refresh_token_lifetime(),
+            ),
+        )
+        .returning(models.RefreshToken.user_id)
+    )
+
+    if user_id is None:
+        reused_family = (
+            select(models.RefreshToken.family_id)
+            .where(
+                models.RefreshToken.token_hash == token_hash,
+                models.RefreshToken.used_at.is_not(None),
+            )
+            .scalar_subquery()
+        )
+        await db.execute(
+            update(models.RefreshToken)
+            .where(
+                models.RefreshToken.family_id == reused_family,
+                models.RefreshToken.revoked_at.is_(None),
+            )
+            .values(revoked_at=func.now())
+        )
+        await db.commit()
+        return None
+
+    db_user = await get_user(db, user_id=user_id)
+    await db.commit()
+    return db_user
+
+
+def _revoke_user_refresh_tokens(user_id: int):
+    return (
+        update(models.RefreshToken)
+        .where(
+            models.RefreshToken.user_id == user_id,
+            models.RefreshToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=func.now())
+    )
+
+
+async def revoke_user_refresh_tokens(db: AsyncSession, user_id: int):
+    """Revokes every live refresh token of a user. The caller commits."""
+    await db.execute(_revoke_user_refresh_tokens(user_id))
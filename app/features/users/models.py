@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import ARRAY
 
@@ -20,16 +20,29 @@ class User(Base):
     profile_picture_url = Column(String, nullable=True)
 
     onboarding_data = relationship(
-        "Onboarding", back_populates="user", uselist=False, cascade="all, delete-orphan"
+        "Onboarding",
+        back_populates="user",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     user_problem = relationship(
-        "UserProblem", back_populates="user", cascade="all, delete-orphan"
+        "UserProblem",
+        back_populates="user",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     session_requirement = relationship(
-        "SessionRequirement", back_populates="user", cascade="all, delete-orphan"
+        "SessionRequirement",
+        back_populates="user",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     sessions = relationship(
-        "Session", back_populates="user", cascade="all, delete-orphan"
+        "Session",
+        back_populates="user",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
 
@@ -43,7 +56,11 @@ class Onboarding(Base):
     custom_allowed_days = Column(ARRAY(Integer), nullable=True)
 
     user_id = Column(
-        Integer, ForeignKey("users.id"), unique=True, nullable=False, index=True
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        unique=True,
+        nullable=False,
+        index=True,
     )
     user = relationship("User", back_populates="onboarding_data")
 
@@ -54,9 +71,42 @@ class UserProblem(Base):
     id = Column(Integer, primary_key=True, index=True, nullable=False)
     problem_area = Column(String, nullable=False)
 
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     exercise_id = Column(
-        Integer, ForeignKey("exercises.id"), nullable=False, index=True
+        Integer,
+        ForeignKey("exercises.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
     user = relationship("User", back_populates="user_problem")
     exercise = relationship("Exercise", back_populates="user_problem")
+
+
+class RefreshToken(Base):
+    """
+    One issued refresh token. Only the SHA-256 of the token is stored.
+    Tokens rotated from the same login share a family_id, so presenting an
+    already-used token revokes the whole family.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True, nullable=False)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    family_id = Column(String(32), index=True, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    # Set when the token is exchanged for a new one.
+    used_at = Column(DateTime(timezone=True), nullable=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
@@ -1,5 +1,6 @@
 from fastapi import (
     APIRouter,
+    BackgroundTasks,
     Depends,
     HTTPException,
     status,
@@ -7,16 +8,23 @@ from fastapi import (
     UploadFile,
     Response,
 )
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 import shutil
 import os
 
 
-from app.db.database import get_db
-from app.security import get_current_active_user, hash_password, verify_password
+from app.core.pagination import Page, decode_cursor_or_400, page_size
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal, get_async_db
+from app.security import (
+    get_current_active_user,
+    hash_password_async,
+    verify_password_async,
+)
 from . import crud, schemas
-from app.features.exercises import crud as exercises_crud
+from app.features.exercises.catalog import exercise_catalog
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -28,23 +36,47 @@ router = APIRouter(prefix="/users", tags=["Users"])
 @router.post(
     "/create", response_model=schemas.UserOut, status_code=status.HTTP_201_CREATED
 )
-def create_user_route(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
-    if db_user:
+async def create_user_route(
+    user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)
+):
+    # Turn a taken email away before spending a bcrypt call on it. The insert
+    # still skips a duplicate, for a sign-up racing this one.
+    if await crud.email_registered(db, email=user.email):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="Email already registered"
         )
-
-    hashed_password: str = hash_password(user.password)
-    return crud.create_user(db=db, user=user, hashed_password=hashed_password)
+    hashed_password: str = await hash_password_async(user.password)
+    db_user = await crud.create_user(db=db, user=user, hashed_password=hashed_password)
+    if db_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Email already registered"
+        )
+    return db_user
 
 
 @router.get("/all", response_model=List[schemas.UserOut])
-def get_all_users_route(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    users = crud.get_users(db, skip=skip, limit=limit)
+async def get_all_users_route(
+    skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)
+):
+    users = await crud.get_users(db, skip=skip, limit=limit)
     return users
 
 
+@router.get("/list", response_model=Page[schemas.UserOut])
+async def list_users_route(
+    cursor: Optional[str] = None,
+    limit: int = Depends(page_size),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Cursor-paginated user listing. Pass the returned `next_cursor` back as
+    `cursor` to read the next page.
+    """
+    after = decode_cursor_or_400(cursor, types=(int,))
+    items, next_cursor = await crud.get_users_page(db, limit=limit, after=after)
+    return Page(items=items, next_cursor=next_cursor)
+
+
 @router.get("/me", response_model=schemas.UserOut)
 async def read_users_me(
     current_user: schemas.UserOut = Depends(get_current_active_user),
@@ -56,9 +88,9 @@ async def read_users_me(
 
 
 @router.get("/{user_id}", response_model=schemas.UserOut)
-def get_user_by_id_route(
+async def get_user_by_id_route(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.UserOut = Depends(get_current_active_user),
 ):
     if current_user.id != user_id:
@@ -66,7 +98,7 @@ def get_user_by_id_route(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to perform this action.",
         )
-    db_user = crud.get_user(db, user_id=user_id)
+    db_user = await crud.get_user(db, user_id=user_id)
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -75,10 +107,12 @@ def get_user_by_id_route(
 
 
 @router.put("/{user_id}", response_model=schemas.UserOut)
-def update_user_route(
-    user_id: int, user_update: schemas.UserUpdate, db: Session = Depends(get_db)
+async def update_user_route(
+    user_id: int,
+    user_update: schemas.UserUpdate,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    updated_user = crud.update_user(db, user_id=user_id, user_update=user_update)
+    updated_user = await crud.update_user(db, user_id=user_id, user_update=user_update)
     if not updated_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -86,14 +120,42 @@ def update_user_route(
     return updated_user
 
 
-@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user_route(user_id: int, db: Session = Depends(get_db)):
-    deleted_user = crud.delete_user(db, user_id=user_id)
-    if not deleted_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+async def _purge_user(user_id: int):
+    async with AsyncSessionLocal() as db:
+        await crud.purge_user(
+            db, user_id=user_id, batch_size=settings.USER_DELETE_BATCH_SIZE
         )
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.delete(
+    "/{user_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={status.HTTP_202_ACCEPTED: {"description": "Deletion scheduled"}},
+)
+async def delete_user_route(
+    user_id: int,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Deletes the user and all of their data. Accounts with more than
+    USER_DELETE_BATCH_SIZE sessions are deleted in batches after the response,
+    which is then 202 instead of 204.
+    """
+    batch_size = settings.USER_DELETE_BATCH_SIZE
+    deleted_user = await crud.delete_user(db, user_id=user_id, max_sessions=batch_size)
+    if deleted_user:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    # Nothing was deleted: either there is no such user or the account is too
+    # large for one statement.
+    if (
+        await crud.count_user_sessions(db, user_id=user_id, limit=batch_size + 1)
+        > batch_size
+    ):
+        background_tasks.add_task(_purge_user, user_id)
+        return Response(status_code=status.HTTP_202_ACCEPTED)
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
 
 # ==================================
@@ -101,26 +163,32 @@ def delete_user_route(user_id: int, db: Session = Depends(get_db)):
 # ==================================
 
 
+def _save_upload(file: UploadFile, static_file_path: str):
+    os.makedirs(os.path.dirname(static_file_path), exist_ok=True)
+    with open(static_file_path, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+
+
 @router.post("/upload-profile-picture/{user_id}", response_model=schemas.UserOut)
-def upload_profile_picture_route(
-    user_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)
+async def upload_profile_picture_route(
+    user_id: int, file: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)
 ):
-    user = crud.get_user(db, user_id=user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-
     file_ext = file.filename.split(".")[-1]
     filename = f"user_{user_id}_profile.{file_ext}"
     static_file_path = f"app/static/images/{filename}"
     url_path = f"/static/images/{filename}"
 
-    os.makedirs(os.path.dirname(static_file_path), exist_ok=True)
-    with open(static_file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    await run_in_threadpool(_save_upload, file, static_file_path)
 
-    return crud.update_user_profile_picture(db, user_id=user_id, file_path=url_path)
+    db_user = await crud.update_user_profile_picture(
+        db, user_id=user_id, file_path=url_path
+    )
+    if not db_user:
+        await run_in_threadpool(os.remove, static_file_path)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    return db_user
 
 
 # ==================================
@@ -133,17 +201,17 @@ def upload_profile_picture_route(
     response_model=schemas.OnboardingOut,
     status_code=status.HTTP_201_CREATED,
 )
-def create_onboarding_for_user_route(
-    user_id: int, onboarding: schemas.OnboardingCreate, db: Session = Depends(get_db)
+async def create_onboarding_for_user_route(
+    user_id: int,
+    onboarding: schemas.OnboardingCreate,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    db_user = crud.get_user(db, user_id=user_id)
-    if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    created_onboarding = crud.create_user_onboarding(
+    created_onboarding = await crud.create_user_onboarding(
         db=db, onboarding=onboarding, user_id=user_id
     )
     if created_onboarding is None:
+        if not await crud.user_exists(db, user_id=user_id):
+            raise HTTPException(status_code=404, detail="User not found")
         raise HTTPException(
             status_code=409, detail="Onboarding data already exists for this user"
         )
@@ -152,13 +220,17 @@ def create_onboarding_for_user_route(
 
 
 @router.get("/{user_id}/onboarding", response_model=schemas.OnboardingOut)
-def get_user_onboarding(user_id: int, db: Session = Depends(get_db), current_user: schemas.UserOut = Depends(get_current_active_user)):
+async def get_user_onboarding(
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.UserOut = Depends(get_current_active_user),
+):
     if current_user.id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to perform this action.",
         )
-    db_user_onboarding = crud.get_user_onbaording(db=db, user_id=user_id)
+    db_user_onboarding = await crud.get_user_onbaording(db=db, user_id=user_id)
 
     if not db_user_onboarding:
         raise HTTPException(
@@ -170,12 +242,12 @@ def get_user_onboarding(user_id: int, db: Session = Depends(get_db), current_use
 
 
 @router.put("/{user_id}/onboarding", response_model=schemas.OnboardingOut)
-def update_user_onboarding(
+async def update_user_onboarding(
     user_id: int,
     onboarding_update: schemas.OnboardingUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    updated_user_onboarding = crud.update_user_onboarding(
+    updated_user_onboarding = await crud.update_user_onboarding(
         db=db, user_id=user_id, onboarding_update=onboarding_update
     )
 
@@ -192,10 +264,10 @@ def update_user_onboarding(
     "/{user_id}/onboarding/custom-schedule-days",
     response_model=schemas.OnboardingOut,
 )
-def update_custom_schedule_days_route(
+async def update_custom_schedule_days_route(
     user_id: int,
     payload: schemas.UpdateCustomAllowedDaysRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: schemas.UserOut = Depends(get_current_active_user),
 ):
     if current_user.id != user_id:
@@ -204,7 +276,7 @@ def update_custom_schedule_days_route(
             detail="You do not have permission to perform this action.",
         )
 
-    onboarding, error = crud.update_onboarding_custom_days(
+    onboarding, error = await crud.update_onboarding_custom_days(
         db=db, user_id=user_id, days=payload.custom_allowed_days
     )
     if error:
@@ -216,8 +288,10 @@ def update_custom_schedule_days_route(
 
 
 @router.delete("/{user_id}/onboarding")
-def delete_user_onboarding(user_id: int, db: Session = Depends(get_db)):
-    db_user_onboarding = crud.delete_user_onboarding(db=db, user_id=user_id)
+async def delete_user_onboarding(
+    user_id: int, db: AsyncSession = Depends(get_async_db)
+):
+    db_user_onboarding = await crud.delete_user_onboarding(db=db, user_id=user_id)
 
     if not db_user_onboarding:
         raise HTTPException(
@@ -233,52 +307,59 @@ def delete_user_onboarding(user_id: int, db: Session = Depends(get_db)):
     response_model=schemas.UserProblemOut,
     status_code=status.HTTP_201_CREATED,
 )
-def create_problem_for_user_route(
-    user_id: int, problem: schemas.UserProblemCreate, db: Session = Depends(get_db)
+async def create_problem_for_user_route(
+    user_id: int,
+    problem: schemas.UserProblemCreate,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    db_user = crud.get_user(db=db, user_id=user_id)
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
-
     # --- FIX IS HERE ---
     # Convert the frontend identifier (e.g., "hiding_face")
     # to the database format (e.g., "Hiding Face")
     exercise_name_db_format = problem.problem_area.replace("_", " ").title()
 
     # Find the exercise by its formatted name
-    db_exercise = exercises_crud.get_exercise_by_name(db, name=exercise_name_db_format)
+    db_exercise = await exercise_catalog.get_by_name(db, name=exercise_name_db_format)
     if not db_exercise:
+        # A missing user is reported first, as it always was.
+        if not await crud.user_exists(db, user_id=user_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Exercise with name '{exercise_name_db_format}' not found.",
         )
 
     # Pass the found exercise_id to the CRUD function
-    return crud.create_user_problem(
+    db_problem = await crud.create_user_problem(
         db=db, problem=problem, user_id=user_id, exercise_id=db_exercise.id
     )
+    if db_problem is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    return db_problem
 
 
 @router.get("/{user_id}/problems", response_model=List[schemas.UserProblemOut])
-def get_problems_for_user_route(user_id: int, db: Session = Depends(get_db)):
-    db_user = crud.get_user(db, user_id=user_id)
-    if not db_user:
+async def get_problems_for_user_route(
+    user_id: int, db: AsyncSession = Depends(get_async_db)
+):
+    if not await crud.user_exists(db, user_id=user_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    return crud.get_user_problems(db=db, user_id=user_id)
+    return await crud.get_user_problems(db=db, user_id=user_id)
 
 
 @router.put("/{user_id}/problems", response_model=schemas.UserProblemOut)
-def update_problem_for_user(
+async def update_problem_for_user(
     user_id: int,
     user_problem_update: schemas.UserProblemUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user_problem = crud.update_user_problem(
+    user_problem = await crud.update_user_problem(
         db=db, user_id=user_id, user_problem_update=user_problem_update
     )
 
@@ -295,11 +376,11 @@ def update_problem_for_user(
     "/{user_id}/change-password",
     status_code=status.HTTP_200_OK
 )
-def change_user_password_route(
+async def change_user_password_route(
     user_id: int,
     passwords: schemas.ChangePasswordPayload,
-    db: Session = Depends(get_db),
-    current_user: schemas.UserOut = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.UserOut = Depends(get_current_active_user),
 ):
 
     if current_user.id != user_id:
@@ -308,23 +389,25 @@ def change_user_password_route(
             detail="You do not have permission to perform this action."
         )
 
-    db_user = crud.get_user(db, user_id=user_id)
-    if not db_user:
+    hashed_password = await crud.get_password_hash(db, user_id=user_id)
+    if not hashed_password:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
     # Verify password
-    if not verify_password(passwords.current_password, db_user.hashed_password):
+    if not await verify_password_async(passwords.current_password, hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect current password"
         )
-        
+
     # 2. Hash the new password
-    new_hashed_password = hash_password(passwords.new_password)
-    
+    new_hashed_password = await hash_password_async(passwords.new_password)
+
     # 3. Call the CRUD function to update it in the database
-    crud.update_user_password(db, user_id=user_id, new_hashed_password=new_hashed_password)
-    
-    return {"message": "Password changed successfully"}
\ No newline at end of file
+    await crud.update_user_password(
+        db, user_id=user_id, new_hashed_password=new_hashed_password
+    )
+
+    return {"message": "Password changed successfully"}
@@ -110,4 +110,17 @@ class UserProblemUpdate(BaseModel):
 
 class ChangePasswordPayload(BaseModel):
     current_password: str
-    new_password: str
\ No newline at end of file
+    new_password: str
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+
+class TokenResponse(BaseModel):
+    """What /token and /token/refresh answer; the user without secrets."""
+
+    access_token: str
+    refresh_token: str
+    token_type: str
+    user: UserOut
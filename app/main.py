@@ -2,22 +2,31 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
+import asyncio
 import os
+from contextlib import asynccontextmanager
 
 from app.features.users.routes import router as users_router
 from app.features.exercises.routes import router as exercise_router
 from app.features.sessions.routes import router as session_router
-from app.prediction.routes import router as prediction_router
+from app.features.progress.routes import router as progress_router
+from app.features.dashboard.routes import router as dashboard_router
 from app.auth_routes import router as auth_router
-from app.db.database import Base, engine, SessionLocal
-from app.features.exercises import crud as exercises_crud
-
-app = FastAPI()
-Base.metadata.create_all(bind=engine)
+from app.metrics_routes import router as metrics_router, sql_stats_router
+from app.core.config import settings
+from app.core.passwords import shutdown_password_pool, start_password_pool
+from app.db.database import AsyncSessionLocal
+from app.db.migrations import prepare_database
+from app.db.partitions import ensure_upcoming_partitions, keep_partitions_ahead
+from app.core.metrics import (
+    MetricsMiddleware,
+    write_snapshot,
+    write_snapshots_periodically,
+)
+from app.db.query_stats import QueryStatsMiddleware
+from app.features.exercises.catalog import exercise_catalog
 
-with SessionLocal() as db:
-    exercises_crud.seed_exercises(db)
-    db.commit()
+PROFILES = ("full", "api", "inference")
 
 origins = [
     "https://revaitalize.vercel.app",
@@ -26,25 +35,90 @@ origins = [
     # "*"
 ]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
+def create_app(profile: str = settings.APP_PROFILE) -> FastAPI:
+    """
+    Builds the app for a deployment profile:
 
-routers = [
-    auth_router,
-    users_router,
-    prediction_router,
-    exercise_router,
-    session_router,
-]
+    - "full" serves every route (the default);
+    - "api" serves everything but the prediction routes and never imports
+      TensorFlow, so its workers start fast and stay small;
+    - "inference" serves only the prediction routes (and /metrics), and does
+      no database work at startup.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown app profile {profile!r}, expected one of {PROFILES}")
+    serves_api = profile in ("full", "api")
+    serves_inference = profile in ("full", "inference")
+
+    if serves_inference:
+        # These import TensorFlow.
+        from app.prediction.architecture import load_model
+        from app.prediction.routes import router as prediction_router
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Blocking is fine here: no request is served until startup finishes.
+        if settings.METRICS_DIR:
+            os.makedirs(settings.METRICS_DIR, exist_ok=True)
+            metrics_task = asyncio.create_task(
+                write_snapshots_periodically(settings.METRICS_DIR)
+            )
+        if serves_api:
+            prepare_database()
+            ensure_upcoming_partitions()
+            partition_task = asyncio.create_task(keep_partitions_ahead())
+            async with AsyncSessionLocal() as db:
+                await exercise_catalog.load(db)
+        if serves_inference:
+            load_model()
+        if serves_api:
+            start_password_pool()
+        yield
+        if serves_api:
+            partition_task.cancel()
+            shutdown_password_pool()
+        if settings.METRICS_DIR:
+            metrics_task.cancel()
+            # What this worker counted stays in the totals after it exits.
+            write_snapshot(settings.METRICS_DIR)
+
+    app = FastAPI(lifespan=lifespan)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(QueryStatsMiddleware, debug_headers=settings.SQL_DEBUG_HEADERS)
+    app.add_middleware(MetricsMiddleware)
+
+    routers = []
+    if serves_api:
+        routers += [
+            auth_router,
+            users_router,
+            exercise_router,
+            session_router,
+            progress_router,
+            dashboard_router,
+        ]
+    if serves_inference:
+        routers.append(prediction_router)
+    routers.append(metrics_router)
+    if settings.SQL_STATS_ENDPOINT:
+        routers.append(sql_stats_router)
+
+    if serves_api:
+        os.makedirs("app/static/images", exist_ok=True)
+        app.mount("/static", StaticFiles(directory="app/static"), name="static")
+
+    for router in routers:
+        app.include_router(router)
+
+    return app
 
-os.makedirs("app/static/images", exist_ok=True)
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
-for router in routers:
-    app.include_router(router)
+app = create_app()
@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core import metrics
+from app.db.query_stats import route_query_stats
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+# Served only with SQL_STATS_ENDPOINT set (see app.main.create_app): it has
+# no auth and shows raw SQL.
+sql_stats_router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    The server's metrics in the Prometheus text format: request latency per
+    route, in-flight requests, model inference, WebSocket connections, cache
+    sizes, DB pool checkout and SQL time, and ffmpeg jobs. With METRICS_DIR
+    set they cover every worker, up to METRICS_SNAPSHOT_SECONDS old for the
+    ones not serving this request; otherwise only this worker.
+    """
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@sql_stats_router.get("/sql")
+async def get_sql_stats():
+    """
+    Statement count and DB time per route, with the slowest statement seen.
+    Each worker process keeps its own totals, so consecutive calls may reach
+    different ones.
+    """
+    return route_query_stats()
@@ -1,6 +1,5 @@
 import tensorflow as tf
 
-import os
 from typing import Union
 
 
@@ -25,18 +24,27 @@ class ErrorF1Score(tf.keras.metrics.Metric):
         self.recall.reset_state()
 
 
-try:
-    custom_objects = {"error_f1": ErrorF1Score}
-    model: Union[tf.keras.Model, None] = tf.keras.models.load_model(
-        "models/finetuned_model.keras",
-        custom_objects=custom_objects,
-    )
-    os.system("clear")
-    if model:
+MODEL_PATH = "models/finetuned_model.keras"
+
+model: Union[tf.keras.Model, None] = None
+
+
+def load_model():
+    """
+    Loads the LSTM model and runs one prediction so its predict function is
+    built before the first request.
+
+    TensorFlow is not fork-safe once the model is loaded, so this runs at
+    startup in every process that serves predictions: under gunicorn the
+    master only imports TensorFlow, and each worker loads its own copy of the
+    (small) model after the fork.
+    """
+    global model
+    try:
+        custom_objects = {"error_f1": ErrorF1Score}
+        model = tf.keras.models.load_model(MODEL_PATH, custom_objects=custom_objects)
+        model.predict(tf.zeros((1, 20, 42)), verbose=0)
         print("LSTM model loaded successfully!")
-    else:
-        print("Model empty")
-except Exception as e:
-    os.system("clear")
-    print(f"Error loading model: {e}")
-    model = None
+    except Exception as e:
+        print(f"Error loading model: {e}")
+        model = None
@@ -0,0 +1,115 @@
+"""
+Wire format for the dataset recording WebSocket.
+
+Protocol 1 is the original one: every frame is its own JSON text message
+(``{"event": "frame", "payload": {"timestamp": ..., "landmarks": {...}}}``).
+
+Protocol 2 is negotiated in the config message by sending ``"protocol": 2``
+together with the ordered list of landmark names and the number of values per
+landmark. After the server acknowledges it, frames are sent as binary
+messages, each carrying a batch of frames:
+
+    offset 0   uint8     protocol version (2)
+    offset 1   3 bytes   padding (zero)
+    offset 4   uint32    frame count N
+    offset 8   int64[N]  frame timestamps
+    ...        float32[N * landmarks * values_per_landmark]  landmark values
+
+All fields are little-endian. The landmark values are laid out frame by frame,
+then landmark by landmark in the negotiated order.
+"""
+
+import struct
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+PROTOCOL_V1 = 1
+PROTOCOL_V2 = 2
+SUPPORTED_PROTOCOLS = (PROTOCOL_V1, PROTOCOL_V2)
+
+# Upper bound on frames per binary message, so one message can't blow up memory.
+MAX_FRAMES_PER_MESSAGE = 1024
+
+HEADER = struct.Struct("<B3xI")
+TIMESTAMP_DTYPE = np.dtype("<i8")
+VALUE_DTYPE = np.dtype("<f4")
+
+
+class FrameProtocolError(ValueError):
+    """Raised when a binary frame batch does not match the negotiated layout."""
+
+
+class UnsupportedFrameError(FrameProtocolError):
+    """Raised for a protocol version, or a kind of message, that is not spoken."""
+
+
+def decode_frame_batch(
+    buffer: bytes, landmark_count: int, values_per_landmark: int
+) -> Tuple[NDArray, NDArray]:
+    """
+    Decodes one binary message into ``(timestamps, values)`` without copying.
+
+    ``timestamps`` has shape (N,) and ``values`` has shape
+    (N, landmark_count, values_per_landmark).
+    """
+    if len(buffer) < HEADER.size:
+        raise FrameProtocolError("Binary frame message is shorter than its header")
+
+    version, frame_count = HEADER.unpack_from(buffer)
+    if version != PROTOCOL_V2:
+        raise UnsupportedFrameError(f"Unsupported frame protocol version: {version}")
+    if frame_count > MAX_FRAMES_PER_MESSAGE:
+        raise FrameProtocolError(
+            f"Frame batch of {frame_count} exceeds the limit of {MAX_FRAMES_PER_MESSAGE}"
+        )
+
+    value_count = frame_count * landmark_count * values_per_landmark
+    values_offset = HEADER.size + frame_count * TIMESTAMP_DTYPE.itemsize
+    expected_size = values_offset + value_count * VALUE_DTYPE.itemsize
+    if len(buffer) != expected_size:
+        raise FrameProtocolError(
+            f"Expected {expected_size} bytes for {frame_count} frames, got {len(buffer)}"
+        )
+
+    timestamps = np.frombuffer(
+        buffer, dtype=TIMESTAMP_DTYPE, count=frame_count, offset=HEADER.size
+    )
+    values = np.frombuffer(
+        buffer, dtype=VALUE_DTYPE, count=value_count, offset=values_offset
+    ).reshape(frame_count, landmark_count, values_per_landmark)
+    return timestamps, values
+
+
+def encode_frame_batch(timestamps: Sequence[int], values: NDArray) -> bytes:
+    """
+    Encodes a batch of frames in the protocol 2 layout.
+
+    This is the inverse of ``decode_frame_batch`` and mirrors what the client
+    sends; it is used by the benchmark and is handy when scripting recordings.
+    """
+    ts = np.asarray(timestamps, dtype=TIMESTAMP_DTYPE)
+    vals = np.ascontiguousarray(values, dtype=VALUE_DTYPE)
+    if vals.ndim != 3 or vals.shape[0] != ts.shape[0]:
+        raise FrameProtocolError(
+            "values must have shape (frames, landmarks, values_per_landmark)"
+        )
+    return HEADER.pack(PROTOCOL_V2, ts.shape[0]) + ts.tobytes() + vals.tobytes()
+
+
+def collect_frames(session_data: Dict) -> Dict[str, Dict[str, List[float]]]:
+    """
+    Returns every frame recorded for a session in the protocol 1 shape
+    (timestamp -> landmark name -> values), merging in any binary batches.
+    """
+    frames: Dict[str, Dict[str, List[float]]] = dict(session_data["frames"])
+    chunks = session_data.get("chunks")
+    if not chunks:
+        return frames
+
+    names: List[str] = session_data["config"].landmarks
+    for timestamps, values in chunks:
+        for timestamp, frame in zip(timestamps.tolist(), values.tolist()):
+            frames[str(timestamp)] = dict(zip(names, frame))
+    return frames
@@ -9,24 +9,47 @@ from fastapi import (
 )
 from numpy.typing import ArrayLike, NDArray
 import numpy as np
+from pydantic import ValidationError
 
 import json
+import logging
 import shutil
 import subprocess
 import tempfile
+import time
 from pathlib import Path
 from typing import Dict, Union
 
-from app.prediction.architecture import model
-from app.prediction.schemas import (
-    PoseSequence,
-    WebsocketMessage,
-    ConfigPayload,
-    FramePayload,
+from app.core.metrics import (
+    FFMPEG_JOB_DURATION,
+    MODEL_INFERENCE_DURATION,
+    WEBSOCKET_CONNECTIONS,
+    CallbackMetric,
 )
+from app.prediction import architecture
+from app.prediction.frame_protocol import (
+    MAX_FRAMES_PER_MESSAGE,
+    PROTOCOL_V1,
+    PROTOCOL_V2,
+    SUPPORTED_PROTOCOLS,
+    FrameProtocolError,
+    UnsupportedFrameError,
+    collect_frames,
+    decode_frame_batch,
+)
+from app.prediction.schemas import PoseSequence, ConfigPayload
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/predict", tags=["lstm"])
 
+# WebSocket close codes (RFC 6455): a kind of message or a protocol version
+# the server does not support, data that does not match what it claims, and
+# a failure on the server's side.
+CLOSE_UNSUPPORTED_DATA = 1003
+CLOSE_INVALID_PAYLOAD = 1007
+CLOSE_INTERNAL_ERROR = 1011
+
 # OPTIMAL_THRESHOLDS_DICT = {
 #     "hiding_face": np.array([0.4, 0.45, 0.45, 0.35, 0.4, 0.45]),
 #     "torso_rotation": np.array([0.35, 0.55, 0.35, 0.3, 0.45, 0.3]),
@@ -41,6 +64,12 @@ OPTIMAL_THRESHOLDS_DICT = {
 
 SESSION_DATA_CACHE: Dict[str, Dict] = {}
 
+CallbackMetric(
+    "dataset_session_cache_entries",
+    "Dataset recordings held in SESSION_DATA_CACHE.",
+    lambda: len(SESSION_DATA_CACHE),
+)
+
 
 @router.post("/api/predict/")
 def get_prediction(sequence: PoseSequence):
@@ -57,12 +86,9 @@ def get_prediction(sequence: PoseSequence):
         sequence.list_landmarks, dtype="float32"
     ).reshape(1, 20, 42)
 
-    if model:
-        print("Model loaded")
-    else:
-        print("Model empty")
-
-    raw_pred: NDArray = model.predict(np_landmarks)
+    start = time.perf_counter()
+    raw_pred: NDArray = architecture.model.predict(np_landmarks)
+    MODEL_INFERENCE_DURATION.observe(time.perf_counter() - start)
     binary_pred: NDArray = (raw_pred >= threshold).astype(int)
     return {"prediction": binary_pred.tolist()}
 
@@ -72,47 +98,117 @@ async def websocket_create_dataset_entry(websocket: WebSocket):
     """
     Handles the real-time streaming of landmark data from the frontend.
     It populates a cache entry which is later used by the HTTP upload endpoint.
+
+    The config message is validated once per connection. Frames skip model
+    validation: protocol 1 frames are stored straight from the decoded JSON and
+    protocol 2 frames arrive as binary batches (see ``frame_protocol``).
+
+    A message the server cannot use closes the connection: 1003 for binary
+    frames before protocol 2 is negotiated or an unknown protocol version,
+    1007 for a malformed config, JSON message or frame batch, and 1011 when
+    the server fails. The session's cached recording goes with the
+    connection, however it ends.
     """
     await websocket.accept()
+    WEBSOCKET_CONNECTIONS.inc()
     print("INFO:\tWebSocket connection opened.")
 
     session_key: Union[str, None] = None
+    config: Union[ConfigPayload, None] = None
 
     try:
         while True:
-            data = await websocket.receive_json()
-            message = WebsocketMessage(**data)
-
-            if message.event == "config":
-                if isinstance(message.payload, ConfigPayload):
-                    config = message.payload
-                    session_key = config.filename
-                    SESSION_DATA_CACHE[session_key] = {"config": config, "frames": {}}
-                    print(f"INFO:\tReceived config for session: {session_key}")
-
-            elif message.event == "frame":
-                if (
-                    session_key
-                    and session_key in SESSION_DATA_CACHE
-                    and isinstance(message.payload, FramePayload)
-                ):
-                    frame = message.payload
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            if message.get("bytes") is not None:
+                if not config or config.protocol != PROTOCOL_V2:
+                    raise UnsupportedFrameError(
+                        "Binary frames require protocol 2 to be negotiated first"
+                    )
+                if session_key in SESSION_DATA_CACHE:
+                    SESSION_DATA_CACHE[session_key]["chunks"].append(
+                        decode_frame_batch(
+                            message["bytes"],
+                            len(config.landmarks),
+                            config.values_per_landmark,
+                        )
+                    )
+                continue
+
+            data = json.loads(message["text"])
+            event = data.get("event")
+
+            if event == "frame":
+                payload = data.get("payload")
+                if session_key and session_key in SESSION_DATA_CACHE and payload:
                     SESSION_DATA_CACHE[session_key]["frames"][
-                        frame.timestamp
-                    ] = frame.landmarks
+                        payload["timestamp"]
+                    ] = payload["landmarks"]
+
+            elif event == "config":
+                protocol = data["payload"].get("protocol", PROTOCOL_V1)
+                if protocol not in SUPPORTED_PROTOCOLS:
+                    raise UnsupportedFrameError(
+                        f"Unsupported frame protocol version: {protocol}"
+                    )
+                config = ConfigPayload(**data["payload"])
+                session_key = config.filename
+                SESSION_DATA_CACHE[session_key] = {
+                    "config": config,
+                    "frames": {},
+                    "chunks": [],
+                }
+                print(f"INFO:\tReceived config for session: {session_key}")
+
+                if config.protocol == PROTOCOL_V2:
+                    await websocket.send_json(
+                        {
+                            "event": "config_ack",
+                            "payload": {
+                                "protocol": PROTOCOL_V2,
+                                "max_frames_per_message": MAX_FRAMES_PER_MESSAGE,
+                            },
+                        }
+                    )
 
     except WebSocketDisconnect:
         print(f"INFO:\tClient disconnected WebSocket for session: {session_key}.")
-        if session_key and session_key in SESSION_DATA_CACHE:
-            del SESSION_DATA_CACHE[session_key]
-            print(f"INFO:\tCleaned up orphaned cache for session: {session_key}")
 
-    except Exception as e:
-        print(f"ERROR:\tAn error occurred on WebSocket for session {session_key}: {e}")
+    except UnsupportedFrameError as e:
+        await _close_for_protocol_error(
+            websocket, CLOSE_UNSUPPORTED_DATA, e, session_key
+        )
+    except (FrameProtocolError, ValidationError, json.JSONDecodeError) as e:
+        await _close_for_protocol_error(
+            websocket, CLOSE_INVALID_PAYLOAD, e, session_key
+        )
+
+    except Exception:
+        logger.exception("Error on dataset WebSocket for session %s", session_key)
+        await websocket.close(code=CLOSE_INTERNAL_ERROR)
     finally:
+        WEBSOCKET_CONNECTIONS.dec()
+        if SESSION_DATA_CACHE.pop(session_key, None) is not None:
+            logger.info("Cleaned up orphaned cache for session: %s", session_key)
         print("INFO:\tWebSocket connection closed.")
 
 
+async def _close_for_protocol_error(
+    websocket: WebSocket, code: int, error: Exception, session_key: Union[str, None]
+):
+    logger.warning(
+        "Closing dataset WebSocket for session %s with %d: %s",
+        session_key,
+        code,
+        error,
+    )
+    # Close frame reasons are limited to 123 bytes.
+    reason = str(error).encode()[:123].decode(errors="ignore")
+    await websocket.close(code=code, reason=reason)
+
+
 @router.post("/api/upload-video-and-finalize")
 async def upload_video_and_finalize_dataset(
     video_file: UploadFile = File(...),
@@ -140,7 +236,7 @@ async def upload_video_and_finalize_dataset(
     json_save_path = save_dir / filename
     mp4_video_path = video_dir / f"{base_filename}.mp4"
 
-    final_json_to_save = {"positions": session_data["frames"]}
+    final_json_to_save = {"positions": collect_frames(session_data)}
     try:
         with open(json_save_path, "w") as f:
             json.dump(final_json_to_save, f, indent=4)
@@ -172,7 +268,13 @@ async def upload_video_and_finalize_dataset(
         ]
 
         print("INFO:\tRunning FFMPEG to convert and mirror...")
-        subprocess.run(ffmpeg_command, check=True, capture_output=True, text=True)
+        ffmpeg_started = time.perf_counter()
+        try:
+            subprocess.run(ffmpeg_command, check=True, capture_output=True, text=True)
+        except subprocess.CalledProcessError:
+            FFMPEG_JOB_DURATION.observe(time.perf_counter() - ffmpeg_started, "failed")
+            raise
+        FFMPEG_JOB_DURATION.observe(time.perf_counter() - ffmpeg_started, "succeeded")
         print(f"SUCCESS:\tCreated mirrored video: {mp4_video_path}")
 
     except subprocess.CalledProcessError as e:
@@ -1,5 +1,5 @@
-from typing import List, Dict, Literal, Union
-from pydantic import BaseModel
+from typing import List, Dict, Literal, Optional, Union
+from pydantic import BaseModel, model_validator
 
 
 class PoseSequence(BaseModel):
@@ -11,6 +11,19 @@ class ConfigPayload(BaseModel):
     filename: str
     exercise: str
     category: str
+    # Protocol 2 (binary frame batches) needs the landmark layout up front.
+    protocol: Literal[1, 2] = 1
+    landmarks: Optional[List[str]] = None
+    values_per_landmark: Optional[int] = None
+
+    @model_validator(mode="after")
+    def validate_binary_layout(self):
+        if self.protocol == 2:
+            if not self.landmarks:
+                raise ValueError("landmarks are required for protocol 2")
+            if not self.values_per_landmark or self.values_per_landmark < 1:
+                raise ValueError("values_per_landmark is required for protocol 2")
+        return self
 
 
 class FramePayload(BaseModel):
@@ -1,27 +1,24 @@
+import hashlib
+import secrets
 from datetime import datetime, timedelta, timezone
+from typing import Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.db.database import get_db
+from app.core.passwords import (  # noqa: F401  (re-exported for the routes)
+    hash_password,
+    hash_password_async,
+    verify_password,
+    verify_password_async,
+)
+from app.db.database import get_primary_db
 from app.features.users import crud as users_crud
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifies a plain-text password against a hashed one."""
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def hash_password(password: str) -> str:
-    """Hashes a plain-text password."""
-    return pwd_context.hash(password)
-
+from app.features.users.cache import user_cache
+from app.features.users.schemas import UserOut
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -44,7 +41,21 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 
-def authenticate_user(db: Session, email: str, password: str):
+def hash_refresh_token(token: str) -> str:
+    """
+    The value stored for a refresh token. Tokens are 256 random bits, so a
+    fast unsalted hash is enough and lets the lookup use an index.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def new_refresh_token() -> Tuple[str, str]:
+    """Returns a new opaque refresh token and its hash."""
+    token = secrets.token_urlsafe(32)
+    return token, hash_refresh_token(token)
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str):
     """
     The core login logic. It finds a user by their email and then verifies their password.
 
@@ -52,19 +63,19 @@ def authenticate_user(db: Session, email: str, password: str):
 
     Returns the user object on success, or False on failure.
     """
-    user = users_crud.get_user_by_email(db, email=email)
+    user = await users_crud.get_user_by_email(db, email=email)
 
     if not user:
         return False
 
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return False
 
     return user
 
 
-def get_current_active_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+async def get_current_active_user(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_primary_db)
 ):
     """
     Dependency to get the current user from a JWT token.
@@ -88,10 +99,16 @@ def get_current_active_user(
     except JWTError:
         raise credentials_exception
 
-    user = users_crud.get_user_by_email(db, email=email)
+    user = user_cache.get(email)
+    if user is not None:
+        return user
+
+    db_user = await users_crud.get_user_by_email(db, email=email)
 
-    if user is None:
+    if db_user is None:
         raise credentials_exception
 
+    user = UserOut.model_validate(db_user)
+    user_cache.put(user)
     return user
 
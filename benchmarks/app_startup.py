@@ -0,0 +1,119 @@
+"""
+Import time, startup time and time to first request of each app profile.
+
+Every run is a fresh interpreter that imports ``app.main`` with APP_PROFILE
+set, runs the app's startup (its lifespan) the way a server worker does, and
+then sends the profile's first requests in-process: GET /exercises/all when
+it serves the API, a prediction when it serves inference. It reports the
+SQL statements of the import and startup phases and the process's peak RSS.
+Run it against a database that is already migrated, which is the case for
+every worker start but the first:
+
+    python -m benchmarks.app_startup --profiles full api inference --runs 5 \
+        --output results/startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import write_results
+
+CHILD = """
+import asyncio, json, resource, time
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PROBES = {
+    "GET /exercises/all": ("GET", "/exercises/all", None),
+    "POST /predict/api/predict/": (
+        "POST",
+        "/predict/api/predict/",
+        {"list_landmarks": [[0.5] * 42] * 20, "exercise_name": "hiding_face"},
+    ),
+}
+statements = {"import": 0, "startup": 0}
+phase = "import"
+
+def count(*_):
+    statements[phase] += 1
+
+# On the Engine class, so it sees every engine, created at import or later.
+event.listen(Engine, "before_cursor_execute", count)
+
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+phase = "startup"
+
+async def startup():
+    first_requests = {}
+    paths = {route.path for route in app.routes}
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://app") as c:
+            for name, (method, path, body) in PROBES.items():
+                if path in paths:
+                    sent = time.perf_counter()
+                    response = await c.request(method, path, json=body)
+                    response.raise_for_status()
+                    first_requests[name] = time.perf_counter() - sent
+        return started, first_requests
+
+started, first_requests = asyncio.run(startup())
+print(json.dumps({
+    "import_s": imported - start,
+    "startup_s": started - imported,
+    "first_request_s": max(first_requests.values()),
+    "ready_s": started - start + max(first_requests.values()),
+    "import_statements": statements["import"],
+    "startup_statements": statements["startup"],
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def run_once(profile: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        env=dict(os.environ, APP_PROFILE=profile),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(args):
+    results = {}
+    for profile in args.profiles:
+        runs = [run_once(profile) for _ in range(args.runs)]
+        summary = {
+            key: round(statistics.median(run[key] for run in runs), 3)
+            for key in runs[0]
+        }
+        results[profile] = {"median": summary, "runs": runs}
+        print(
+            f"{profile:<10} import {summary['import_s']:.2f}s, "
+            f"startup {summary['startup_s']:.2f}s, "
+            f"first request {summary['first_request_s'] * 1000:.0f}ms, "
+            f"ready after {summary['ready_s']:.2f}s, "
+            f"{summary['import_statements'] + summary['startup_statements']:.0f} "
+            f"statements, peak RSS {summary['peak_rss_mb']:.0f} MB"
+        )
+
+    if args.output:
+        write_results(args.output, "app_startup", vars(args), results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", nargs="+", default=["full", "api", "inference"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output")
+    main(parser.parse_args())
@@ -0,0 +1,75 @@
+"""Helpers shared by the HTTP benchmarks."""
+
+import json
+import subprocess
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (0 when empty)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies: Dict[str, List[float]], elapsed: float) -> Dict:
+    """Per-endpoint p50/p95/p99 (ms) and counts, plus overall throughput."""
+    endpoints = {}
+    for name, samples in sorted(latencies.items()):
+        endpoints[name] = {
+            "count": len(samples),
+            "p50_ms": round(percentile(samples, 50) * 1000, 2),
+            "p95_ms": round(percentile(samples, 95) * 1000, 2),
+            "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        }
+    total = sum(len(samples) for samples in latencies.values())
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def print_summary(summary: Dict):
+    print(
+        f"{summary['requests']} requests in {summary['elapsed_s']}s "
+        f"({summary['throughput_rps']} req/s)"
+    )
+    print(f"{'endpoint':<48} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, stats in summary["endpoints"].items():
+        print(
+            f"{name:<48} {stats['count']:>7} {stats['p50_ms']:>8.1f}ms "
+            f"{stats['p95_ms']:>8.1f}ms {stats['p99_ms']:>8.1f}ms"
+        )
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(path: str, benchmark: str, config: Dict, results: Dict):
+    """Saves a run as JSON so results can be compared across commits."""
+    document = {
+        "benchmark": benchmark,
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": config,
+        "results": results,
+    }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"Saved results to {path}")
@@ -0,0 +1,249 @@
+"""
+Latency of the date-range reads and of logging a session on a large
+database, and how many tables (or table partitions) each read scans.
+
+Meant to run on the same data before and after a schema change such as the
+monthly partitioning migration: load it with benchmarks.synthetic_data,
+measure, migrate, measure again:
+
+    python -m benchmarks.date_range --output results/date_range_before.json
+    alembic upgrade head
+    python -m benchmarks.date_range --output results/date_range_after.json
+
+The reads go through the app's crud functions, so each commit is measured
+with its own queries, for random patients that have sessions. Every read is
+then run once more with its statements under EXPLAIN ANALYZE, counting the
+sessions / exercise_sets / repetitions relations that were actually scanned
+(partitions skipped at plan or run time do not count). The "log session"
+case writes a completed session of --sets sets of --reps repetitions for a
+throwaway patient, who is deleted afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import event, text
+
+from app.db.base import Base
+from app.db.database import AsyncSessionLocal, async_engine
+from app.features.sessions import crud, models, schemas
+from app.features.users import crud as users_crud
+from app.features.users.schemas import UserCreate
+from benchmarks.common import print_summary, summarize, write_results
+
+SCANNED_TABLES = ("sessions", "exercise_sets", "repetitions")
+# A month of every patient's repetitions. With the partition key on
+# repetitions the range needs no joins; without it, it goes through sessions.
+MONTH_OF_REPETITIONS = {
+    True: """
+        SELECT count(*), avg(rep_quality_score) FROM repetitions
+        WHERE session_start >= :start AND session_start < :end
+    """,
+    False: """
+        SELECT count(*), avg(r.rep_quality_score) FROM repetitions r
+        JOIN exercise_sets es ON es.id = r.set_id
+        JOIN sessions s ON s.id = es.session_id
+        WHERE s.datetime_start >= :start AND s.datetime_start < :end
+    """,
+}
+
+
+def _year_ago() -> datetime:
+    return crud._manila_now() - timedelta(days=365)
+
+
+def _month_a_year_ago():
+    start = _year_ago().date().replace(day=1)
+    return start, (start + timedelta(days=32)).replace(day=1)
+
+
+async def today(db, user_id: int):
+    await crud.get_completed_sessions_json(db, user_id, crud.today_range())
+
+
+async def this_month(db, user_id: int):
+    await crud.get_completed_sessions_json(db, user_id, crud.this_month_range())
+
+
+async def month_a_year_ago(db, user_id: int):
+    await crud.get_sessions_by_date_range(db, user_id, *_month_a_year_ago())
+
+
+async def history_first_page(db, user_id: int):
+    await crud.get_session_history_json(db, user_id, limit=20)
+
+
+async def history_a_year_ago(db, user_id: int):
+    await crud.get_session_history_json(
+        db, user_id, limit=20, after=[_year_ago(), 2**31 - 1]
+    )
+
+
+async def month_of_repetitions(db, user_id: int):
+    start, end = _month_a_year_ago()
+    partitioned = "session_start" in models.Repetition.__table__.c
+    await db.execute(
+        text(MONTH_OF_REPETITIONS[partitioned]),
+        {
+            "start": datetime.combine(start, datetime.min.time()),
+            "end": datetime.combine(end, datetime.min.time()),
+        },
+    )
+
+
+READS = {
+    "sessions today": today,
+    "sessions this month": this_month,
+    "sessions of a month a year ago (ORM)": month_a_year_ago,
+    "history, first page": history_first_page,
+    "history, page a year back": history_a_year_ago,
+}
+# Scans a whole month, so it runs --scan-iterations times.
+SCANS = {"repetitions of a month, all patients": month_of_repetitions}
+
+
+def _scanned(plan: Dict, relations: set):
+    if plan.get("Actual Loops", 0) > 0:
+        name = plan.get("Relation Name", "")
+        if name.startswith(SCANNED_TABLES):
+            relations.add(name)
+    for child in plan.get("Plans", []):
+        _scanned(child, relations)
+
+
+async def relations_scanned(fn, user_id: int) -> int:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    async with AsyncSessionLocal() as db:
+        event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            await fn(db, user_id)
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+        relations = set()
+        for statement, parameters in statements:
+            connection = await db.connection()
+            plan = await connection.exec_driver_sql(
+                "EXPLAIN (ANALYZE, FORMAT JSON) " + statement, parameters
+            )
+            document = plan.scalar()
+            if isinstance(document, str):
+                document = json.loads(document)
+            _scanned(document[0]["Plan"], relations)
+        await db.rollback()
+    return len(relations)
+
+
+async def create_patient() -> int:
+    suffix = uuid.uuid4().hex[:10]
+    async with AsyncSessionLocal() as db:
+        user = await users_crud.create_user(
+            db,
+            UserCreate(
+                first_name="Bench",
+                last_name="DateRange",
+                email=f"bench-date-range-{suffix}@example.com",
+                password="unused",
+                age=40,
+                address="Benchmark",
+                sex="F",
+                contact_number=str(int(suffix, 16))[-11:],
+            ),
+            hashed_password="unused",
+        )
+        return user.id
+
+
+async def log_session(user_id: int, args):
+    sets = [
+        schemas.ExerciseSetBulkItem(
+            set_number=set_number,
+            repetitions=[
+                schemas.RepetitionCreate(rep_number=rep_number, rep_quality_score=0.8)
+                for rep_number in range(1, args.reps + 1)
+            ],
+        )
+        for set_number in range(1, args.sets + 1)
+    ]
+    async with AsyncSessionLocal() as db:
+        session = await crud.create_session(db, user_id=user_id, exercise_id=1)
+        await crud.create_exercise_sets(
+            db, user_id=user_id, session_id=session.id, sets=sets
+        )
+        await crud.update_session(
+            db,
+            user_id=user_id,
+            session_id=session.id,
+            session_update=schemas.SessionUpdate(
+                is_completed=True, session_quality_score=0.8
+            ),
+        )
+
+
+async def run(args):
+    async_engine.echo = False
+    rng = random.Random(args.seed)
+    async with AsyncSessionLocal() as db:
+        user_ids = (
+            await db.scalars(text("SELECT DISTINCT user_id FROM sessions"))
+        ).all()
+    if not user_ids:
+        raise SystemExit("No sessions to query; load data with synthetic_data first")
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    relations = {}
+    start = time.perf_counter()
+    for cases, iterations in ((READS, args.iterations), (SCANS, args.scan_iterations)):
+        for name, fn in cases.items():
+            for _ in range(iterations):
+                user_id = rng.choice(user_ids)
+                async with AsyncSessionLocal() as db:
+                    sent = time.perf_counter()
+                    await fn(db, user_id)
+                    latencies[name].append(time.perf_counter() - sent)
+            relations[name] = await relations_scanned(fn, rng.choice(user_ids))
+
+    patient = await create_patient()
+    try:
+        for _ in range(args.iterations):
+            sent = time.perf_counter()
+            await log_session(patient, args)
+            latencies["log a completed session"].append(time.perf_counter() - sent)
+    finally:
+        async with AsyncSessionLocal() as db:
+            await users_crud.delete_user(db, user_id=patient)
+    summary = summarize(latencies, time.perf_counter() - start)
+    summary["relations_scanned"] = relations
+
+    print_summary(summary)
+    print(f"\n{'read':<48} {'relations scanned':>18}")
+    for name, count in relations.items():
+        print(f"{name:<48} {count:>18}")
+
+    if args.output:
+        write_results(args.output, "date_range", vars(args), summary)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--scan-iterations", type=int, default=5)
+    parser.add_argument("--sets", type=int, default=3)
+    parser.add_argument("--reps", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    # Every model is registered through app.db.base; set the mappers up now
+    # rather than inside the first timed call.
+    Base.registry.configure()
+    asyncio.run(run(args=parser.parse_args()))
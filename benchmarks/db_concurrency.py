@@ -0,0 +1,105 @@
+"""
+Request throughput of DB-bound routes as client concurrency grows.
+
+Run it against a server started from two different commits (for example the
+sync psycopg2 routes and the async asyncpg routes) and compare the JSON files:
+
+    python -m benchmarks.db_concurrency --base-url http://localhost:8000 \
+        --concurrency 1 16 64 256 --output results/db_concurrency.json
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.common import print_summary, summarize, write_results
+
+
+async def create_fixture(client: httpx.AsyncClient) -> int:
+    """Creates a user with one completed session so the reads hit real rows."""
+    suffix = uuid.uuid4().hex[:10]
+    user = await client.post(
+        "/users/create",
+        json={
+            "first_name": "Load",
+            "last_name": "Test",
+            "email": f"load-{suffix}@example.com",
+            "password": "load-test-password",
+            "age": 40,
+            "address": "Benchmark",
+            "sex": "F",
+            "contact_number": str(int(suffix, 16))[-11:],
+        },
+    )
+    user.raise_for_status()
+    user_id = user.json()["id"]
+
+    session = await client.post(
+        f"/users/{user_id}/sessions/start",
+        json={"user_id": user_id, "exercise_id": 1},
+    )
+    session.raise_for_status()
+    session_id = session.json()["id"]
+    await client.put(
+        f"/users/{user_id}/sessions/{session_id}/end",
+        json={"is_completed": True, "session_quality_score": 0.9},
+    )
+    return user_id
+
+
+async def run_level(client, paths, concurrency: int, duration: float):
+    latencies = defaultdict(list)
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset: int):
+        i = offset
+        while time.perf_counter() < deadline:
+            name, path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies[name].append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=max(args.concurrency))
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=60
+    ) as client:
+        user_id = await create_fixture(client)
+        paths = [
+            ("GET /users/{id}/requirements", f"/users/{user_id}/requirements"),
+            ("GET /users/{id}/problems", f"/users/{user_id}/problems"),
+            (
+                "GET /users/{id}/sessions/filter/all_time",
+                f"/users/{user_id}/sessions/filter/all_time",
+            ),
+        ]
+
+        results = {}
+        for concurrency in args.concurrency:
+            print(f"\n--- concurrency {concurrency} ---")
+            summary = await run_level(client, paths, concurrency, args.duration)
+            print_summary(summary)
+            results[str(concurrency)] = summary
+
+    if args.output:
+        write_results(args.output, "db_concurrency", vars(args), results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--output")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,106 @@
+"""
+Throughput of the dataset WebSocket frame parsing, in frames per second for a
+single worker process.
+
+Compares the original per-frame JSON path (json + WebsocketMessage validation),
+the protocol 1 fast path (json only) and protocol 2 binary batches.
+
+    python -m benchmarks.frame_protocol --frames 20000 --batch 30
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.prediction.frame_protocol import decode_frame_batch, encode_frame_batch
+from app.prediction.schemas import WebsocketMessage
+
+
+def make_frames(count: int, landmarks: int, values: int):
+    rng = np.random.default_rng(0)
+    timestamps = np.arange(count, dtype=np.int64) * 33 + 1_700_000_000_000
+    frames = rng.random((count, landmarks, values), dtype=np.float32)
+    names = [f"landmark_{i}" for i in range(landmarks)]
+    return names, timestamps, frames
+
+
+def bench_json_validated(messages):
+    store = {}
+    for text in messages:
+        message = WebsocketMessage(**json.loads(text))
+        store[message.payload.timestamp] = message.payload.landmarks
+    return len(store)
+
+
+def bench_json_fast(messages):
+    store = {}
+    for text in messages:
+        payload = json.loads(text)["payload"]
+        store[payload["timestamp"]] = payload["landmarks"]
+    return len(store)
+
+
+def bench_binary(messages, landmarks: int, values: int):
+    chunks = []
+    for buffer in messages:
+        chunks.append(decode_frame_batch(buffer, landmarks, values))
+    return sum(len(ts) for ts, _ in chunks)
+
+
+def timed(label: str, frame_count: int, fn, *args):
+    start = time.perf_counter()
+    stored = fn(*args)
+    elapsed = time.perf_counter() - start
+    assert stored == frame_count, (label, stored)
+    print(f"{label:<28} {frame_count / elapsed:>14,.0f} frames/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=20_000)
+    parser.add_argument("--landmarks", type=int, default=33)
+    parser.add_argument("--values", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=30)
+    args = parser.parse_args()
+
+    names, timestamps, frames = make_frames(args.frames, args.landmarks, args.values)
+
+    text_messages = [
+        json.dumps(
+            {
+                "event": "frame",
+                "payload": {
+                    "timestamp": str(ts),
+                    "landmarks": dict(zip(names, frame.tolist())),
+                },
+            }
+        )
+        for ts, frame in zip(timestamps.tolist(), frames)
+    ]
+    binary_messages = [
+        encode_frame_batch(
+            timestamps[i : i + args.batch], frames[i : i + args.batch]
+        )
+        for i in range(0, args.frames, args.batch)
+    ]
+
+    print(
+        f"{args.frames} frames, {args.landmarks} landmarks x {args.values} values, "
+        f"binary batch size {args.batch}"
+    )
+    timed("json + WebsocketMessage", args.frames, bench_json_validated, text_messages)
+    timed("json fast path (v1)", args.frames, bench_json_fast, text_messages)
+    timed(
+        "binary batches (v2)",
+        args.frames,
+        bench_binary,
+        binary_messages,
+        args.landmarks,
+        args.values,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Latency of non-auth endpoints while the server is hit by a login storm.
+
+Each phase runs probe clients against cheap read endpoints for --duration
+seconds: first on a quiet server, then while --storm clients hammer /token
+with valid credentials. Run it against a server started from two different
+commits (bcrypt in the request thread pool vs the password process pool)
+and compare the probe p99s:
+
+    python -m benchmarks.login_storm --base-url http://localhost:8000 \
+        --probes 16 --storm 64 --output results/login_storm.json
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.common import print_summary, summarize, write_results
+
+PASSWORD = "login-storm-password"
+
+
+async def create_fixture(client: httpx.AsyncClient):
+    suffix = uuid.uuid4().hex[:10]
+    email = f"storm-{suffix}@example.com"
+    user = await client.post(
+        "/users/create",
+        json={
+            "first_name": "Login",
+            "last_name": "Storm",
+            "email": email,
+            "password": PASSWORD,
+            "age": 40,
+            "address": "Benchmark",
+            "sex": "F",
+            "contact_number": str(int(suffix, 16))[-11:],
+        },
+    )
+    user.raise_for_status()
+    return user.json()["id"], email
+
+
+async def run_phase(client, probe_paths, probes: int, storm: int, email, duration):
+    latencies = defaultdict(list)
+    statuses = defaultdict(int)
+    deadline = time.perf_counter() + duration
+
+    async def probe(offset: int):
+        i = offset
+        while time.perf_counter() < deadline:
+            name, path = probe_paths[i % len(probe_paths)]
+            i += 1
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies[name].append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    async def login():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.post(
+                "/token", data={"username": email, "password": PASSWORD}
+            )
+            latencies["POST /token"].append(time.perf_counter() - start)
+            # 503 is the password pool shedding load, which is expected here.
+            statuses[response.status_code] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(probe(i) for i in range(probes)), *(login() for _ in range(storm))
+    )
+    summary = summarize(latencies, time.perf_counter() - start)
+    if statuses:
+        summary["token_statuses"] = dict(statuses)
+    return summary
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.probes + args.storm)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=120
+    ) as client:
+        user_id, email = await create_fixture(client)
+        probe_paths = [
+            ("GET /exercises/all", "/exercises/all"),
+            ("GET /users/{id}/requirements", f"/users/{user_id}/requirements"),
+            ("GET /users/{id}/problems", f"/users/{user_id}/problems"),
+        ]
+
+        results = {}
+        for phase, storm in (("quiet", 0), ("login_storm", args.storm)):
+            print(f"\n--- {phase}: {args.probes} probes, {storm} login clients ---")
+            summary = await run_phase(
+                client, probe_paths, args.probes, storm, email, args.duration
+            )
+            print_summary(summary)
+            if "token_statuses" in summary:
+                print(f"/token statuses: {summary['token_statuses']}")
+            results[phase] = summary
+
+    if args.output:
+        write_results(args.output, "login_storm", vars(args), results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--probes", type=int, default=16)
+    parser.add_argument("--storm", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--output")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,210 @@
+"""
+End-to-end load test that replays what a patient's app does during a session.
+
+Each virtual patient loops over the real workload until --duration runs out:
+start a session, then for every set create it, ask for a prediction every few
+frames while posting each repetition, complete the set, end the session and
+open the session history. Every request is timed per endpoint; a phase runs
+per --concurrency level (number of simultaneous patients).
+
+Run it against a local app and Postgres, on two commits, and compare the JSON
+files:
+
+    python -m benchmarks.patient_session --base-url http://localhost:8000 \
+        --concurrency 1 8 32 --duration 30 --output results/patient_session.json
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.common import print_summary, summarize, write_results
+
+# The model takes a window of 20 frames of 42 values (21 landmarks x, y).
+FRAMES_PER_WINDOW = 20
+VALUES_PER_FRAME = 42
+EXERCISES = [(1, "hiding_face"), (2, "flank_stretch"), (3, "torso_rotation")]
+
+
+async def create_patient(client: httpx.AsyncClient) -> int:
+    suffix = uuid.uuid4().hex[:10]
+    user = await client.post(
+        "/users/create",
+        json={
+            "first_name": "Load",
+            "last_name": "Patient",
+            "email": f"patient-{suffix}@example.com",
+            "password": "patient-session-password",
+            "age": 45,
+            "address": "Benchmark",
+            "sex": "M",
+            "contact_number": str(int(suffix, 16))[-11:],
+        },
+    )
+    user.raise_for_status()
+    return user.json()["id"]
+
+
+def landmark_window(rng: random.Random):
+    return [
+        [rng.random() for _ in range(VALUES_PER_FRAME)]
+        for _ in range(FRAMES_PER_WINDOW)
+    ]
+
+
+class Patient:
+    def __init__(self, client: httpx.AsyncClient, user_id: int, args, latencies):
+        self.client = client
+        self.user_id = user_id
+        self.args = args
+        self.latencies = latencies
+        self.rng = random.Random(user_id)
+        self.sessions = 0
+
+    async def request(self, name: str, method: str, path: str, **kwargs):
+        start = time.perf_counter()
+        response = await self.client.request(method, path, **kwargs)
+        self.latencies[name].append(time.perf_counter() - start)
+        response.raise_for_status()
+        if self.args.think_ms:
+            await asyncio.sleep(self.rng.uniform(0, 2 * self.args.think_ms) / 1000)
+        return response.json()
+
+    async def run_session(self):
+        args = self.args
+        exercise_id, exercise_name = self.rng.choice(EXERCISES)
+        base = f"/users/{self.user_id}/sessions"
+        session = await self.request(
+            "POST /sessions/start",
+            "POST",
+            f"{base}/start",
+            json={"user_id": self.user_id, "exercise_id": exercise_id},
+        )
+        session_path = f"{base}/{session['id']}"
+
+        for set_number in range(1, args.sets + 1):
+            exercise_set = await self.request(
+                "POST /sessions/{id}/sets",
+                "POST",
+                f"{session_path}/sets",
+                json={"set_number": set_number},
+            )
+            set_path = f"{session_path}/sets/{exercise_set['id']}"
+            for rep_number in range(1, args.reps + 1):
+                for _ in range(args.predictions_per_rep):
+                    await self.request(
+                        "POST /predict",
+                        "POST",
+                        "/predict/api/predict/",
+                        json={
+                            "list_landmarks": landmark_window(self.rng),
+                            "exercise_name": exercise_name,
+                        },
+                    )
+                await self.request(
+                    "POST /sets/{id}/repetitions",
+                    "POST",
+                    f"{set_path}/repetitions",
+                    json={
+                        "rep_number": rep_number,
+                        "rep_quality_score": round(self.rng.uniform(0.4, 1.0), 3),
+                        "is_completed": True,
+                        "error_flag": None,
+                    },
+                )
+            await self.request(
+                "PUT /sessions/{id}/sets/{id}",
+                "PUT",
+                set_path,
+                json={
+                    "set_quality_score": round(self.rng.uniform(0.5, 1.0), 3),
+                    "is_completed": True,
+                    "error_flag": None,
+                },
+            )
+
+        await self.request(
+            "PUT /sessions/{id}/end",
+            "PUT",
+            f"{session_path}/end",
+            json={
+                "is_completed": True,
+                "session_quality_score": round(self.rng.uniform(0.5, 1.0), 3),
+            },
+        )
+        await self.request(
+            "GET /sessions/history", "GET", f"{base}/history", params={"limit": 20}
+        )
+        self.sessions += 1
+
+
+async def run_level(client, user_ids, args):
+    latencies = defaultdict(list)
+    patients = [Patient(client, user_id, args, latencies) for user_id in user_ids]
+    deadline = time.perf_counter() + args.duration
+
+    async def loop(patient: Patient):
+        # Sessions in progress at the deadline are finished, not cut short.
+        while time.perf_counter() < deadline:
+            await patient.run_session()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(loop(patient) for patient in patients))
+    elapsed = time.perf_counter() - start
+    summary = summarize(latencies, elapsed)
+    sessions = sum(patient.sessions for patient in patients)
+    summary["sessions"] = sessions
+    summary["sessions_per_s"] = round(sessions / elapsed, 2) if elapsed else 0.0
+    return summary
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=max(args.concurrency))
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=120
+    ) as client:
+        user_ids = [
+            await create_patient(client) for _ in range(max(args.concurrency))
+        ]
+
+        results = {}
+        for concurrency in args.concurrency:
+            print(f"\n--- {concurrency} patients ---")
+            summary = await run_level(client, user_ids[:concurrency], args)
+            print_summary(summary)
+            print(
+                f"{summary['sessions']} sessions completed "
+                f"({summary['sessions_per_s']} sessions/s)"
+            )
+            results[str(concurrency)] = summary
+
+    if args.output:
+        write_results(args.output, "patient_session", vars(args), results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--sets", type=int, default=3)
+    parser.add_argument("--reps", type=int, default=10)
+    parser.add_argument(
+        "--predictions-per-rep",
+        type=int,
+        default=2,
+        help="prediction requests per repetition (one per window of frames)",
+    )
+    parser.add_argument(
+        "--think-ms",
+        type=float,
+        default=0.0,
+        help="mean pause after each request, like a client between frames",
+    )
+    parser.add_argument("--output")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,283 @@
+"""
+Statement-count budget per endpoint, to catch N+1 queries.
+
+Walks a user through every DB-backed endpoint (sign-up, onboarding, a session
+with sets and repetitions, the reads, then the deletes) and compares the
+statements each request ran with the budget below. The reads run on a session
+with several sets and repetitions, so a per-row query shows up as a count
+over budget.
+
+tests/test_query_budget.py runs this walk in-process and is what enforces the
+budgets. This script is an optional extra that runs it against a live server
+started with SQL_DEBUG_HEADERS=true, reading each response's
+X-DB-Query-Count; it exits 1 if any endpoint goes over. A long catalog TTL
+keeps the catalog's version checks out of the counts, as in the tests:
+
+    SQL_DEBUG_HEADERS=true EXERCISE_CATALOG_TTL_SECONDS=3600 \
+        uvicorn app.main:app --port 8000
+    python -m benchmarks.query_budget --base-url http://localhost:8000
+
+The budgets live in tests/query_budgets.py; when a change legitimately adds
+a statement, raise its budget there in the same commit.
+"""
+
+import argparse
+import asyncio
+import sys
+import uuid
+
+import httpx
+
+from benchmarks.common import write_results
+from tests.query_budgets import BUDGETS
+
+SETS = 3
+REPS_PER_SET = 5
+
+
+class Walk:
+    """Calls endpoints and keeps the most statements each route ran."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.counts = {}
+
+    async def send(self, route: str, path: str, **kwargs):
+        """Sends one request; returns the response and its statement count."""
+        method = route.split(" ", 1)[0]
+        response = await self.client.request(method, path, **kwargs)
+        if "X-DB-Query-Count" not in response.headers:
+            raise RuntimeError("No X-DB-Query-Count header; set SQL_DEBUG_HEADERS=true")
+        return response, int(response.headers["X-DB-Query-Count"])
+
+    async def call(self, route: str, path: str, expect: int = 200, **kwargs):
+        response, count = await self.send(route, path, **kwargs)
+        if response.status_code != expect:
+            raise RuntimeError(
+                f"{route}: expected {expect}, got {response.status_code}: "
+                f"{response.text[:200]}"
+            )
+        self.counts[route] = max(count, self.counts.get(route, 0))
+        return response.json() if response.content else None
+
+
+async def walk(w: Walk):
+    suffix = uuid.uuid4().hex[:10]
+    email = f"budget-{suffix}@example.com"
+    password = "query-budget-password"
+
+    # Warm the per-worker caches so the counts below are steady-state ones.
+    await w.client.get("/exercises/all")
+    user = await w.call(
+        "POST /users/create",
+        "/users/create",
+        201,
+        json={
+            "first_name": "Query",
+            "last_name": "Budget",
+            "email": email,
+            "password": password,
+            "age": 40,
+            "address": "Benchmark",
+            "sex": "F",
+            "contact_number": str(int(suffix, 16))[-11:],
+        },
+    )
+    uid = user["id"]
+    token = await w.call(
+        "POST /token", "/token", data={"username": email, "password": password}
+    )
+    token = await w.call(
+        "POST /token/refresh",
+        "/token/refresh",
+        json={"refresh_token": token["refresh_token"]},
+    )
+    # Some routes require the token, the others ignore it.
+    w.client.headers["Authorization"] = f"Bearer {token['access_token']}"
+    await w.client.get("/users/me")
+    await w.call("GET /users/me", "/users/me")
+
+    await w.call(
+        "POST /users/{user_id}/onboarding",
+        f"/users/{uid}/onboarding",
+        201,
+        json={"primary_goal": "Mobility", "pain_score": 3, "preferred_schedule": 3},
+    )
+    await w.call("GET /users/{user_id}/onboarding", f"/users/{uid}/onboarding")
+    await w.call(
+        "PUT /users/{user_id}/onboarding",
+        f"/users/{uid}/onboarding",
+        json={"pain_score": 2},
+    )
+    await w.call(
+        "PUT /users/{user_id}/onboarding/custom-schedule-days",
+        f"/users/{uid}/onboarding/custom-schedule-days",
+        json={"custom_allowed_days": [1, 3, 5]},
+    )
+    await w.call("PUT /users/{user_id}", f"/users/{uid}", json={"address": "Moved"})
+    await w.call("GET /users/{user_id}", f"/users/{uid}")
+    await w.call("GET /users/all", "/users/all", params={"limit": 20})
+    await w.call("GET /users/list", "/users/list", params={"limit": 20})
+
+    for area in ("hiding_face", "flank_stretch"):
+        await w.call(
+            "POST /users/{user_id}/problems",
+            f"/users/{uid}/problems",
+            201,
+            json={"problem_area": area},
+        )
+    await w.call(
+        "PUT /users/{user_id}/problems",
+        f"/users/{uid}/problems",
+        json={"problem_area": "torso_rotation"},
+    )
+    await w.call("GET /users/{user_id}/problems", f"/users/{uid}/problems")
+
+    await w.call("GET /exercises/all", "/exercises/all")
+    await w.call("GET /exercises/{exercise_id}", "/exercises/1")
+
+    requirement = await w.call(
+        "POST /users/{user_id}/requirements",
+        f"/users/{uid}/requirements",
+        201,
+        json={
+            "user_id": uid,
+            "exercise_id": 1,
+            "number_of_reps": REPS_PER_SET,
+            "number_of_sets": SETS,
+        },
+    )
+    await w.call("GET /users/{user_id}/requirements", f"/users/{uid}/requirements")
+    await w.call(
+        "PUT /users/{user_id}/requirements/{requirement_id}",
+        f"/users/{uid}/requirements/{requirement['id']}",
+        json={"number_of_reps": REPS_PER_SET + 1, "number_of_sets": SETS},
+    )
+
+    session = await w.call(
+        "POST /users/{user_id}/sessions/start",
+        f"/users/{uid}/sessions/start",
+        201,
+        json={"user_id": uid, "exercise_id": 1},
+    )
+    base = f"/users/{uid}/sessions/{session['id']}"
+    sets = await w.call(
+        "POST /users/{user_id}/sessions/{session_id}/sets/bulk",
+        f"{base}/sets/bulk",
+        201,
+        json={
+            "sets": [
+                {
+                    "set_number": number,
+                    "repetitions": [
+                        {"rep_number": rep, "rep_quality_score": 0.8}
+                        for rep in range(1, REPS_PER_SET + 1)
+                    ],
+                }
+                for number in range(1, SETS + 1)
+            ]
+        },
+    )
+    extra = await w.call(
+        "POST /users/{user_id}/sessions/{session_id}/sets",
+        f"{base}/sets",
+        201,
+        json={"set_number": SETS + 1},
+    )
+    set_path = f"{base}/sets/{extra['id']}"
+    repetition = await w.call(
+        "POST /users/{user_id}/sessions/{session_id}/sets/{set_id}/repetitions",
+        f"{set_path}/repetitions",
+        201,
+        json={"rep_number": 1, "rep_quality_score": 0.5},
+    )
+    await w.call(
+        "POST /users/{user_id}/sessions/{session_id}/sets/{set_id}/repetitions/bulk",
+        f"{set_path}/repetitions/bulk",
+        201,
+        json={
+            "repetitions": [
+                {"rep_number": rep, "rep_quality_score": 0.6}
+                for rep in range(2, REPS_PER_SET + 1)
+            ]
+        },
+    )
+    await w.call(
+        "GET /users/{user_id}/sessions/{session_id}/sets/{set_id}/repetitions/all",
+        f"{set_path}/repetitions/all",
+    )
+    await w.call(
+        "GET /users/{user_id}/sessions/{session_id}/sets/{set_id}/repetitions/{repetition_id}",
+        f"{set_path}/repetitions/{repetition['id']}",
+    )
+    await w.call(
+        "GET /users/{user_id}/sessions/{session_id}/sets/{set_id}",
+        f"{base}/sets/{sets[0]['id']}",
+    )
+    await w.call(
+        "PUT /users/{user_id}/sessions/{session_id}/sets/{set_id}",
+        f"{base}/sets/{sets[0]['id']}",
+        json={"set_quality_score": 0.7, "is_completed": True, "error_flag": None},
+    )
+    await w.call(
+        "PUT /users/{user_id}/sessions/{session_id}/end",
+        f"{base}/end",
+        json={"is_completed": True, "session_quality_score": 0.8},
+    )
+
+    await w.call("GET /users/{user_id}/sessions/{session_id}", base)
+    await w.call("GET /users/{user_id}/sessions/{session_id}/detail", f"{base}/detail")
+    await w.call(
+        "GET /users/{user_id}/sessions/history", f"/users/{uid}/sessions/history"
+    )
+    for time_filter in ("today", "this_week", "all_time"):
+        await w.call(
+            "GET /users/{user_id}/sessions/filter/{time_filter}",
+            f"/users/{uid}/sessions/filter/{time_filter}",
+        )
+    await w.call("GET /users/{user_id}/progress/daily", f"/users/{uid}/progress/daily")
+    await w.call(
+        "GET /users/{user_id}/progress/summary", f"/users/{uid}/progress/summary"
+    )
+    await w.call("GET /users/me/dashboard", "/users/me/dashboard")
+
+    await w.call(
+        "POST /users/{user_id}/change-password",
+        f"/users/{uid}/change-password",
+        json={"current_password": password, "new_password": password + "-2"},
+    )
+    await w.call("DELETE /users/{user_id}/onboarding", f"/users/{uid}/onboarding", 204)
+    await w.call("DELETE /users/{user_id}", f"/users/{uid}", 204)
+
+
+async def main(args) -> int:
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        w = Walk(client)
+        await walk(w)
+
+    failures = 0
+    print(f"{'endpoint':<88} {'queries':>7} {'budget':>6}")
+    for route, count in w.counts.items():
+        budget = BUDGETS.get(route)
+        over = budget is None or count > budget
+        failures += over
+        flag = "  OVER" if over else ""
+        print(
+            f"{route:<88} {count:>7} {budget if budget is not None else '-':>6}{flag}"
+        )
+    for route in sorted(set(BUDGETS) - set(w.counts)):
+        print(f"{route:<88} {'-':>7} {BUDGETS[route]:>6}  not exercised")
+
+    if args.output:
+        write_results(args.output, "query_budget", vars(args), {"queries": w.counts})
+    if failures:
+        print(f"\n{failures} endpoint(s) over budget or without one")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--output")
+    sys.exit(asyncio.run(main(parser.parse_args())))
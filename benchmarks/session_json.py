@@ -0,0 +1,170 @@
+"""
+CPU time per response for the session history and detail endpoints, comparing
+the ORM path (selectin loads -> ORM objects -> Pydantic -> JSON) with the
+Postgres JSON path (json_build_object / json_agg -> bytes).
+
+Runs in-process against DATABASE_URL (an already migrated database), seeding
+a throwaway user that is deleted afterwards:
+
+    python -m benchmarks.session_json --sessions 200 --sets 3 --reps 10 \
+        --page-size 20 --iterations 200
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Dict, List
+
+from app.core.pagination import Page
+from app.db.base import Base
+from app.db.database import AsyncSessionLocal, async_engine
+from app.features.sessions import crud, schemas
+from app.features.users import crud as users_crud
+from app.features.users.schemas import UserCreate
+from benchmarks.common import percentile, write_results
+
+SessionPage = Page[schemas.SessionOut]
+
+
+async def seed(args) -> int:
+    suffix = uuid.uuid4().hex[:10]
+    async with AsyncSessionLocal() as db:
+        user = await users_crud.create_user(
+            db,
+            UserCreate(
+                first_name="Bench",
+                last_name="Json",
+                email=f"bench-json-{suffix}@example.com",
+                password="unused",
+                age=40,
+                address="Benchmark",
+                sex="F",
+                contact_number=str(int(suffix, 16))[-11:],
+            ),
+            hashed_password="unused",
+        )
+        sets = [
+            schemas.ExerciseSetBulkItem(
+                set_number=set_number,
+                repetitions=[
+                    schemas.RepetitionCreate(
+                        rep_number=rep_number, rep_quality_score=0.75
+                    )
+                    for rep_number in range(1, args.reps + 1)
+                ],
+            )
+            for set_number in range(1, args.sets + 1)
+        ]
+        for _ in range(args.sessions):
+            session = await crud.create_session(
+                db, user_id=user.id, exercise_id=args.exercise_id
+            )
+            await crud.create_exercise_sets(
+                db, user_id=user.id, session_id=session.id, sets=sets
+            )
+            await crud.update_session(
+                db,
+                user_id=user.id,
+                session_id=session.id,
+                session_update=schemas.SessionUpdate(
+                    is_completed=True, session_quality_score=0.8
+                ),
+            )
+        return user.id
+
+
+async def history_orm(db, user_id: int, limit: int) -> bytes:
+    items, next_cursor = await crud.get_session_history(db, user_id, limit)
+    return SessionPage(items=items, next_cursor=next_cursor).model_dump_json().encode()
+
+
+async def history_json(db, user_id: int, limit: int) -> bytes:
+    items, next_cursor = await crud.get_session_history_json(db, user_id, limit)
+    return f'{{"items":[{",".join(items)}],"next_cursor":null}}'.encode()
+
+
+async def detail_orm(db, user_id: int, session_id: int) -> bytes:
+    session = await crud.get_session_by_id(db, user_id, session_id)
+    return schemas.SessionOut.model_validate(session).model_dump_json().encode()
+
+
+async def detail_json(db, user_id: int, session_id: int) -> bytes:
+    return (await crud.get_session_json(db, user_id, session_id)).encode()
+
+
+async def measure(fn, iterations: int, *args) -> Dict:
+    cpu: List[float] = []
+    wall: List[float] = []
+    size = 0
+    for _ in range(iterations):
+        # A fresh session per response, as each request gets one.
+        async with AsyncSessionLocal() as db:
+            cpu_start, wall_start = time.process_time(), time.perf_counter()
+            size = len(await fn(db, *args))
+            cpu.append(time.process_time() - cpu_start)
+            wall.append(time.perf_counter() - wall_start)
+    return {
+        "cpu_ms_mean": round(sum(cpu) / len(cpu) * 1000, 3),
+        "cpu_ms_p95": round(percentile(cpu, 95) * 1000, 3),
+        "wall_ms_p50": round(percentile(wall, 50) * 1000, 3),
+        "response_bytes": size,
+    }
+
+
+async def run(args):
+    # SQL echo would dominate the CPU profile.
+    async_engine.echo = False
+    user_id = await seed(args)
+    try:
+        async with AsyncSessionLocal() as db:
+            items, _ = await crud.get_session_history(db, user_id, 1)
+            session_id = items[0].id
+
+        cases = {
+            "history/orm": (history_orm, user_id, args.page_size),
+            "history/postgres_json": (history_json, user_id, args.page_size),
+            "detail/orm": (detail_orm, user_id, session_id),
+            "detail/postgres_json": (detail_json, user_id, session_id),
+        }
+        results = {}
+        for name, (fn, *fn_args) in cases.items():
+            await measure(fn, min(10, args.iterations), *fn_args)  # warm-up
+            results[name] = await measure(fn, args.iterations, *fn_args)
+
+        print(
+            f"{'case':<24} {'cpu mean':>10} {'cpu p95':>10} {'wall p50':>10} {'bytes':>9}"
+        )
+        for name, stats in results.items():
+            print(
+                f"{name:<24} {stats['cpu_ms_mean']:>8.3f}ms {stats['cpu_ms_p95']:>8.3f}ms "
+                f"{stats['wall_ms_p50']:>8.3f}ms {stats['response_bytes']:>9}"
+            )
+        return results
+    finally:
+        async with AsyncSessionLocal() as db:
+            await users_crud.delete_user(db, user_id)
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--sets", type=int, default=3)
+    parser.add_argument("--reps", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--exercise-id", type=int, default=1)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    # Every model is registered through app.db.base; set the mappers up now
+    # rather than inside the first timed call.
+    Base.registry.configure()
+    results = asyncio.run(run(args))
+    if args.output:
+        write_results(args.output, "session_json", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
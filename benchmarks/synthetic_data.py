@@ -0,0 +1,459 @@
+"""
+Bulk-loads synthetic patients into DATABASE_URL for scaling tests.
+
+Every user gets onboarding, one to three problems with their session
+requirements, and sessions spread over the last --years with realistic
+shapes: per-user activity drawn from a log-normal (a few very active
+patients, many occasional ones), morning/evening sessions, some abandoned
+partway, and repetition scores that start at a per-user skill level and
+improve over time. daily_progress is filled in for the new sessions, and
+the monthly partitions the sessions fall in are created before loading.
+
+Rows are written with COPY (asyncpg's binary copy_records_to_table) in
+batches of users, so millions of repetitions load in minutes. Ids come
+from the tables' sequences, so run it against a database nothing else is
+writing to. The same --seed produces the same data.
+
+Afterwards (or on its own with --report-only) it prints row counts and the
+table and index sizes, which --output saves with the run:
+
+    python -m benchmarks.synthetic_data --users 1000 --years 2 \
+        --output results/synthetic_data.json
+
+All synthetic users share the password "synthetic-password".
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+from zoneinfo import ZoneInfo
+
+from app.core.passwords import hash_password
+from app.db.database import async_engine, engine
+from app.db.partitions import ensure_partitions
+from benchmarks.common import write_results
+
+PASSWORD = "synthetic-password"
+TABLES = [
+    "users",
+    "onboarding",
+    "user_problems",
+    "session_requirements",
+    "sessions",
+    "exercise_sets",
+    "repetitions",
+    "daily_progress",
+]
+PRIMARY_GOALS = ["Reduce pain", "Improve mobility", "Build strength", "Posture"]
+SET_ERRORS = ["incomplete_range", "poor_form"]
+REP_ERRORS = ["elbow_drop", "shoulder_shrug", "trunk_lean", "too_fast"]
+
+COLUMNS = {
+    "users": [
+        "id",
+        "first_name",
+        "last_name",
+        "email",
+        "hashed_password",
+        "age",
+        "sex",
+        "contact_number",
+        "address",
+    ],
+    "onboarding": [
+        "id",
+        "primary_goal",
+        "pain_score",
+        "preferred_schedule",
+        "custom_allowed_days",
+        "user_id",
+    ],
+    "user_problems": ["id", "problem_area", "user_id", "exercise_id"],
+    "session_requirements": [
+        "id",
+        "number_of_reps",
+        "number_of_sets",
+        "user_id",
+        "exercise_id",
+    ],
+    "sessions": [
+        "id",
+        "datetime_start",
+        "datetime_end",
+        "is_completed",
+        "session_quality_score",
+        "error_flag",
+        "user_id",
+        "exercise_id",
+    ],
+    "exercise_sets": [
+        "id",
+        "set_number",
+        "set_quality_score",
+        "is_completed",
+        "error_flag",
+        "session_id",
+        "session_start",
+    ],
+    "repetitions": [
+        "id",
+        "rep_number",
+        "rep_quality_score",
+        "is_completed",
+        "error_flag",
+        "set_id",
+        "session_start",
+    ],
+}
+
+
+class Generator:
+    """Builds rows batch by batch; ids continue from each table's sequence."""
+
+    def __init__(self, args, exercises: Dict[int, str], next_ids: Dict[str, int]):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.exercises = exercises
+        self.next_ids = next_ids
+        self.hashed_password = hash_password(PASSWORD)
+        self.now = datetime.now(ZoneInfo("Asia/Manila")).replace(tzinfo=None)
+        self.span = timedelta(days=365 * args.years)
+
+    def _id(self, table: str) -> int:
+        value = self.next_ids[table]
+        self.next_ids[table] = value + 1
+        return value
+
+    def _session_start(self, joined: datetime) -> datetime:
+        day = joined + (self.now - joined) * self.rng.random()
+        roll = self.rng.random()
+        if roll < 0.4:
+            hour = self.rng.uniform(6, 10)
+        elif roll < 0.85:
+            hour = self.rng.uniform(17, 21.5)
+        else:
+            hour = self.rng.uniform(10, 17)
+        start = day.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(
+            hours=hour
+        )
+        return min(start, self.now)
+
+    def batch(self, users: int) -> Dict[str, List[tuple]]:
+        rng = self.rng
+        rows: Dict[str, List[tuple]] = {table: [] for table in COLUMNS}
+
+        for _ in range(users):
+            user_id = self._id("users")
+            rows["users"].append(
+                (
+                    user_id,
+                    "Synthetic",
+                    f"Patient {user_id}",
+                    f"synthetic-{user_id}@example.com",
+                    self.hashed_password,
+                    rng.randint(25, 80),
+                    rng.choice(["M", "F"]),
+                    f"8{user_id:010d}",
+                    "Synthetic data",
+                )
+            )
+            schedule = rng.randint(2, 5)
+            rows["onboarding"].append(
+                (
+                    self._id("onboarding"),
+                    rng.choice(PRIMARY_GOALS),
+                    rng.randint(1, 10),
+                    schedule,
+                    sorted(rng.sample(range(7), schedule)),
+                    user_id,
+                )
+            )
+
+            requirements = {}
+            for exercise_id in rng.sample(
+                sorted(self.exercises), rng.randint(1, len(self.exercises))
+            ):
+                rows["user_problems"].append(
+                    (
+                        self._id("user_problems"),
+                        self.exercises[exercise_id].lower().replace(" ", "_"),
+                        user_id,
+                        exercise_id,
+                    )
+                )
+                requirement = (rng.randint(8, 15), rng.randint(2, 4))
+                requirements[exercise_id] = requirement
+                rows["session_requirements"].append(
+                    (
+                        self._id("session_requirements"),
+                        *requirement,
+                        user_id,
+                        exercise_id,
+                    )
+                )
+
+            # A few very active patients, many occasional ones.
+            per_week = min(
+                14.0, rng.lognormvariate(math.log(self.args.sessions_per_week), 0.6)
+            )
+            joined = self.now - self.span * rng.uniform(0.25, 1.0)
+            weeks = (self.now - joined).days / 7
+            skill = min(0.9, max(0.3, rng.gauss(0.68, 0.08)))
+            starts = sorted(
+                self._session_start(joined) for _ in range(int(per_week * weeks))
+            )
+            for start in starts:
+                self._session(rows, user_id, start, joined, skill, requirements)
+
+        return rows
+
+    def _session(self, rows, user_id, start, joined, skill, requirements):
+        rng = self.rng
+        exercise_id = rng.choice(sorted(requirements))
+        reps, sets = requirements[exercise_id]
+        session_id = self._id("sessions")
+        completed = rng.random() < 0.85
+        sets_done = sets if completed else rng.randint(1, sets)
+        # Scores improve by up to 0.15 over the patient's time in the program.
+        progress = (start - joined) / (self.now - joined) if self.now > joined else 1
+        mean = min(0.97, skill + 0.15 * progress)
+
+        elapsed = 0.0
+        scores = []
+        for set_number in range(1, sets_done + 1):
+            set_id = self._id("exercise_sets")
+            last_partial = not completed and set_number == sets_done
+            reps_done = rng.randint(1, reps) if last_partial else reps
+            set_scores = []
+            for rep_number in range(1, reps_done + 1):
+                score = min(1.0, max(0.0, rng.gauss(mean, 0.1)))
+                set_scores.append(score)
+                rows["repetitions"].append(
+                    (
+                        self._id("repetitions"),
+                        rep_number,
+                        round(score, 3),
+                        True,
+                        rng.choice(REP_ERRORS) if score < 0.5 else None,
+                        set_id,
+                        start,
+                    )
+                )
+            set_score = sum(set_scores) / len(set_scores)
+            scores.extend(set_scores)
+            rows["exercise_sets"].append(
+                (
+                    set_id,
+                    set_number,
+                    round(set_score, 3),
+                    not last_partial,
+                    rng.choice(SET_ERRORS) if set_score < 0.55 else None,
+                    session_id,
+                    start,
+                )
+            )
+            elapsed += reps_done * rng.uniform(4, 8) + rng.uniform(30, 90)
+
+        quality = sum(scores) / len(scores) if completed else None
+        rows["sessions"].append(
+            (
+                session_id,
+                start,
+                start + timedelta(seconds=elapsed),
+                completed,
+                round(quality, 3) if quality is not None else None,
+                "poor_form" if quality is not None and quality < 0.55 else None,
+                user_id,
+                exercise_id,
+            )
+        )
+
+
+async def next_ids(conn) -> Dict[str, int]:
+    ids = {}
+    for table in COLUMNS:
+        ids[table] = await conn.fetchval(
+            "SELECT nextval(pg_get_serial_sequence($1, 'id'))", table
+        )
+    return ids
+
+
+async def advance_sequences(conn, ids: Dict[str, int]):
+    for table, next_id in ids.items():
+        await conn.execute(
+            "SELECT setval(pg_get_serial_sequence($1, 'id'), $2, false)",
+            table,
+            next_id,
+        )
+
+
+async def backfill_daily_progress(conn, first_user: int, last_user: int):
+    # Same aggregation as the daily_progress migration, for the new users.
+    await conn.execute(
+        """
+        INSERT INTO daily_progress (
+            user_id, exercise_id, day, session_count, completed_set_count,
+            rep_count, quality_score_sum, quality_score_count,
+            session_error_count, rep_error_count
+        )
+        SELECT user_id, exercise_id, session_date, count(*),
+               sum(completed_sets), sum(reps),
+               coalesce(sum(session_quality_score), 0),
+               count(session_quality_score), count(error_flag), sum(rep_errors)
+        FROM (
+            SELECT s.id, s.user_id, s.exercise_id, s.session_date,
+                   s.session_quality_score, s.error_flag,
+                   count(DISTINCT es.id) FILTER (WHERE es.is_completed) AS completed_sets,
+                   count(r.id) AS reps,
+                   count(r.error_flag) AS rep_errors
+            FROM sessions s
+            LEFT JOIN exercise_sets es
+                ON es.session_id = s.id AND es.session_start = s.datetime_start
+            LEFT JOIN repetitions r
+                ON r.set_id = es.id AND r.session_start = es.session_start
+            WHERE s.is_completed IS TRUE AND s.user_id BETWEEN $1 AND $2
+            GROUP BY s.id, s.datetime_start
+        ) per_session
+        GROUP BY user_id, exercise_id, session_date
+        """,
+        first_user,
+        last_user,
+    )
+
+
+async def size_report(conn) -> Dict[str, Dict]:
+    # Partitioned tables and indexes are summed over their partitions (a
+    # plain table counts as one).
+    report = {}
+    for table in TABLES:
+        row = await conn.fetchrow(
+            """
+            SELECT sum(greatest(c.reltuples, 0))::bigint AS estimated_rows,
+                   count(*) AS partitions,
+                   sum(pg_relation_size(c.oid)) AS table_bytes,
+                   sum(pg_indexes_size(c.oid)) AS index_bytes,
+                   sum(pg_total_relation_size(c.oid)) AS total_bytes
+            FROM pg_class c
+            WHERE c.oid = $1::regclass AND c.relkind = 'r'
+               OR c.oid IN (
+                   SELECT relid FROM pg_partition_tree($1::regclass) WHERE isleaf
+               )
+            """,
+            table,
+        )
+        indexes = await conn.fetch(
+            """
+            SELECT indexrelid::regclass::text AS name,
+                   pg_relation_size(indexrelid) + coalesce(
+                       (SELECT sum(pg_relation_size(relid))
+                        FROM pg_partition_tree(indexrelid) WHERE isleaf), 0
+                   )::bigint AS bytes
+            FROM pg_index WHERE indrelid = $1::regclass ORDER BY 1
+            """,
+            table,
+        )
+        report[table] = {
+            **dict(row),
+            "indexes": {index["name"]: index["bytes"] for index in indexes},
+        }
+    return report
+
+
+def _mb(size: int) -> str:
+    return f"{size / 2**20:.1f} MB"
+
+
+def print_report(report: Dict[str, Dict]):
+    print(
+        f"\n{'table':<22} {'rows':>12} {'parts':>6} {'table':>11} {'indexes':>11} "
+        f"{'total':>11}"
+    )
+    for table, stats in report.items():
+        print(
+            f"{table:<22} {stats['estimated_rows']:>12} {stats['partitions']:>6} "
+            f"{_mb(stats['table_bytes']):>11} "
+            f"{_mb(stats['index_bytes']):>11} {_mb(stats['total_bytes']):>11}"
+        )
+        for name, size in stats["indexes"].items():
+            print(f"  {name:<50} {_mb(size):>11}")
+
+
+async def main(args):
+    async with async_engine.connect() as sa_conn:
+        raw = await sa_conn.get_raw_connection()
+        conn = raw.driver_connection
+
+        loaded = {}
+        if not args.report_only:
+            exercises = dict(await conn.fetch("SELECT id, name FROM exercises"))
+            ids = await next_ids(conn)
+            generator = Generator(args, exercises, ids)
+            first_user = ids["users"]
+            with engine.begin() as sync_conn:
+                ensure_partitions(
+                    sync_conn,
+                    (generator.now - generator.span).date(),
+                    generator.now.date(),
+                )
+            loaded = {table: 0 for table in COLUMNS}
+
+            start = time.perf_counter()
+            remaining = args.users
+            while remaining > 0:
+                users = min(args.batch_users, remaining)
+                rows = generator.batch(users)
+                async with conn.transaction():
+                    for table, records in rows.items():
+                        await conn.copy_records_to_table(
+                            table, records=records, columns=COLUMNS[table]
+                        )
+                        loaded[table] += len(records)
+                remaining -= users
+                print(
+                    f"{args.users - remaining}/{args.users} users, "
+                    f"{loaded['repetitions']} repetitions "
+                    f"({time.perf_counter() - start:.1f}s)"
+                )
+
+            await advance_sequences(conn, generator.next_ids)
+            await backfill_daily_progress(conn, first_user, ids["users"] - 1)
+            for table in TABLES:
+                await conn.execute(f"ANALYZE {table}")
+            elapsed = time.perf_counter() - start
+            print(
+                f"Loaded {sum(loaded.values())} rows in {elapsed:.1f}s "
+                f"({loaded['repetitions'] / elapsed:.0f} repetitions/s)"
+            )
+            loaded["seconds"] = round(elapsed, 2)
+
+        report = await size_report(conn)
+        print_report(report)
+
+    if args.output:
+        write_results(
+            args.output,
+            "synthetic_data",
+            vars(args),
+            {"loaded": loaded, "sizes": report},
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--years", type=float, default=2.0)
+    parser.add_argument(
+        "--sessions-per-week",
+        type=float,
+        default=3.0,
+        help="median sessions per week per patient",
+    )
+    parser.add_argument("--batch-users", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--report-only", action="store_true")
+    parser.add_argument("--output")
+    asyncio.run(main(parser.parse_args()))
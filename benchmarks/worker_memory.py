@@ -0,0 +1,180 @@
+"""
+Memory per worker and startup time of the production server (Linux only).
+
+Starts ``gunicorn -c gunicorn.conf.py`` for every --workers count, with and
+without preloading the app in the master, and measures:
+
+- startup: seconds until every worker has logged "Application startup
+  complete", then the latency of the first prediction;
+- memory: RSS and PSS of the master and of each worker once every worker
+  has served predictions. PSS splits shared pages between the processes
+  sharing them, so the PSS total is what the server really costs; with
+  preloading the workers share the imported TensorFlow and app with the
+  master. The password hashing processes are reported separately;
+- shutdown: seconds from SIGTERM until the master exits.
+
+Run it from the project root with DATABASE_URL pointing at a database the
+app can start against:
+
+    python -m benchmarks.worker_memory --workers 1 2 4 \
+        --output results/worker_memory.json
+"""
+
+import argparse
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import write_results
+
+READY_LINE = "Application startup complete"
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    for task in Path(f"/proc/{pid}/task").iterdir():
+        text = (task / "children").read_text().split()
+        children.extend(int(child) for child in text)
+    return children
+
+
+def _memory_kb(pid: int) -> Dict[str, int]:
+    # smaps_rollup has Rss and Pss for the whole process in one read.
+    values = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        key, _, rest = line.partition(":")
+        if key in ("Rss", "Pss"):
+            values[key.lower()] = int(rest.split()[0])
+    return values
+
+
+def _mb(kb: float) -> float:
+    return round(kb / 1024, 1)
+
+
+def _predict_payload(rng: random.Random) -> Dict:
+    return {
+        "list_landmarks": [[rng.random() for _ in range(42)] for _ in range(20)],
+        "exercise_name": "hiding_face",
+    }
+
+
+def measure(workers: int, preload: bool, args) -> Dict:
+    env = dict(
+        os.environ,
+        WEB_CONCURRENCY=str(workers),
+        GUNICORN_PRELOAD=str(preload).lower(),
+        GUNICORN_BIND=f"127.0.0.1:{args.port}",
+    )
+    ready = threading.Event()
+    started = 0
+
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+    def read_log():
+        nonlocal started
+        for line in server.stderr:
+            if READY_LINE in line:
+                started += 1
+                if started == workers:
+                    ready.set()
+
+    threading.Thread(target=read_log, daemon=True).start()
+    try:
+        if not ready.wait(args.timeout):
+            raise RuntimeError(f"{started}/{workers} workers started in time")
+        startup = time.perf_counter() - start
+
+        rng = random.Random(0)
+        with httpx.Client(base_url=f"http://127.0.0.1:{args.port}", timeout=60) as c:
+            first = time.perf_counter()
+            c.post("/predict/api/predict/", json=_predict_payload(rng))
+            first_prediction = time.perf_counter() - first
+            # New connections are spread over the workers, so every worker
+            # ends up with a built predict function before memory is read.
+            for _ in range(args.requests):
+                with httpx.Client(base_url=c.base_url, timeout=60) as fresh:
+                    fresh.post(
+                        "/predict/api/predict/", json=_predict_payload(rng)
+                    ).raise_for_status()
+
+        master = _memory_kb(server.pid)
+        worker_pids = _children(server.pid)
+        worker_memory = [_memory_kb(pid) for pid in worker_pids]
+        helper_memory = [
+            _memory_kb(helper) for pid in worker_pids for helper in _children(pid)
+        ]
+
+        stop = time.perf_counter()
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=args.timeout)
+        shutdown = time.perf_counter() - stop
+    finally:
+        if server.poll() is None:
+            server.kill()
+            server.wait()
+
+    everything = [master] + worker_memory + helper_memory
+    return {
+        "startup_s": round(startup, 2),
+        "first_prediction_ms": round(first_prediction * 1000, 1),
+        "shutdown_s": round(shutdown, 2),
+        "master_rss_mb": _mb(master["rss"]),
+        "master_pss_mb": _mb(master["pss"]),
+        "worker_rss_mb": [_mb(memory["rss"]) for memory in worker_memory],
+        "worker_pss_mb": [_mb(memory["pss"]) for memory in worker_memory],
+        "password_workers_pss_mb": _mb(sum(m["pss"] for m in helper_memory)),
+        "total_pss_mb": _mb(sum(memory["pss"] for memory in everything)),
+    }
+
+
+def main(args):
+    results = {}
+    print(
+        f"{'workers':>7} {'preload':>7} {'startup':>8} {'1st pred':>9} "
+        f"{'stop':>6} {'worker RSS':>11} {'worker PSS':>11} {'total PSS':>10}"
+    )
+    for workers in args.workers:
+        for preload in (True, False):
+            result = measure(workers, preload, args)
+            results[f"{workers}-{'preload' if preload else 'no-preload'}"] = result
+            rss = sum(result["worker_rss_mb"]) / workers
+            pss = sum(result["worker_pss_mb"]) / workers
+            print(
+                f"{workers:>7} {str(preload):>7} {result['startup_s']:>7}s "
+                f"{result['first_prediction_ms']:>7}ms {result['shutdown_s']:>5}s "
+                f"{rss:>8.1f} MB {pss:>8.1f} MB {result['total_pss_mb']:>7} MB"
+            )
+
+    if args.output:
+        write_results(args.output, "worker_memory", vars(args), results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=20,
+        help="predictions sent on fresh connections before memory is read",
+    )
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--output")
+    main(parser.parse_args())
@@ -0,0 +1,64 @@
+"""
+Production server settings: ``gunicorn -c gunicorn.conf.py app.main:app``.
+
+The master imports the app, TensorFlow included, once before it forks, so the
+workers start quickly and share the imported code and data copy-on-write
+instead of each importing their own. TensorFlow's runtime cannot survive a
+fork once a model is loaded, so each worker loads and warms the (small) LSTM
+model itself at startup (APP_PROFILE=api skips TensorFlow altogether). Every
+setting can be overridden through the environment variables below.
+"""
+
+import gc
+import os
+import shutil
+import tempfile
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() != "false"
+
+# Workers are replaced after this many requests (plus jitter, so they do not
+# all restart at once), which bounds slow memory growth.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "500"))
+
+# On SIGTERM a worker stops accepting connections and gets this long to finish
+# the requests it has before it is killed.
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+keepalive = 5
+
+accesslog = "-"
+
+# The workers share their metrics through snapshot files here, so /metrics on
+# any worker reports all of them (see app.core.metrics). Set before the app is
+# imported, so its settings see it.
+metrics_dir = os.environ.setdefault(
+    "METRICS_DIR", os.path.join(tempfile.gettempdir(), "revai-metrics")
+)
+
+
+def on_starting(server):
+    # Snapshots left by a previous run would be added to this one's totals.
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def post_fork(server, worker):
+    # Connections the master may have opened while importing the app must not
+    # be shared with the workers; drop them from the workers' copies of the
+    # pools without closing them.
+    from app.db.database import async_engine, engine, read_async_engine
+
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    read_async_engine.sync_engine.dispose(close=False)
+
+
+def pre_fork(server, worker):
+    # Move everything the master imported out of the garbage collector's
+    # reach, so collections in the workers do not write to (and so copy)
+    # those shared pages.
+    gc.freeze()
@@ -0,0 +1,109 @@
+"""
+Tests that use the app run it in-process against a real PostgreSQL database,
+given as TEST_DATABASE_URL (an empty scratch database; the app creates its
+schema at startup). Without it those tests are skipped.
+"""
+
+import os
+import uuid
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+# Always overridden, so a DATABASE_URL from .env is never written to. The
+# engines connect lazily, so the placeholder is never used when skipping.
+os.environ["DATABASE_URL"] = (
+    TEST_DATABASE_URL or "postgresql+psycopg2://unused@localhost/unused"
+)
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+# The API routes only, so TensorFlow is never imported.
+os.environ["APP_PROFILE"] = "api"
+os.environ.pop("READ_DATABASE_URL", None)
+# No catalog version checks in the middle of a counted request.
+os.environ["EXERCISE_CATALOG_TTL_SECONDS"] = "3600"
+os.environ.setdefault("PASSWORD_HASH_TIMEOUT_SECONDS", "60")
+
+
+def pytest_collection_modifyitems(config, items):
+    if TEST_DATABASE_URL:
+        return
+    skip = pytest.mark.skip(reason="TEST_DATABASE_URL is not set")
+    for item in items:
+        if "app" in getattr(item, "fixturenames", ()):
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def app():
+    from app.main import create_app
+
+    application = create_app("api")
+    async with application.router.lifespan_context(application):
+        yield application
+
+
+@pytest.fixture(scope="session")
+async def client(app):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest.fixture
+def statements():
+    """The SQL statements the app runs while the test does, in order."""
+    from sqlalchemy import event
+
+    from app.db.database import async_engine
+
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+async def user(client):
+    """
+    A new user, logged in: its UserOut fields plus "password" and "headers"
+    (the bearer token). The token's user is already cached, so authenticating
+    does not add statements until the user is written to.
+    """
+    password = "secret-password"
+    response = await client.post(
+        "/users/create",
+        json={
+            "first_name": "Test",
+            "last_name": "User",
+            "email": f"user-{uuid.uuid4().hex}@example.com",
+            "password": password,
+            "age": 30,
+            "address": "Somewhere",
+            "sex": "F",
+            "contact_number": uuid.uuid4().hex[:11],
+        },
+    )
+    assert response.status_code == 201, response.text
+    created = response.json()
+
+    response = await client.post(
+        "/token", data={"username": created["email"], "password": password}
+    )
+    assert response.status_code == 200, response.text
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    response = await client.get("/users/me", headers=headers)
+    assert response.status_code == 200, response.text
+    return {**created, "password": password, "headers": headers}
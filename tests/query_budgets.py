@@ -0,0 +1,54 @@
+"""
+Statement-count budget per endpoint, enforced by tests/test_query_budget.py
+and reported by the optional benchmarks.query_budget live-server run.
+
+When a change legitimately adds a statement, raise the budget here in the
+same commit.
+"""
+
+# Most statements a single request may run, by "METHOD /route/template".
+# The exercise catalog is warmed up first. Routes that authenticate right
+# after a write to the user include the two-statement user lookup, since the
+# write dropped the cached user.
+BUDGETS = {
+    "POST /users/create": 2,
+    "POST /token": 4,
+    "POST /token/refresh": 3,
+    "GET /users/me": 0,
+    "GET /users/all": 2,
+    "GET /users/list": 2,
+    "GET /users/{user_id}": 4,
+    "PUT /users/{user_id}": 1,
+    "POST /users/{user_id}/onboarding": 1,
+    "GET /users/{user_id}/onboarding": 3,
+    "PUT /users/{user_id}/onboarding": 1,
+    "PUT /users/{user_id}/onboarding/custom-schedule-days": 3,
+    "POST /users/{user_id}/problems": 1,
+    "PUT /users/{user_id}/problems": 1,
+    "GET /users/{user_id}/problems": 2,
+    "GET /exercises/all": 0,
+    "GET /exercises/{exercise_id}": 0,
+    "POST /users/{user_id}/requirements": 1,
+    "GET /users/{user_id}/requirements": 2,
+    "PUT /users/{user_id}/requirements/{requirement_id}": 1,
+    "POST /users/{user_id}/sessions/start": 1,
+    "POST /users/{user_id}/sessions/{session_id}/sets/bulk": 1,
+    "POST /users/{user_id}/sessions/{session_id}/sets": 1,
+    "GET /users/{user_id}/sessions/{session_id}/sets/{set_id}": 3,
+    "PUT /users/{user_id}/sessions/{session_id}/sets/{set_id}": 1,
+    "POST /users/{user_id}/sessions/{session_id}/sets/{set_id}/repetitions": 1,
+    "POST /users/{user_id}/sessions/{session_id}/sets/{set_id}/repetitions/bulk": 1,
+    "GET /users/{user_id}/sessions/{session_id}/sets/{set_id}/repetitions/all": 2,
+    "GET /users/{user_id}/sessions/{session_id}/sets/{set_id}/repetitions/{repetition_id}": 2,
+    "PUT /users/{user_id}/sessions/{session_id}/end": 1,
+    "GET /users/{user_id}/sessions/{session_id}": 1,
+    "GET /users/{user_id}/sessions/{session_id}/detail": 1,
+    "GET /users/{user_id}/sessions/history": 1,
+    "GET /users/{user_id}/sessions/filter/{time_filter}": 2,
+    "GET /users/{user_id}/progress/daily": 2,
+    "GET /users/{user_id}/progress/summary": 2,
+    "GET /users/me/dashboard": 3,
+    "POST /users/{user_id}/change-password": 2,
+    "DELETE /users/{user_id}/onboarding": 1,
+    "DELETE /users/{user_id}": 1,
+}
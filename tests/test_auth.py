@@ -0,0 +1,26 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+TOKEN_FIELDS = {"access_token", "refresh_token", "token_type", "user"}
+
+
+def _assert_safe_token_response(body: dict, user: dict):
+    assert set(body) == TOKEN_FIELDS
+    assert body["token_type"] == "bearer"
+    assert body["user"]["id"] == user["id"]
+    assert "hashed_password" not in body["user"]
+
+
+async def test_login_and_refresh_do_not_expose_the_password_hash(client, user):
+    response = await client.post(
+        "/token", data={"username": user["email"], "password": user["password"]}
+    )
+    assert response.status_code == 200, response.text
+    _assert_safe_token_response(response.json(), user)
+
+    response = await client.post(
+        "/token/refresh", json={"refresh_token": response.json()["refresh_token"]}
+    )
+    assert response.status_code == 200, response.text
+    _assert_safe_token_response(response.json(), user)
@@ -0,0 +1,58 @@
+import struct
+
+import pytest
+
+# The prediction routes import the model code, and with it TensorFlow.
+pytest.importorskip("tensorflow")
+
+from fastapi import FastAPI, WebSocketDisconnect  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.prediction import routes  # noqa: E402
+
+URL = "/predict/api/ws/create-dataset"
+FILENAME = "websocket-test.json"
+
+
+def _config(**overrides) -> dict:
+    payload = {"filename": FILENAME, "exercise": "hiding_face", "category": "correct"}
+    return {"event": "config", "payload": {**payload, **overrides}}
+
+
+def _close_code(*messages) -> int:
+    """Sends the messages and returns the code the server closes with."""
+    app = FastAPI()
+    app.include_router(routes.router)
+    with TestClient(app).websocket_connect(URL) as websocket:
+        for message in messages:
+            if isinstance(message, bytes):
+                websocket.send_bytes(message)
+            else:
+                websocket.send_json(message)
+        with pytest.raises(WebSocketDisconnect) as closed:
+            while True:
+                websocket.receive_json()
+    return closed.value.code
+
+
+def test_binary_frames_without_protocol_2_are_unsupported():
+    frames = struct.pack("<B3xI", 2, 0)
+    assert _close_code(_config(), frames) == routes.CLOSE_UNSUPPORTED_DATA
+    assert FILENAME not in routes.SESSION_DATA_CACHE
+
+
+def test_an_unknown_protocol_version_is_unsupported():
+    assert _close_code(_config(protocol=3)) == routes.CLOSE_UNSUPPORTED_DATA
+
+
+def test_a_malformed_config_is_invalid_payload():
+    # Protocol 2 needs the landmark layout.
+    assert _close_code(_config(protocol=2)) == routes.CLOSE_INVALID_PAYLOAD
+
+
+def test_a_malformed_frame_batch_is_invalid_payload():
+    config = _config(protocol=2, landmarks=["nose"], values_per_landmark=3)
+    # One frame announced, no data behind it.
+    frames = struct.pack("<B3xI", 2, 1)
+    assert _close_code(config, frames) == routes.CLOSE_INVALID_PAYLOAD
+    assert FILENAME not in routes.SESSION_DATA_CACHE
@@ -0,0 +1,65 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _catalog_version() -> int:
+    from sqlalchemy import select
+
+    from app.db.database import AsyncSessionLocal
+    from app.features.exercises.models import ExerciseCatalogVersion
+
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(ExerciseCatalogVersion.version)) or 0
+
+
+async def test_every_exercise_write_bumps_the_catalog_version(client):
+    version = await _catalog_version()
+
+    response = await client.post("/exercises/", json={"name": "Versioned Stretch"})
+    assert response.status_code == 201, response.text
+    assert await _catalog_version() == version + 1
+    exercise_id = response.json()["id"]
+
+    # Nothing is written for a duplicate name, so the version stays.
+    response = await client.post("/exercises/", json={"name": "Versioned Stretch"})
+    assert response.status_code == 409, response.text
+    assert await _catalog_version() == version + 1
+
+    response = await client.put(
+        f"/exercises/{exercise_id}", json={"name": "Reversioned Stretch"}
+    )
+    assert response.status_code == 200, response.text
+    assert await _catalog_version() == version + 2
+
+    response = await client.delete(f"/exercises/{exercise_id}")
+    assert response.status_code == 204, response.text
+    assert await _catalog_version() == version + 3
+
+    response = await client.delete(f"/exercises/{exercise_id}")
+    assert response.status_code == 404, response.text
+    assert await _catalog_version() == version + 3
+
+
+async def test_a_matching_if_none_match_is_not_modified(client):
+    response = await client.get("/exercises/all")
+    assert response.status_code == 200, response.text
+    etag = response.headers["ETag"]
+    assert not etag.startswith("W/")
+
+    for if_none_match in (
+        etag,
+        f"W/{etag}",
+        f'"stale", W/{etag}',
+        "*",
+    ):
+        response = await client.get(
+            "/exercises/all", headers={"If-None-Match": if_none_match}
+        )
+        assert response.status_code == 304, if_none_match
+        assert response.headers["ETag"] == etag
+
+    response = await client.get(
+        "/exercises/all", headers={"If-None-Match": '"stale", W/"other"'}
+    )
+    assert response.status_code == 200, response.text
@@ -0,0 +1,75 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from app.core import metrics
+from app.core.config import settings
+
+LABELS = ("GET", "/metrics-test", "200")
+
+
+def _sample(text: str, name: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(f"{name} "):
+            return float(line.split(" ")[-1])
+    raise AssertionError(f"{name} not in the metrics")
+
+
+def _exited_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_render_adds_up_every_workers_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_DIR", str(tmp_path))
+    metrics.HTTP_REQUEST_DURATION.observe(0.01, *LABELS)
+    count = (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/metrics-test",status="200"}'
+    )
+    own_count = _sample(metrics.render(), count)
+    own_in_flight = _sample(metrics.render(), "http_requests_in_flight")
+
+    # This worker's values, as two others would have written them: one still
+    # running (the test's parent) and one that has exited.
+    metrics.HTTP_REQUESTS_IN_FLIGHT.inc()
+    try:
+        metrics.write_snapshot(str(tmp_path))
+    finally:
+        metrics.HTTP_REQUESTS_IN_FLIGHT.dec()
+    snapshot = tmp_path / f"{os.getpid()}.json"
+    shutil.copy(snapshot, tmp_path / f"{_exited_pid()}.json")
+    snapshot.rename(tmp_path / f"{os.getppid()}.json")
+
+    text = metrics.render()
+    # Counts of exited workers stay in the totals; their gauges do not.
+    assert _sample(text, count) == 3 * own_count
+    assert _sample(text, "http_requests_in_flight") == 2 * own_in_flight + 1
+
+
+def test_render_without_a_metrics_dir_is_this_worker_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_DIR", None)
+    metrics.HTTP_REQUESTS_IN_FLIGHT.inc()
+    try:
+        metrics.write_snapshot(str(tmp_path))
+        (tmp_path / f"{os.getpid()}.json").rename(tmp_path / f"{os.getppid()}.json")
+        in_flight = _sample(metrics.render(), "http_requests_in_flight")
+        assert in_flight == metrics.HTTP_REQUESTS_IN_FLIGHT.value
+    finally:
+        metrics.HTTP_REQUESTS_IN_FLIGHT.dec()
+
+
+@pytest.mark.parametrize("enabled, status", [(False, 404), (True, 200)])
+def test_sql_stats_are_served_only_when_enabled(monkeypatch, enabled, status):
+    from fastapi.testclient import TestClient
+
+    from app.main import create_app
+
+    monkeypatch.setattr(settings, "SQL_STATS_ENDPOINT", enabled)
+    # Without the lifespan: the route needs no database.
+    response = TestClient(create_app("api")).get("/metrics/sql")
+    assert response.status_code == status
@@ -0,0 +1,61 @@
+import base64
+import datetime
+import json
+
+import pytest
+
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+HISTORY_KEY = (datetime.datetime, int)
+
+
+def _raw_cursor(key) -> str:
+    raw = json.dumps(key).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    key = (datetime.datetime(2024, 1, 1, 8, 30), 42)
+    assert decode_cursor(encode_cursor(key), HISTORY_KEY) == list(key)
+    assert decode_cursor(encode_cursor((7,)), (int,)) == [7]
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        ["2024-01-01", 1],
+        [{"dt": "2024-01-01T00:00:00"}, "x"],
+        [{"dt": "2024-01-01T00:00:00"}, 1.5],
+        [{"dt": "2024-01-01T00:00:00"}, True],
+        [{"dt": "2024-01-01T00:00:00+08:00"}, 1],
+        [{"dt": "not a date"}, 1],
+        [1, 1],
+        [{"dt": "2024-01-01T00:00:00"}],
+        "not a list",
+    ],
+)
+def test_history_cursor_of_the_wrong_shape_is_invalid(key):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(_raw_cursor(key), HISTORY_KEY)
+
+
+@pytest.mark.parametrize("key", [["1"], [1.0], [None], [2**31], [False]])
+def test_id_cursor_of_the_wrong_shape_is_invalid(key):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(_raw_cursor(key), (int,))
+
+
+def test_garbage_cursor_is_invalid():
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("garbage", (int,))
+
+
+@pytest.mark.anyio
+async def test_bad_cursors_are_a_bad_request(client, user):
+    for path, key in (
+        (f"/users/{user['id']}/sessions/history", ["2024-01-01", "x"]),
+        (f"/users/{user['id']}/sessions/history", [{"dt": "2024-01-01T00:00"}, 1.5]),
+        ("/users/list", ["1"]),
+    ):
+        response = await client.get(path, params={"cursor": _raw_cursor(key)})
+        assert response.status_code == 400, (path, key, response.text)
@@ -0,0 +1,40 @@
+import pytest
+
+from app.db.partitions import is_partition_name
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "sessions_2026_10",
+        "exercise_sets_2027_01",
+        "repetitions_2026_12",
+        "sessions_2026_10_user_id_session_date_id_idx",
+        "exercise_sets_2026_10_session_id_set_number_session_start_key",
+    ],
+)
+def test_partitions_and_their_indexes_are_recognised(name):
+    assert is_partition_name(name)
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "sessions",
+        "exercise_sets",
+        "session_requirements",
+        "ix_sessions_completed_user_id_session_date",
+        "sessions_old",
+    ],
+)
+def test_other_names_are_not_partitions(name):
+    assert not is_partition_name(name)
+
+
+@pytest.mark.anyio
+async def test_autogenerate_finds_nothing_to_change(app):
+    """The partitions the app created must not show up as tables to drop."""
+    from alembic import command
+    from alembic.config import Config
+
+    command.check(Config("alembic.ini"))
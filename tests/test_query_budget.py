@@ -0,0 +1,43 @@
+"""
+Runs the benchmarks.query_budget walk in-process and checks every route's
+statement count, as recorded by QueryStatsMiddleware, against its budget.
+"""
+
+import pytest
+
+from benchmarks.query_budget import Walk, walk
+from tests.query_budgets import BUDGETS
+
+pytestmark = pytest.mark.anyio
+
+
+class InProcessWalk(Walk):
+    """Counts each request's statements from the per-route totals."""
+
+    async def send(self, route: str, path: str, **kwargs):
+        from app.db.query_stats import route_query_stats
+
+        def statements() -> int:
+            return route_query_stats().get(route, {}).get("statements", 0)
+
+        before = statements()
+        response = await self.client.request(route.split(" ", 1)[0], path, **kwargs)
+        return response, statements() - before
+
+
+async def test_every_route_stays_within_its_statement_budget(app):
+    import httpx
+
+    # A client of its own: the walk sets an Authorization header on it.
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        w = InProcessWalk(c)
+        await walk(w)
+
+    assert set(w.counts) == set(BUDGETS)
+    over = {
+        route: (count, BUDGETS[route])
+        for route, count in w.counts.items()
+        if count > BUDGETS[route]
+    }
+    assert not over, over
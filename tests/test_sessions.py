@@ -0,0 +1,222 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _progress(client, user_id: int) -> dict:
+    response = await client.get(f"/users/{user_id}/progress/summary")
+    assert response.status_code == 200, response.text
+    rows = response.json()
+    return rows[0] if rows else {}
+
+
+async def test_ending_a_session_keeps_daily_progress_in_step(client, user):
+    user_id = user["id"]
+    session = (
+        await client.post(
+            f"/users/{user_id}/sessions/start",
+            json={"user_id": user_id, "exercise_id": 1},
+        )
+    ).json()
+    base = f"/users/{user_id}/sessions/{session['id']}"
+    await client.post(
+        f"{base}/sets/bulk",
+        json={
+            "sets": [
+                {
+                    "set_number": 1,
+                    "repetitions": [
+                        {"rep_number": 1, "error_flag": "slouch"},
+                        {"rep_number": 2},
+                    ],
+                }
+            ]
+        },
+    )
+
+    end = f"{base}/end"
+    await client.put(end, json={"is_completed": True, "session_quality_score": 0.8})
+    progress = await _progress(client, user_id)
+    assert progress["session_count"] == 1
+    assert progress["rep_count"] == 2
+    assert progress["rep_error_count"] == 1
+    assert progress["mean_quality_score"] == pytest.approx(0.8)
+
+    # Ending it again only moves the score.
+    await client.put(end, json={"is_completed": True, "session_quality_score": 0.4})
+    progress = await _progress(client, user_id)
+    assert progress["session_count"] == 1
+    assert progress["rep_count"] == 2
+    assert progress["mean_quality_score"] == pytest.approx(0.4)
+
+    # Reopening it takes it out again.
+    await client.put(end, json={"is_completed": False, "error_flag": "aborted"})
+    progress = await _progress(client, user_id)
+    assert progress.get("session_count", 0) == 0
+
+
+async def test_start_session_checks_the_path_user_and_uses_the_body_user(client, user):
+    user_id = user["id"]
+    response = await client.post(
+        "/users/999999/sessions/start", json={"user_id": user_id, "exercise_id": 1}
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "User specified for session not found"
+
+    response = await client.post(
+        "/users/999999/sessions/start",
+        json={"user_id": user_id, "exercise_id": 999999},
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "User specified for session not found"
+
+    # The path only has to name an existing user; the body says whose it is.
+    other = (await client.get("/users/all", params={"limit": 1})).json()[0]
+    response = await client.post(
+        f"/users/{other['id']}/sessions/start",
+        json={"user_id": user_id, "exercise_id": 1},
+    )
+    assert response.status_code == 201, response.text
+    assert response.json()["user_id"] == user_id
+
+
+async def _seed_month_of_sessions(user_id: int):
+    """
+    A realistic mix for the planner: three sessions an hour for most of the
+    month, one in ten completed.
+    """
+    from sqlalchemy import text
+
+    from app.db.database import AsyncSessionLocal
+    from app.features.progress.crud import manila_today
+
+    month_start = manila_today().replace(day=1)
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            text(
+                "INSERT INTO sessions (user_id, exercise_id, datetime_start, "
+                "is_completed) "
+                "SELECT :user_id, 1, CAST(:month_start AS timestamp) "
+                "+ i * interval '20 minutes', "
+                "i % 10 = 0 FROM generate_series(0, 27 * 72 - 1) AS i"
+            ),
+            {"user_id": user_id, "month_start": month_start},
+        )
+        await db.execute(text("ANALYZE sessions"))
+        await db.commit()
+
+
+async def _filter_index_names(user_id: int, time_filter: str) -> set:
+    """The indexes the planner picks for a time-filter read."""
+    from sqlalchemy import text
+    from sqlalchemy.dialects import postgresql
+
+    from app.db.database import AsyncSessionLocal
+    from app.features.sessions import crud
+
+    stmt = crud._completed_sessions_query(
+        user_id, crud.time_filter_range(time_filter), crud.FULL_SESSION_SHAPE
+    )
+    sql = stmt.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    async with AsyncSessionLocal() as db:
+        plan = await db.scalar(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+
+    names, nodes = set(), [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        children = node.get("Plans", [])
+        if node.get("Relation Name", "").startswith("sessions"):
+            if node["Node Type"] == "Bitmap Heap Scan":
+                names.update(
+                    child["Index Name"]
+                    for child in children
+                    if child["Node Type"] == "Bitmap Index Scan"
+                )
+            else:
+                # None for a sequential scan.
+                names.add(node.get("Index Name"))
+        nodes.extend(children)
+    return names
+
+
+async def _partitions_of_index(name: str) -> set:
+    from sqlalchemy import text
+
+    from app.db.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        result = await db.scalars(
+            text(
+                "SELECT inhrelid::regclass::text FROM pg_inherits "
+                "WHERE inhparent = CAST(:name AS regclass)"
+            ),
+            {"name": name},
+        )
+        return set(result.all())
+
+
+@pytest.mark.parametrize("time_filter", ["today", "this_week", "this_month"])
+async def test_time_filters_use_the_completed_sessions_index(client, user, time_filter):
+    await _seed_month_of_sessions(user["id"])
+    index_names = await _filter_index_names(user["id"], time_filter)
+    # Each monthly partition has its own copy of the index.
+    assert index_names
+    assert index_names <= await _partitions_of_index(
+        "ix_sessions_completed_user_id_session_date"
+    )
+
+
+async def test_writes_to_a_completed_session_keep_daily_progress_in_step(client, user):
+    user_id = user["id"]
+    session = (
+        await client.post(
+            f"/users/{user_id}/sessions/start",
+            json={"user_id": user_id, "exercise_id": 1},
+        )
+    ).json()
+    base = f"/users/{user_id}/sessions/{session['id']}"
+    exercise_set = (await client.post(f"{base}/sets", json={"set_number": 1})).json()
+    reps = f"{base}/sets/{exercise_set['id']}/repetitions"
+    await client.post(reps, json={"rep_number": 1})
+    await client.put(f"{base}/end", json={"is_completed": True})
+    progress = await _progress(client, user_id)
+    assert progress["completed_set_count"] == 0
+    assert progress["rep_count"] == 1
+    assert progress["rep_error_count"] == 0
+
+    response = await client.put(
+        f"{base}/sets/{exercise_set['id']}",
+        json={"is_completed": True, "set_quality_score": 0.9, "error_flag": None},
+    )
+    assert response.status_code == 200, response.text
+    response = await client.post(reps, json={"rep_number": 2, "error_flag": "slouch"})
+    assert response.status_code == 201, response.text
+    # Re-sending a rep overwrites it: no new rep, only its error flag.
+    response = await client.post(
+        f"{reps}/bulk",
+        json={"repetitions": [{"rep_number": 1, "error_flag": "lean"}]},
+    )
+    assert response.status_code == 201, response.text
+    response = await client.post(
+        f"{base}/sets/bulk",
+        json={
+            "sets": [
+                {"set_number": 1, "repetitions": [{"rep_number": 2}]},
+                {"set_number": 2, "repetitions": [{"rep_number": 1}]},
+            ]
+        },
+    )
+    assert response.status_code == 201, response.text
+
+    progress = await _progress(client, user_id)
+    assert progress["session_count"] == 1
+    assert progress["completed_set_count"] == 1
+    assert progress["rep_count"] == 3
+    assert progress["rep_error_count"] == 1
+
+    # Reopening the session still takes out exactly what it added.
+    await client.put(f"{base}/end", json={"is_completed": False})
+    progress = await _progress(client, user_id)
+    assert progress.get("rep_count", 0) == 0
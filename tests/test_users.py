@@ -0,0 +1,49 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _add_problem(client, user_id: int, problem_area: str) -> dict:
+    response = await client.post(
+        f"/users/{user_id}/problems", json={"problem_area": problem_area}
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def _problems(client, user_id: int) -> dict:
+    response = await client.get(f"/users/{user_id}/problems")
+    return {problem["id"]: problem["problem_area"] for problem in response.json()}
+
+
+async def test_update_problem_changes_only_the_first_problem(client, user):
+    user_id = user["id"]
+    first = await _add_problem(client, user_id, "hiding_face")
+    second = await _add_problem(client, user_id, "flank_stretch")
+
+    response = await client.put(
+        f"/users/{user_id}/problems", json={"problem_area": "torso_rotation"}
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["id"] == first["id"]
+
+    assert await _problems(client, user_id) == {
+        first["id"]: "torso_rotation",
+        second["id"]: "flank_stretch",
+    }
+
+
+async def test_update_problem_not_found(client, user):
+    detail = "either does not exist or does not have any Problem Area information"
+
+    response = await client.put(
+        f"/users/{user['id']}/problems", json={"problem_area": "hiding_face"}
+    )
+    assert response.status_code == 404
+    assert detail in response.json()["detail"]
+
+    response = await client.put(
+        "/users/999999/problems", json={"problem_area": "hiding_face"}
+    )
+    assert response.status_code == 404
+    assert detail in response.json()["detail"]
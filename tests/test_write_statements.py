@@ -0,0 +1,328 @@
+"""
+Every write endpoint makes one round trip to the database: a single
+INSERT/UPDATE/DELETE ... RETURNING whose result is the response. Checks for
+missing users, sessions or sets are part of that statement; separate reads
+only happen on the error path, to pick the right 404. Sign-up is the
+exception: it checks the email before hashing the password.
+"""
+
+import os
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _count(statements, request):
+    """Runs one request and returns it with the number of statements it ran."""
+    statements.clear()
+    response = await request
+    return response, len(statements)
+
+
+async def _warm_catalog(client):
+    # Exercise writes make the next catalog read reload it.
+    response = await client.get("/exercises/1")
+    assert response.status_code == 200, response.text
+
+
+async def _session(client, user, statements):
+    await _warm_catalog(client)
+    response, count = await _count(
+        statements,
+        client.post(
+            f"/users/{user['id']}/sessions/start",
+            json={"user_id": user["id"], "exercise_id": 1},
+        ),
+    )
+    assert response.status_code == 201, response.text
+    assert count == 1
+    return response.json()
+
+
+async def test_user_writes(client, user, statements):
+    user_id = user["id"]
+
+    response, count = await _count(
+        statements, client.put(f"/users/{user_id}", json={"address": "Elsewhere"})
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["address"] == "Elsewhere"
+    assert count == 1
+
+    response, count = await _count(
+        statements,
+        client.post(
+            f"/users/upload-profile-picture/{user_id}",
+            files={"file": ("me.png", b"not really a png", "image/png")},
+        ),
+    )
+    try:
+        assert response.status_code == 200, response.text
+        assert count == 1
+    finally:
+        path = f"app/static/images/user_{user_id}_profile.png"
+        if response.status_code == 200:
+            os.remove(path)
+
+    response, count = await _count(statements, client.delete(f"/users/{user_id}"))
+    assert response.status_code == 204, response.text
+    assert count == 1
+
+
+async def test_create_user_with_a_taken_email_is_a_conflict(
+    client, user, statements, monkeypatch
+):
+    async def no_hashing(password):
+        raise AssertionError("hashed a password for a taken email")
+
+    monkeypatch.setattr("app.features.users.routes.hash_password_async", no_hashing)
+    response, count = await _count(
+        statements,
+        client.post(
+            "/users/create",
+            json={
+                "first_name": "Other",
+                "last_name": "User",
+                "email": user["email"],
+                "password": "whatever",
+                "age": 40,
+                "address": "Nowhere",
+                "sex": "M",
+                "contact_number": "00000000000",
+            },
+        ),
+    )
+    assert response.status_code == 409, response.text
+    # Only the email check: the insert never ran.
+    assert count == 1
+
+
+async def test_onboarding_and_problem_writes(client, user, statements):
+    user_id = user["id"]
+
+    response, count = await _count(
+        statements,
+        client.post(
+            f"/users/{user_id}/onboarding",
+            json={"primary_goal": "Mobility", "pain_score": 3, "preferred_schedule": 2},
+        ),
+    )
+    assert response.status_code == 201, response.text
+    assert count == 1
+
+    response, count = await _count(
+        statements, client.put(f"/users/{user_id}/onboarding", json={"pain_score": 4})
+    )
+    assert response.status_code == 200, response.text
+    assert count == 1
+
+    # Warm the auth cache again after the writes above invalidated it.
+    await client.get("/users/me", headers=user["headers"])
+    response, count = await _count(
+        statements,
+        client.put(
+            f"/users/{user_id}/onboarding/custom-schedule-days",
+            json={"custom_allowed_days": [1, 3]},
+            headers=user["headers"],
+        ),
+    )
+    assert response.status_code == 200, response.text
+    assert count == 1
+
+    response, count = await _count(
+        statements, client.delete(f"/users/{user_id}/onboarding")
+    )
+    assert response.status_code == 204, response.text
+    assert count == 1
+
+    await _warm_catalog(client)
+    response, count = await _count(
+        statements,
+        client.post(f"/users/{user_id}/problems", json={"problem_area": "hiding_face"}),
+    )
+    assert response.status_code == 201, response.text
+    assert count == 1
+
+    response, count = await _count(
+        statements,
+        client.put(f"/users/{user_id}/problems", json={"problem_area": "hiding_face"}),
+    )
+    assert response.status_code == 200, response.text
+    assert count == 1
+
+
+async def test_change_password(client, user, statements):
+    response, count = await _count(
+        statements,
+        client.post(
+            f"/users/{user['id']}/change-password",
+            json={"current_password": user["password"], "new_password": "new-one"},
+            headers=user["headers"],
+        ),
+    )
+    assert response.status_code == 200, response.text
+    # The current password is checked against the stored hash before anything
+    # is written, so reading the hash is a round trip of its own.
+    assert count == 2
+
+
+async def test_exercise_writes(client, statements):
+    response, count = await _count(
+        statements, client.post("/exercises/", json={"name": "Counted Stretch"})
+    )
+    assert response.status_code == 201, response.text
+    assert count == 1
+    exercise_id = response.json()["id"]
+
+    response, count = await _count(
+        statements, client.post("/exercises/", json={"name": "Counted Stretch"})
+    )
+    assert response.status_code == 409, response.text
+    assert count == 1
+
+    response, count = await _count(
+        statements,
+        client.put(f"/exercises/{exercise_id}", json={"name": "Recounted Stretch"}),
+    )
+    assert response.status_code == 200, response.text
+    assert count == 1
+
+    response, count = await _count(
+        statements, client.delete(f"/exercises/{exercise_id}")
+    )
+    assert response.status_code == 204, response.text
+    assert count == 1
+
+
+async def test_requirement_writes(client, user, statements):
+    user_id = user["id"]
+    body = {"number_of_reps": 10, "number_of_sets": 3, "exercise_id": 1}
+    await _warm_catalog(client)
+
+    response, count = await _count(
+        statements,
+        client.post(
+            f"/users/{user_id}/requirements", json={**body, "user_id": user_id}
+        ),
+    )
+    assert response.status_code == 201, response.text
+    assert count == 1
+    requirement_id = response.json()["id"]
+
+    response, count = await _count(
+        statements,
+        client.put(
+            f"/users/{user_id}/requirements/{requirement_id}",
+            json={"number_of_reps": 12, "number_of_sets": 3},
+        ),
+    )
+    assert response.status_code == 200, response.text
+    assert count == 1
+
+
+async def test_session_writes(client, user, statements):
+    user_id = user["id"]
+    session = await _session(client, user, statements)
+    base = f"/users/{user_id}/sessions/{session['id']}"
+
+    response, count = await _count(
+        statements, client.post(f"{base}/sets", json={"set_number": 1})
+    )
+    assert response.status_code == 201, response.text
+    assert count == 1
+    set_id = response.json()["id"]
+
+    response, count = await _count(
+        statements,
+        client.post(
+            f"{base}/sets/{set_id}/repetitions",
+            json={"rep_number": 1, "rep_quality_score": 0.9},
+        ),
+    )
+    assert response.status_code == 201, response.text
+    assert count == 1
+
+    response, count = await _count(
+        statements,
+        client.post(
+            f"{base}/sets/{set_id}/repetitions/bulk",
+            json={"repetitions": [{"rep_number": 2}, {"rep_number": 3}]},
+        ),
+    )
+    assert response.status_code == 201, response.text
+    assert count == 1
+
+    response, count = await _count(
+        statements,
+        client.put(
+            f"{base}/sets/{set_id}",
+            json={"set_quality_score": 0.8, "is_completed": True, "error_flag": None},
+        ),
+    )
+    assert response.status_code == 200, response.text
+    assert [rep["rep_number"] for rep in response.json()["repetitions"]] == [1, 2, 3]
+    assert count == 1
+
+    response, count = await _count(
+        statements,
+        client.post(
+            f"{base}/sets/bulk",
+            json={
+                "sets": [
+                    {"set_number": 2, "repetitions": [{"rep_number": 1}]},
+                    {"set_number": 3},
+                ]
+            },
+        ),
+    )
+    assert response.status_code == 201, response.text
+    assert [s["set_number"] for s in response.json()] == [2, 3]
+    assert count == 1
+
+    response, count = await _count(
+        statements,
+        client.put(
+            f"{base}/end", json={"is_completed": True, "session_quality_score": 0.7}
+        ),
+    )
+    assert response.status_code == 200, response.text
+    assert len(response.json()["exercise_sets"]) == 3
+    assert count == 1
+
+
+async def test_writes_to_another_users_session_are_not_found(client, user, statements):
+    session = await _session(client, user, statements)
+    other = (
+        await client.post(
+            "/users/create",
+            json={
+                "first_name": "Other",
+                "last_name": "User",
+                "email": f"other-{user['email']}",
+                "password": "whatever",
+                "age": 40,
+                "address": "Nowhere",
+                "sex": "M",
+                "contact_number": user["contact_number"][::-1],
+            },
+        )
+    ).json()
+    base = f"/users/{other['id']}/sessions/{session['id']}"
+
+    for request in (
+        client.post(f"{base}/sets", json={"set_number": 1}),
+        client.post(f"{base}/sets/bulk", json={"sets": [{"set_number": 1}]}),
+        client.put(f"{base}/end", json={"is_completed": True}),
+    ):
+        response = await request
+        assert response.status_code == 404, response.text
+        assert response.json()["detail"] in (
+            "Session not found",
+            "Session not found to add set to",
+        )
+
+    # Nothing was written to the session through the other user.
+    response = await client.get(f"/users/{user['id']}/sessions/{session['id']}")
+    assert response.json()["exercise_sets"] == []
+    assert response.json()["is_completed"] is None